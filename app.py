@@ -5,6 +5,7 @@ A Flask-based application for voice-based order processing.
 """
 
 import os
+import time
 import click
 from flask import Flask
 from flask_cors import CORS
@@ -14,6 +15,13 @@ from config.settings import Config
 from controllers.pedidos import pedidos_bp
 from controllers.clientes import clientes_bp
 from core.database import init_db
+from services.transcription import init_app as init_transcription
+from services.noise_profiles import init_app as init_noise_profiles
+from services.audio_resources import init_app as init_audio
+from services.tts_cache import init_app as init_tts_cache
+from services.speech_jobs import init_app as init_speech_jobs
+from services.text_to_speech import warm_tts_cache
+from services.batch_nlu import analyze_batch, read_ndjson, write_ndjson
 
 # Initialize extensions
 db = SQLAlchemy()
@@ -37,6 +45,13 @@ def create_app(config_class=Config):
     # Initialize database
     db.init_app(app)
     
+    # Start the transcription workers, the shared audio resources and the speech services
+    init_transcription(app)
+    init_noise_profiles(app)
+    init_audio(app)
+    init_tts_cache(app)
+    init_speech_jobs(app)
+    
     # Register blueprints
     app.register_blueprint(pedidos_bp, url_prefix='/api/v1')
     app.register_blueprint(clientes_bp, url_prefix='/api/v1')
@@ -51,6 +66,38 @@ def create_app(config_class=Config):
         init_db()
         click.echo('Initialized the database.')
     
+    @app.cli.command('warm-tts')
+    @click.option('--workers', type=int, default=None, help='Synthesis processes (defaults to TTS_WORKERS).')
+    def warm_tts_command(workers):
+        """Pre-render the static prompts into the TTS cache."""
+        try:
+            result = warm_tts_cache(workers)
+            click.echo(
+                f"Rendered {result['count']} prompts ({result['bytes'] / 1024:.0f} KiB) "
+                f"in {result['seconds']:.1f}s."
+            )
+            if result['failed']:
+                click.echo(f"{result['failed']} prompts could not be synthesized.", err=True)
+        except Exception as e:
+            click.echo(f'Error warming the TTS cache: {e}', err=True)
+    
+    @app.cli.command('analyze-transcripts')
+    @click.argument('input_file', type=click.File('r', encoding='utf-8'), default='-')
+    @click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default='-', help='NDJSON output (defaults to stdout).')
+    @click.option('--workers', type=int, default=None, help='Worker processes (defaults to the number of CPUs).')
+    def analyze_transcripts_command(input_file, output, workers):
+        """Replay NDJSON transcripts through the order NLU with the current catalog."""
+        started = time.perf_counter()
+        results = analyze_batch(
+            read_ndjson(input_file),
+            app.config.get('PRODUCTS', {}),
+            app.config.get('SYNONYMS', {}),
+            app.config.get('SYNONYMS_FILE'),
+            workers=workers
+        )
+        count = write_ndjson(results, output)
+        click.echo(f"Analyzed {count} transcripts in {time.perf_counter() - started:.1f}s.", err=True)
+    
     return app
 
 if __name__ == '__main__':
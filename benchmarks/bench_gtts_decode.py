@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark: gTTS playback through temporary files vs. in memory.
+
+Compares, per utterance, the path used before the change (MP3 saved to a
+temporary file, decoded, exported to a temporary WAV and decoded again)
+with the in-memory path (MP3 written to a BytesIO and decoded once).
+Synthesis is replaced by a fixed MP3 payload so the network is out of the
+measurement; filesystem operations are counted with an audit hook.
+
+Usage:
+    python -m benchmarks.bench_gtts_decode [arquivo.mp3]
+
+Without ffmpeg the decode steps cannot run and only the file I/O of both
+paths is measured.
+"""
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from pydub import AudioSegment
+
+UTTERANCES = 50
+HAS_FFMPEG = shutil.which('ffmpeg') is not None
+
+class FakeGTTS:
+    """Stand-in for gTTS that returns a fixed MP3."""
+
+    def __init__(self, payload: bytes):
+        self.payload = payload
+
+    def save(self, filename: str) -> None:
+        with open(filename, 'wb') as f:
+            f.write(self.payload)
+
+    def write_to_fp(self, fp) -> None:
+        fp.write(self.payload)
+
+def decode_file(path: str, format: str):
+    """Decode a file with pydub, or just read it without ffmpeg."""
+    if HAS_FFMPEG:
+        return AudioSegment.from_file(path, format=format)
+    with open(path, 'rb') as f:
+        return f.read()
+
+def with_temp_files(tts: FakeGTTS):
+    """Playback path before the change."""
+    temp_mp3 = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
+    temp_wav = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
+    try:
+        tts.save(temp_mp3.name)
+        audio = decode_file(temp_mp3.name, 'mp3')
+        if HAS_FFMPEG:
+            audio.export(temp_wav.name, format="wav")
+        else:
+            with open(temp_wav.name, 'wb') as f:
+                f.write(audio)
+        return decode_file(temp_wav.name, 'wav')
+    finally:
+        temp_mp3.close()
+        temp_wav.close()
+        os.unlink(temp_mp3.name)
+        os.unlink(temp_wav.name)
+
+def in_memory(tts: FakeGTTS):
+    """Playback path after the change."""
+    mp3 = io.BytesIO()
+    tts.write_to_fp(mp3)
+    mp3.seek(0)
+    if HAS_FFMPEG:
+        return AudioSegment.from_file(mp3, format="mp3")
+    return mp3.read()
+
+class IOCounter:
+    """Counts filesystem operations reported by audit events."""
+
+    EVENTS = {'open', 'os.remove', 'tempfile.mkstemp', 'os.rename', 'os.replace'}
+
+    def __init__(self):
+        self.enabled = False
+        self.count = 0
+        sys.addaudithook(self._hook)
+
+    def _hook(self, event: str, args) -> None:
+        if self.enabled and event in self.EVENTS:
+            # Conta apenas arquivos do diretório temporário (ignora módulos importados)
+            if event == 'open' and not (isinstance(args[0], str) and args[0].startswith(tempfile.gettempdir())):
+                return
+            self.count += 1
+
+def load_payload() -> bytes:
+    """MP3 given on the command line, generated with ffmpeg, or filler bytes."""
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'rb') as f:
+            return f.read()
+    if HAS_FFMPEG:
+        from pydub.generators import Sine
+        buffer = io.BytesIO()
+        Sine(440).to_audio_segment(duration=2000).export(buffer, format='mp3')
+        return buffer.getvalue()
+    return b'\xff\xfb' * 8192  # ~2 s de MP3 a 64 kbps
+
+def measure(name: str, playback, tts: FakeGTTS, counter: IOCounter) -> None:
+    """Run several utterances and print time and file operations per utterance."""
+    started = time.perf_counter()
+    for _ in range(UTTERANCES):
+        playback(tts)
+    elapsed = time.perf_counter() - started
+
+    counter.count = 0
+    counter.enabled = True
+    playback(tts)
+    counter.enabled = False
+
+    print(f"{name:<12} time/utterance: {elapsed / UTTERANCES * 1000:7.2f} ms  file ops/utterance: {counter.count}")
+
+def main() -> None:
+    tts = FakeGTTS(load_payload())
+    counter = IOCounter()
+    if not HAS_FFMPEG:
+        print("ffmpeg não encontrado: decodificação omitida, apenas I/O medido")
+
+    measure('temp files', with_temp_files, tts, counter)
+    measure('in memory', in_memory, tts, counter)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark: extrair_informacoes with the regexes looked up in re's
+cache on every call vs. compiled once at import.
+
+There is no corpus of recorded transcripts in the repository, so the
+benchmark generates a few thousand in the forms the customers use
+("me chamo ... meu telefone é ... moro em ..."), with and without the
+fields. Both variants of the extractor are measured: the root one
+(name before the phone, address after it) and the src one (name and
+address after an introduction).
+
+Usage:
+    python -m benchmarks.bench_info_extractor [transcrições]
+"""
+
+import random
+import re
+import statistics
+import sys
+import time
+
+from services.info_extractor import ENDERECO_APRESENTACAO, NOME_APRESENTACAO, TELEFONE_LIVRE, InfoExtractor, only_digits
+from services.order_processor import extrair_informacoes
+
+NOMES = ['Ana Souza', 'Bruno Lima', 'Carla Dias', 'João Pereira', 'Márcia Gonçalves']
+RUAS = ['Rua das Flores, 123', 'Avenida Brasil 4500 apto 12', 'Travessa São José 8']
+
+def make_transcripts(count: int):
+    """Synthetic transcripts of the customer's introduction."""
+    rng = random.Random(7)
+    transcripts = []
+    for _ in range(count):
+        nome, rua = rng.choice(NOMES), rng.choice(RUAS)
+        telefone = f"{rng.randrange(11, 99)} 9{rng.randrange(1000, 9999)}-{rng.randrange(1000, 9999)}"
+        transcripts.append(rng.choice([
+            f"{nome} {telefone} {rua}",
+            f"Oi, boa noite. Me chamo {nome}, meu telefone é {telefone} e moro em {rua}.",
+            f"Meu nome é {nome} e meu endereço é {rua}",
+            f"Quero fazer um pedido, por favor, é para entregar rápido"
+        ]))
+    return transcripts
+
+def root_before(texto):
+    """Root extrair_informacoes before the change."""
+    informacoes = {"nome": "", "telefone": "", "endereco": ""}
+    telefone_match = re.search(r'(\d{2})[\s\-]?(\d{5})[\s\-]?(\d{4})', texto)
+    if telefone_match:
+        informacoes["telefone"] = f"{telefone_match.group(1)}{telefone_match.group(2)}{telefone_match.group(3)}"
+        nome_text = texto[:telefone_match.start()].strip()
+        if nome_text:
+            informacoes["nome"] = nome_text
+        endereco_text = texto[telefone_match.end():].strip()
+        if endereco_text:
+            informacoes["endereco"] = endereco_text
+    return informacoes
+
+def src_before(texto):
+    """Fallback of src extrair_informacoes before the change."""
+    info = {'nome': None, 'telefone': None, 'endereco': None}
+    telefone = re.search(r'\b(\d{2}[\s-]?)?\d{4,5}[\s-]?\d{4}\b', texto)
+    if telefone:
+        info['telefone'] = re.sub(r'[\s-]', '', telefone.group())
+    nome = re.search(r'\b(?:me\s+chamo|meu\s+nome\s+[ée]|sou\s+(?:o|a)?\s*)\s+([A-Za-zÀ-ÿ\s]+)(?=\s|$)', texto.lower())
+    if nome:
+        info['nome'] = nome.group(1).strip().title()
+    endereco = re.search(r'\b(?:meu\s+endere[çc]o\s+[ée]|moro\s+em|fico\s+em)\s+([^,.!?]+)', texto.lower())
+    if endereco:
+        info['endereco'] = endereco.group(1).strip().capitalize()
+    return info
+
+SRC_EXTRATOR = InfoExtractor(TELEFONE_LIVRE, NOME_APRESENTACAO, ENDERECO_APRESENTACAO)
+FORMATOS = {'telefone': only_digits, 'nome': str.title, 'endereco': str.capitalize}
+
+def src_after(texto):
+    """Fallback of src extrair_informacoes after the change."""
+    info = {'nome': None, 'telefone': None, 'endereco': None}
+    for campo, (inicio, fim) in SRC_EXTRATOR.spans(texto).items():
+        info[campo] = FORMATOS[campo](texto[inicio:fim].strip())
+    return info
+
+ROUNDS = 15
+
+def measure(variants, transcripts) -> None:
+    """
+    Extract every transcript with each variant and print the median time per call.
+
+    The variants take turns for ROUNDS rounds, so a slow spell of the
+    machine hits all of them alike.
+    """
+    times = {name: [] for name in variants}
+    for _ in range(ROUNDS):
+        for name, extract in variants.items():
+            started = time.perf_counter()
+            for texto in transcripts:
+                extract(texto)
+            times[name].append((time.perf_counter() - started) / len(transcripts))
+    for name, elapsed in times.items():
+        print(f"{name:<12} time/call: {statistics.median(elapsed) * 1000000:8.2f} us")
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    transcripts = make_transcripts(count)
+    for texto in transcripts:
+        assert root_before(texto) == extrair_informacoes(texto), texto
+        assert src_before(texto) == src_after(texto), texto
+
+    print(f"{count} transcrições, mediana de {ROUNDS} rodadas")
+    measure({
+        'root before': root_before,
+        'root after': extrair_informacoes,
+        'src before': src_before,
+        'src after': src_after
+    }, transcripts)
+
+if __name__ == '__main__':
+    main()
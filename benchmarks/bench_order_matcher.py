@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark: process_order with per-synonym/per-product passes vs.
+the compiled matcher.
+
+The "before" path is the previous implementation: one ``str.replace`` per
+synonym, then a substring test and a freshly built regex per product. The
+catalog is the configured one plus synthetic products, to show how each
+path grows with the menu.
+
+Usage:
+    python -m benchmarks.bench_order_matcher [produtos]
+"""
+
+import re
+import sys
+import time
+
+from config.settings import Config
+from services.order_processor import process_order
+
+CALLS = 500
+TEXT = "Boa noite, quero 2 hambúrguer, 3 batata e um refri bem gelado, por favor"
+
+def process_order_before(texto, products, synonyms):
+    """process_order before the change."""
+    itens = []
+    texto = texto.lower()
+    for sin, prod in synonyms.items():
+        texto = texto.replace(sin.lower(), prod.lower())
+    for produto, preco in products.items():
+        produto = produto.lower()
+        if produto in texto:
+            quantidade = 1
+            qtd_match = re.search(rf'(\d+)\s*{produto}', texto)
+            if qtd_match:
+                quantidade = int(qtd_match.group(1))
+            itens.append({"produto": produto, "quantidade": quantidade, "preco": preco})
+    return itens if itens else None
+
+def make_catalog(extra: int):
+    """Configured catalog plus ``extra`` synthetic products with two synonyms each."""
+    products = dict(Config.PRODUCTS)
+    synonyms = dict(Config.SYNONYMS)
+    for i in range(extra):
+        products[f"produto {i}"] = 1.0
+        synonyms[f"item {i}"] = f"produto {i}"
+        synonyms[f"lanche {i}"] = f"produto {i}"
+    return products, synonyms
+
+def measure(name: str, process, products, synonyms) -> None:
+    """Run several calls and print the time per call."""
+    started = time.perf_counter()
+    for _ in range(CALLS):
+        process(TEXT, products, synonyms)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<8} time/call: {elapsed / CALLS * 1000:8.3f} ms")
+
+def main() -> None:
+    sizes = [int(sys.argv[1])] if len(sys.argv) > 1 else [0, 100, 1000]
+    for extra in sizes:
+        products, synonyms = make_catalog(extra)
+        assert process_order_before(TEXT, products, synonyms) == process_order(TEXT, products, synonyms)
+        print(f"{len(products)} produtos, {len(synonyms)} sinônimos")
+        measure('before', process_order_before, products, synonyms)
+        measure('matcher', process_order, products, synonyms)
+
+if __name__ == '__main__':
+    main()
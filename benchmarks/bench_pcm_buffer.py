@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark: list + b''.join recording vs. the preallocated PCMBuffer.
+
+Simulates the AudioManager.record_audio loop with a fake input stream and
+reports, per recorded second, the memory allocated by the recorder itself
+(the chunks returned by the stream are excluded, they exist in both cases).
+
+Usage:
+    python -m benchmarks.bench_pcm_buffer
+"""
+
+import time
+import tracemalloc
+
+from services.audio_clip import AudioClip
+from services.pcm_buffer import PCMBuffer
+
+RATE = 44100
+CHUNK = 1024
+SAMPLE_WIDTH = 2
+DURATION = 10
+TURNS = 20
+
+class FakeStream:
+    """Input stream that returns the same preallocated chunk."""
+
+    def __init__(self):
+        self.data = b'\x01\x00' * CHUNK
+
+    def read(self, frames: int) -> bytes:
+        return self.data
+
+def record_with_list(stream: FakeStream) -> AudioClip:
+    """Recording loop before the change: list of chunks joined twice."""
+    frames = []
+    for _ in range(int(RATE / CHUNK * DURATION)):
+        frames.append(stream.read(CHUNK))
+    wav_frames = b''.join(frames)  # escrita do WAV
+    clip = AudioClip(b''.join(frames), RATE, SAMPLE_WIDTH)
+    del wav_frames
+    return clip
+
+def record_with_buffer(stream: FakeStream, buffer: PCMBuffer) -> AudioClip:
+    """Recording loop after the change: copy into a reused buffer."""
+    buffer.clear()
+    for _ in range(int(RATE / CHUNK * DURATION)):
+        buffer.write(stream.read(CHUNK))
+    return AudioClip(buffer.view(), RATE, SAMPLE_WIDTH)
+
+def measure(name: str, record) -> None:
+    """Run several turns and print allocation and time per recorded second."""
+    seconds = TURNS * DURATION
+
+    # Tempo medido sem o tracemalloc, que encarece cada alocação
+    started = time.perf_counter()
+    for _ in range(TURNS):
+        record()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    allocated = 0
+    peaks = []
+    for _ in range(TURNS):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        clip = record()
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - before
+        peaks.append(peak)
+        del clip
+    tracemalloc.stop()
+
+    print(
+        f"{name:<12} alloc/s: {allocated / seconds / 1024:8.1f} KiB  "
+        f"peak per turn: {min(peaks) / 1024:7.1f}-{max(peaks) / 1024:7.1f} KiB  "
+        f"time/s: {elapsed / seconds * 1e6:7.1f} us"
+    )
+
+def main() -> None:
+    stream = FakeStream()
+    capacity = int(RATE / CHUNK * DURATION) * CHUNK * SAMPLE_WIDTH
+
+    measure('list+join', lambda: record_with_list(stream))
+
+    # O buffer é criado uma vez por AudioManager, fora do laço de turnos
+    buffer = PCMBuffer(capacity)
+    measure('PCMBuffer', lambda: record_with_buffer(stream, buffer))
+
+if __name__ == '__main__':
+    main()
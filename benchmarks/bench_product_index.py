@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark: product resolution by linear search vs. the hash index.
+
+Resolves every mention of a batch of orders against a synthetic catalog
+of 10,000 products with 10 synonyms each (the density of
+``data/global_synonyms.json``). The "before" path is the loop previously
+used by ``src/services/order_processor.process_order``.
+
+Usage:
+    python -m benchmarks.bench_product_index [produtos]
+"""
+
+import random
+import sys
+import time
+
+from services.product_index import ProductIndex
+
+SYNONYMS_PER_PRODUCT = 10
+MENTIONS = 200
+
+def make_catalog(size: int):
+    """Synthetic catalog and its synonyms."""
+    produtos = [{'id': i, 'nome': f'Produto {i}', 'preco': 10.0} for i in range(size)]
+    sinonimos = {
+        f'produto {i}': [f'sinonimo {j} do produto {i}' for j in range(SYNONYMS_PER_PRODUCT)]
+        for i in range(size)
+    }
+    return produtos, sinonimos
+
+def lookup_before(item_nome, produtos, sinonimos):
+    """Linear search used before the change."""
+    for produto in produtos:
+        if item_nome == produto['nome'].lower():
+            return produto
+        if produto['nome'].lower() in sinonimos:
+            if item_nome in sinonimos[produto['nome'].lower()]:
+                return produto
+    return None
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    produtos, sinonimos = make_catalog(size)
+    rng = random.Random(42)
+    mentions = [
+        rng.choice([f'produto {i}', f'sinonimo {rng.randrange(SYNONYMS_PER_PRODUCT)} do produto {i}', 'sobremesa'])
+        for i in (rng.randrange(size) for _ in range(MENTIONS))
+    ]
+
+    started = time.perf_counter()
+    before = [lookup_before(m, produtos, sinonimos) for m in mentions]
+    linear = time.perf_counter() - started
+
+    started = time.perf_counter()
+    indice = ProductIndex(produtos, sinonimos)
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    after = [indice.lookup(m) for m in mentions]
+    hashed = time.perf_counter() - started
+
+    assert before == after
+    print(f"{size} produtos, {len(indice)} nomes e sinônimos, {MENTIONS} menções")
+    print(f"linear       time/mention: {linear / MENTIONS * 1000:10.4f} ms")
+    print(f"index        time/mention: {hashed / MENTIONS * 1000:10.4f} ms")
+    print(f"index build  time (once per catalog version): {build * 1000:.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark: pyttsx3 engine built per request vs. reused per thread.
+
+Simulates the controllers creating a TextToSpeech for every turn: before
+the change each one called ``pyttsx3.init()`` (the previous engine was
+already garbage collected, so a new engine loaded the driver again) and
+set rate and volume; after the change the thread's engine comes from the
+EngineRegistry.
+
+Usage:
+    python -m benchmarks.bench_tts_engine [driver]
+
+Without eSpeak (or another platform driver) the ``dummy`` driver is used,
+which only measures pyttsx3's own overhead.
+"""
+
+import sys
+import time
+
+import pyttsx3
+
+from services.text_to_speech import EngineRegistry
+
+REQUESTS = 200
+RATE = 150
+VOLUME = 0.9
+
+def engine_per_request(driver: str) -> None:
+    """Engine setup before the change."""
+    # Equivale ao pyttsx3.init() depois que o engine da requisição anterior foi coletado
+    engine = pyttsx3.Engine(driver)
+    engine.setProperty('rate', RATE)
+    engine.setProperty('volume', VOLUME)
+
+def engine_from_registry(registry: EngineRegistry) -> None:
+    """Engine setup after the change."""
+    registry.get(RATE, VOLUME)
+
+def measure(name: str, setup) -> None:
+    """Run several requests and print the time per request."""
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        setup()
+    elapsed = time.perf_counter() - started
+    print(f"{name:<12} time/request: {elapsed / REQUESTS * 1000:8.3f} ms")
+
+def main() -> None:
+    driver = sys.argv[1] if len(sys.argv) > 1 else None
+    try:
+        pyttsx3.Engine(driver)
+    except Exception as e:
+        print(f"Driver padrão indisponível ({e}); usando o driver 'dummy'")
+        driver = 'dummy'
+
+    registry = EngineRegistry(driver)
+    measure('per request', lambda: engine_per_request(driver))
+    measure('registry', lambda: engine_from_registry(registry))
+    print(f"engines created by the registry: {registry.created}")
+
+if __name__ == '__main__':
+    main()
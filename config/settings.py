@@ -22,6 +22,21 @@ class Config:
     # Audio settings
     AUDIO_UPLOAD_FOLDER = os.getenv('AUDIO_UPLOAD_FOLDER', os.path.join(TEMP_DIR, 'audio'))
     AUDIO_ALLOWED_EXTENSIONS = {'ogg', 'wav', 'mp3'}
+    AUDIO_SAVE_RECORDINGS = os.getenv('AUDIO_SAVE_RECORDINGS', 'False').lower() == 'true'
+    AUDIO_MAX_DURATION = int(os.getenv('AUDIO_MAX_DURATION', '10'))
+    AUDIO_VAD_SILENCE = float(os.getenv('AUDIO_VAD_SILENCE', '0.8'))  # 0 desativa o VAD
+    AUDIO_TRANSCRIBE_RATE = int(os.getenv('AUDIO_TRANSCRIBE_RATE', '16000'))  # 8000 para telefonia
+    AUDIO_POOL_SIZE = int(os.getenv('AUDIO_POOL_SIZE', '4'))
+    NOISE_PROFILE_TTL = int(os.getenv('NOISE_PROFILE_TTL', '600'))  # segundos até recalibrar um dispositivo ocioso
+    
+    # Transcription settings
+    TRANSCRIBER_BACKEND = os.getenv('TRANSCRIBER_BACKEND', 'google')  # google, vosk ou fake
+    TRANSCRIBER_WORKERS = int(os.getenv('TRANSCRIBER_WORKERS', '2'))
+    TRANSCRIBER_TIMEOUT = float(os.getenv('TRANSCRIBER_TIMEOUT', '30'))
+    TRANSCRIBER_WARM = True
+    # Parciais do Google: uma chamada à API a cada tantos segundos de áudio (o Vosk os dá sempre)
+    TRANSCRIBER_PARTIAL_INTERVAL = float(os.getenv('TRANSCRIBER_PARTIAL_INTERVAL', '1.0'))  # 0 desativa
+    VOSK_MODEL_PATH = os.getenv('VOSK_MODEL_PATH', 'models/vosk-model-small-pt')
     
     # Products and synonyms
     PRODUCTS = {
@@ -39,10 +54,17 @@ class Config:
         "batata": "batata frita",
         "sorvete": "sorvete"
     }
+    SYNONYMS_FILE = os.getenv('SYNONYMS_FILE', os.path.join(BASE_DIR, 'data', 'global_synonyms.json'))
     
     # Speech settings
-    SPEECH_RATE = 150
-    SPEECH_VOLUME = 0.9
+    SPEECH_RATE = int(os.getenv('SPEECH_RATE', '150'))
+    SPEECH_VOLUME = float(os.getenv('SPEECH_VOLUME', '0.9'))
+    TTS_CACHE_FOLDER = os.getenv('TTS_CACHE_FOLDER', os.path.join(TEMP_DIR, 'tts_cache'))  # vazio desativa o disco
+    TTS_CACHE_MAX_BYTES = int(os.getenv('TTS_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+    TTS_CACHE_DISK_MAX_BYTES = int(os.getenv('TTS_CACHE_DISK_MAX_BYTES', str(256 * 1024 * 1024)))  # LRU em disco
+    TTS_MODE = os.getenv('TTS_MODE', 'server')  # 'client': o cliente baixa e reproduz o áudio da resposta
+    TTS_WORKERS = int(os.getenv('TTS_WORKERS', '2'))
+    TTS_JOB_TIMEOUT = int(os.getenv('TTS_JOB_TIMEOUT', '30'))
 
     # Flask settings
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev')
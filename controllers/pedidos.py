@@ -5,13 +5,22 @@ Pedidos controller for handling order-related endpoints.
 
 import json
 import uuid
-import time
 from datetime import datetime
-from flask import Blueprint, request, jsonify, current_app, Response
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Generator, Iterator, Optional
+from flask import Blueprint, request, jsonify, current_app, Response, url_for
 from models.pedido import Pedido, PedidoEstado
 from services.audio_manager import AudioManager
+from services.audio_clip import AudioCapture, streaming_wav_header
+from services.audio_upload import get_uploaded_audio, UnsupportedAudioError
+from services.audio_resources import get_audio_resources
+from services.transcription import TranscriptionError
+from services.transcript import Transcript
 from services.order_processor import process_order, extrair_informacoes
-from services.text_to_speech import TextToSpeech
+from services.speech_jobs import get_speech_jobs, SynthesisError
+from services.prompts import AGRADECIMENTO_NOME, confirmacao_pedido
+from services.text_to_speech import TextToSpeech, create_text_to_speech
+from services.turn_scheduler import TurnScheduler
 from flask import stream_with_context
 from core.database import get_db
 
@@ -30,6 +39,200 @@ def atualizar_estado_pedido(cursor, estado_id: int, **dados) -> None:
     valores = list(dados.values()) + [estado_id]
     cursor.execute(f"UPDATE pedido_estado SET {set_clause} WHERE id = ?", valores)
 
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    """
+    Formata um evento Server-Sent Events.
+    
+    Args:
+        data: Conteúdo do evento, serializado como JSON
+        event: Tipo do evento; sem tipo, o cliente o recebe como ``message``
+        
+    Returns:
+        str: Evento pronto para ser enviado no stream
+    """
+    cabecalho = f"event: {event}\n" if event else ""
+    return f"{cabecalho}data: {json.dumps(data)}\n\n"
+
+def etapa(scheduler: TurnScheduler, stage: str) -> str:
+    """
+    Inicia um estágio do turno e formata o evento SSE correspondente.
+    
+    Args:
+        scheduler: Agendador do turno
+        stage: Nome do estágio
+        
+    Returns:
+        str: Evento ``stage`` pronto para ser enviado no stream
+    """
+    scheduler.begin(stage)
+    return sse_event({"stage": stage}, "stage")
+
+def capturar_audio(audio_manager: AudioManager, scheduler: TurnScheduler) -> AudioCapture:
+    """
+    Obtém o áudio do turno: enviado pelo cliente na requisição ou,
+    na ausência dele, gravado no microfone do servidor.
+    
+    Args:
+        audio_manager: Serviço de áudio da requisição
+        scheduler: Agendador do turno, sinalizado quando o áudio começa a chegar
+        
+    Returns:
+        AudioCapture: Áudio do turno, entregue em blocos à medida que chega
+    """
+    save = current_app.config.get('AUDIO_SAVE_RECORDINGS', False)
+    upload = get_uploaded_audio(request, current_app.config.get('AUDIO_ALLOWED_EXTENSIONS', {'wav'}))
+    
+    if upload:
+        stream, extension = upload
+        capture = audio_manager.capture_upload(stream, extension, save=save)
+        scheduler.signal_capture_ready()
+        return capture
+    
+    # Só abre o microfone depois que a resposta anterior terminou de tocar
+    scheduler.wait_for_playback()
+    print("Aguardando áudio do cliente...")
+    return audio_manager.capture_microphone(
+        duration=current_app.config.get('AUDIO_MAX_DURATION', 10),
+        save=save,
+        silence_duration=current_app.config.get('AUDIO_VAD_SILENCE'),
+        scheduler=scheduler
+    )
+
+def ouvir_cliente(audio_manager: AudioManager, scheduler: TurnScheduler) -> Generator[str, None, Transcript]:
+    """
+    Captura e transcreve a fala do cliente, emitindo eventos de progresso
+    (estágios e transcrições parciais) enquanto o turno acontece.
+    
+    Use com ``yield from``: o valor de retorno é a transcrição final.
+    
+    Args:
+        audio_manager: Serviço de áudio da requisição
+        scheduler: Agendador do turno
+        
+    Returns:
+        Transcript: Texto transcrito (vazio se não houve fala), normalizado uma vez para todo o turno
+    """
+    yield sse_event({"stage": "recording"}, "stage")
+    capture = capturar_audio(audio_manager, scheduler)
+    session = audio_manager.open_transcription(capture)
+    
+    try:
+        for chunk in capture:
+            for partial in session.feed(chunk):
+                yield sse_event({"text": partial}, "partial")
+        
+        yield etapa(scheduler, "transcribing")
+        transcription = session.finish()
+    except TranscriptionError as e:
+        current_app.logger.error(f"Erro na transcrição: {e}")
+        transcription = ""
+    finally:
+        session.close()
+        scheduler.signal_recognition_done()
+    
+    current_app.logger.info(f"Transcrição: {transcription}")
+    yield sse_event({"text": transcription}, "transcription")
+    return Transcript(transcription)
+
+def responder(tts: TextToSpeech, scheduler: TurnScheduler, response_text: str, key: str = "message", **dados) -> Iterator[str]:
+    """
+    Fala a resposta ao cliente e emite o evento final do turno, com o
+    tempo gasto em cada estágio.
+    
+    Com ``TTS_MODE = 'client'`` a resposta não é reproduzida no servidor:
+    a síntese é enfileirada em segundo plano e o evento final traz a
+    ``audio_url`` de onde o cliente baixa o áudio, e a ``audio_stream_url``
+    que o transmite frase a frase.
+    
+    Args:
+        tts: Serviço de síntese de voz
+        scheduler: Agendador do turno
+        response_text: Texto da resposta
+        key: Campo do evento final que recebe o texto (``message`` ou ``error``)
+        **dados: Campos adicionais do evento final
+        
+    Yields:
+        str: Eventos SSE do estágio de fala e da resposta
+    """
+    if current_app.config.get('TTS_MODE') == 'client':
+        job_id = get_speech_jobs().submit(response_text)
+        dados["audio_url"] = url_for('pedidos.obter_audio_resposta', job_id=job_id)
+        dados["audio_stream_url"] = url_for('pedidos.transmitir_audio_resposta', job_id=job_id)
+    else:
+        yield sse_event({"stage": "speaking"}, "stage")
+        scheduler.speak(tts, response_text)
+    
+    timings = scheduler.timings()
+    current_app.logger.info(f"Tempos do turno (ms): {timings}")
+    yield sse_event({key: response_text, **dados, "timings": timings})
+
+@pedidos_bp.route('/audio/resposta/<job_id>', methods=['GET'])
+def obter_audio_resposta(job_id):
+    """
+    Retorna o áudio de uma resposta sintetizada em segundo plano,
+    aguardando a síntese terminar se necessário.
+    
+    Args:
+        job_id: ID informado na ``audio_url`` do evento final do turno
+        
+    Returns:
+        WAV audio, or JSON error
+    """
+    job = get_speech_jobs().get(job_id)
+    if job is None:
+        return jsonify({"error": "Áudio não encontrado."}), 404
+    
+    try:
+        clip = job.result(timeout=current_app.config.get('TTS_JOB_TIMEOUT', 30))
+    except FutureTimeoutError:
+        return jsonify({"error": "O áudio ainda não está pronto."}), 503, {"Retry-After": "1"}
+    except Exception as e:
+        current_app.logger.error(f"Erro ao sintetizar a resposta: {e}")
+        clip = None
+    
+    if clip is None:
+        return jsonify({"error": "Não foi possível gerar o áudio da resposta."}), 500
+    
+    return Response(clip.to_wav_bytes(), mimetype='audio/wav', headers={"Cache-Control": "private, max-age=300"})
+
+@pedidos_bp.route('/audio/resposta/<job_id>/stream', methods=['GET'])
+def transmitir_audio_resposta(job_id):
+    """
+    Transmite o áudio de uma resposta frase a frase: cada trecho é enviado
+    assim que sintetizado, enquanto os seguintes ainda são gerados.
+    
+    Args:
+        job_id: ID informado na ``audio_stream_url`` do evento final do turno
+        
+    Returns:
+        Chunked WAV audio, or JSON error
+    """
+    job = get_speech_jobs().get(job_id)
+    if job is None:
+        return jsonify({"error": "Áudio não encontrado."}), 404
+    
+    timeout = current_app.config.get('TTS_JOB_TIMEOUT', 30)
+    clips = job.iter_clips(timeout)
+    
+    # Aguarda a primeira frase antes de responder, para ainda poder retornar um erro
+    try:
+        first = next(clips)
+    except (StopIteration, FutureTimeoutError, SynthesisError) as e:
+        current_app.logger.error(f"Erro ao sintetizar a resposta: {e}")
+        return jsonify({"error": "Não foi possível gerar o áudio da resposta."}), 500
+    
+    @stream_with_context
+    def generate():
+        yield streaming_wav_header(first.sample_rate, first.sample_width, first.channels)
+        yield bytes(first.frames)
+        try:
+            for clip in clips:
+                yield bytes(clip.resample(first.sample_rate, first.channels).frames)
+        except (FutureTimeoutError, SynthesisError) as e:
+            current_app.logger.error(f"Erro ao sintetizar a resposta: {e}")
+    
+    return Response(generate(), mimetype='audio/wav')
+
 @pedidos_bp.route('/audio/conversa/nova', methods=['POST'])
 def iniciar_conversa():
     """
@@ -43,6 +246,8 @@ def iniciar_conversa():
         
     db = get_db()
     cursor = db.cursor()
+    audio_resources = get_audio_resources()
+    audio_manager = audio_resources.acquire()
 
     try:
         # Gera um ID único para a conversa
@@ -57,37 +262,36 @@ def iniciar_conversa():
         db.commit()
 
         # Inicializa os serviços
-        tts = TextToSpeech()
-        audio_manager = AudioManager(
-            upload_folder=current_app.config.get('AUDIO_UPLOAD_FOLDER', 'uploads')
-        )
+        tts = create_text_to_speech()
+        scheduler = TurnScheduler()
 
-        # Reproduz a mensagem de boas-vindas
+        # Reproduz a mensagem de boas-vindas; a gravação começa quando ela termina
         response_text = "Bem-vindo ao OrderByVoice! Por favor, informe seu nome e número de telefone."
-        tts.speak(response_text)
-        time.sleep(1)  # Pequeno delay após o TTS
+        scheduler.speak(tts, response_text)
 
         # Aguarda a resposta do usuário
         print("Aguardando resposta do usuário...")
-        transcription = audio_manager.process_audio(duration=10)
+        max_duration = current_app.config.get('AUDIO_MAX_DURATION', 10)
+        silence_duration = current_app.config.get('AUDIO_VAD_SILENCE')
+        transcription = audio_manager.process_audio(max_duration, silence_duration, scheduler)
         
         if not transcription:
             response_text = "Desculpe, não consegui entender. Pode repetir por favor?"
-            tts.speak(response_text)
-            time.sleep(1)
-            transcription = audio_manager.process_audio(duration=10)
+            scheduler.speak(tts, response_text)
+            transcription = audio_manager.process_audio(max_duration, silence_duration, scheduler)
             if not transcription:
                 return jsonify({"error": "Não foi possível entender o áudio."}), 400
 
         # Extrai informações do áudio
+        scheduler.begin("parsing")
+        transcription = Transcript(transcription)
         informacoes = extrair_informacoes(transcription)
         telefone = informacoes.get("telefone")
         nome = informacoes.get("nome")
 
         if not telefone:
             response_text = "Por favor, informe seu número de telefone para começarmos."
-            tts.speak(response_text)
-            time.sleep(1)
+            scheduler.speak(tts, response_text)
             return jsonify({"error": "Número de telefone não fornecido."}), 400
 
         # Atualiza o estado com as informações do cliente
@@ -99,26 +303,31 @@ def iniciar_conversa():
 
         # Responde ao cliente
         if nome:
-            response_text = f"Obrigado, {nome}. Agora, informe seu endereço completo."
+            response_text = AGRADECIMENTO_NOME.fill(nome=nome)
         else:
             response_text = "Agora, informe seu endereço completo."
         
-        tts.speak(response_text)
-        time.sleep(1)
+        scheduler.speak(tts, response_text)
 
+        timings = scheduler.timings()
+        current_app.logger.info(f"Tempos do turno (ms): {timings}")
         return jsonify({
             "chat_id": chat_id,
             "message": response_text,
             "cliente": {
                 "nome": nome,
                 "telefone": telefone
-            }
+            },
+            "timings": timings
         }), 200
 
     except Exception as e:
         current_app.logger.error(f"Erro ao iniciar conversa: {e}")
         return jsonify({"error": "Não foi possível iniciar a conversa."}), 500
 
+    finally:
+        audio_resources.release(audio_manager)
+
 @pedidos_bp.route('/audio/conversa', methods=['POST'])
 def conversa_interativa():
     """
@@ -133,40 +342,24 @@ def conversa_interativa():
     
     @stream_with_context
     def generate():
-            audio_manager = AudioManager(
-                upload_folder=current_app.config.get('AUDIO_UPLOAD_FOLDER', 'uploads')
-            )
-            tts = TextToSpeech()
+            audio_resources = get_audio_resources()
+            audio_manager = audio_resources.acquire()
+            tts = create_text_to_speech()
+            scheduler = TurnScheduler()
             db = get_db()
             cursor = db.cursor()
 
             try:
-                # 1. Aguarda o áudio do cliente
-                print("Aguardando áudio do cliente...")
-                
-                # 2. Grava o áudio
-                audio_data, filename = audio_manager.record_audio(duration=10)
-                print("Áudio gravado com sucesso")
-                
-                # 3. Salva o áudio temporariamente
-                filepath = audio_manager.save_audio(audio_data, filename)
-                print(f"Áudio salvo em: {filepath}")
-                
-                # 4. Transcreve o áudio
-                transcription = audio_manager.process_audio(duration=10)
-                current_app.logger.info(f"Transcrição: {transcription}")
-                
-                # 5. Limpa o arquivo temporário
-                audio_manager.delete_audio(filename)
+                # 1. Recebe e transcreve o áudio do cliente, emitindo parciais
+                transcription = yield from ouvir_cliente(audio_manager, scheduler)
                 
                 if not transcription:
                     response_text = "Desculpe, não consegui entender. Pode repetir por favor?"
-                    tts.speak(response_text)
-                    time.sleep(1)
-                    yield json.dumps({"message": response_text}) + "\n"
+                    yield from responder(tts, scheduler, response_text)
                     return
 
-                # 6. Extrai informações do áudio
+                # 2. Extrai informações do áudio
+                yield etapa(scheduler, "parsing")
                 informacoes = extrair_informacoes(transcription)
                 telefone = informacoes.get("telefone")
                 nome = informacoes.get("nome")
@@ -174,12 +367,10 @@ def conversa_interativa():
 
                 if not telefone:
                     response_text = "Por favor, informe seu número de telefone para começarmos."
-                    tts.speak(response_text)
-                    time.sleep(1)
-                    yield json.dumps({"message": response_text}) + "\n"
+                    yield from responder(tts, scheduler, response_text)
                     return
 
-                # 7. Busca o estado atual da conversa
+                # 3. Busca o estado atual da conversa
                 cursor.execute(
                     "SELECT * FROM pedido_estado WHERE cliente_telefone = ? AND status NOT IN ('finalizado', 'cancelado')",
                     (telefone,)
@@ -194,45 +385,37 @@ def conversa_interativa():
                         (telefone,)
                     )
                     db.commit()
-                    tts.speak(response_text)
-                    time.sleep(1)
-                    yield json.dumps({"message": response_text}) + "\n"
+                    yield from responder(tts, scheduler, response_text)
                     return
 
-                # 8. Determina o estado atual e o próximo passo
+                # 4. Determina o estado atual e o próximo passo
                 estado_id = estado[0]
                 status = estado[3]  # Coluna `status`
 
                 if status == "iniciado":
                     if not nome:
                         response_text = "Por favor, diga seu nome para continuar."
-                        tts.speak(response_text)
-                        time.sleep(1)
-                        yield json.dumps({"message": response_text}) + "\n"
+                        yield from responder(tts, scheduler, response_text)
                         return
 
-                    # 9. Atualiza o estado com o nome do cliente
+                    # 5. Atualiza o estado com o nome do cliente
                     cursor.execute(
                         "UPDATE pedido_estado SET cliente_nome = ?, status = 'aguardando_endereco' WHERE id = ?",
                         (nome, estado_id)
                     )
                     db.commit()
 
-                    response_text = f"Obrigado, {nome}. Agora, informe seu endereço completo."
-                    tts.speak(response_text)
-                    time.sleep(1)
-                    yield json.dumps({"message": response_text}) + "\n"
+                    response_text = AGRADECIMENTO_NOME.fill(nome=nome)
+                    yield from responder(tts, scheduler, response_text)
                     return
 
                 if status == "aguardando_endereco":
                     if not endereco:
                         response_text = "Desculpe, não consegui entender seu endereço. Pode repetir?"
-                        tts.speak(response_text)
-                        time.sleep(1)
-                        yield json.dumps({"message": response_text}) + "\n"
+                        yield from responder(tts, scheduler, response_text)
                         return
 
-                    # 10. Atualiza o estado com o endereço
+                    # 6. Atualiza o estado com o endereço
                     cursor.execute(
                         "UPDATE pedido_estado SET cliente_endereco = ?, status = 'em_progresso' WHERE id = ?",
                         (endereco, estado_id)
@@ -240,48 +423,37 @@ def conversa_interativa():
                     db.commit()
 
                     response_text = "Endereço confirmado! Agora, qual é o seu pedido?"
-                    tts.speak(response_text)
-                    time.sleep(1)
-                    yield json.dumps({"message": response_text}) + "\n"
+                    yield from responder(tts, scheduler, response_text)
                     return
 
                 if status == "em_progresso":
-                    # 11. Processa o pedido
+                    # 7. Processa o pedido
                     products = current_app.config.get('PRODUCTS', {})
                     synonyms = current_app.config.get('SYNONYMS', {})
-                    pedido_processado = process_order(transcription, products, synonyms)
+                    pedido_processado = process_order(transcription, products, synonyms, current_app.config.get('SYNONYMS_FILE'))
 
                     if not pedido_processado:
                         response_text = "Não consegui identificar os itens do seu pedido. Pode repetir, por favor?"
-                        tts.speak(response_text)
-                        time.sleep(1)
-                        yield json.dumps({"message": response_text}) + "\n"
+                        yield from responder(tts, scheduler, response_text)
                         return
 
-                    # 12. Atualiza o estado com os itens do pedido
+                    # 8. Atualiza o estado com os itens do pedido
                     cursor.execute(
                         "UPDATE pedido_estado SET itens = ?, status = 'aguardando_confirmacao' WHERE id = ?",
                         (json.dumps(pedido_processado), estado_id)
                     )
                     db.commit()
 
-                    # 13. Formata a mensagem de confirmação
-                    itens_texto = ", ".join([f"{item['quantidade']} {item['produto']}" for item in pedido_processado])
+                    # 9. Formata a mensagem de confirmação
                     total = sum(item['quantidade'] * item['preco'] for item in pedido_processado)
                     
-                    response_text = f"Confirmando seu pedido: {itens_texto}. Total: R$ {total:.2f}. Deseja confirmar ou fazer alterações?"
-                    tts.speak(response_text)
-                    time.sleep(1)
-                    yield json.dumps({
-                        "message": response_text,
-                        "itens": pedido_processado,
-                        "total": total
-                    }) + "\n"
+                    response_text = confirmacao_pedido(pedido_processado, total)
+                    yield from responder(tts, scheduler, response_text, itens=pedido_processado, total=total)
                     return
 
                 if status == "aguardando_confirmacao":
-                    if "confirmar" in transcription.lower():
-                        # 14. Finaliza o pedido
+                    if "confirmar" in transcription.folded:
+                        # 10. Finaliza o pedido
                         cursor.execute(
                             "UPDATE pedido_estado SET status = 'finalizado' WHERE id = ?",
                             (estado_id,)
@@ -289,20 +461,23 @@ def conversa_interativa():
                         db.commit()
 
                         response_text = "Pedido confirmado com sucesso! Obrigado por usar nossos serviços."
-                        tts.speak(response_text)
-                        time.sleep(1)
-                        yield json.dumps({"message": response_text}) + "\n"
+                        yield from responder(tts, scheduler, response_text)
                         return
 
                     response_text = "Você deseja confirmar o pedido ou adicionar mais itens?"
-                    tts.speak(response_text)
-                    time.sleep(1)
-                    yield json.dumps({"message": response_text}) + "\n"
+                    yield from responder(tts, scheduler, response_text)
                     return
 
+            except UnsupportedAudioError as e:
+                current_app.logger.warning(f"Áudio enviado inválido: {e}")
+                yield sse_event({"error": str(e)})
+
             except Exception as e:
                 current_app.logger.error(f"Erro ao processar conversa: {e}")
-                yield json.dumps({"error": "Ocorreu um erro durante o processamento do áudio."}) + "\n"
+                yield sse_event({"error": "Ocorreu um erro durante o processamento do áudio."})
+
+            finally:
+                audio_resources.release(audio_manager)
 
     return Response(generate(), mimetype='text/event-stream')
 
@@ -319,11 +494,11 @@ def continuar_conversa(chat_id):
     """
     @stream_with_context
     def generate():
-        # Inicializa os serviços com as configurações corretas
-        audio_manager = AudioManager(
-            upload_folder=current_app.config.get('AUDIO_UPLOAD_FOLDER', 'uploads')
-        )
-        tts = TextToSpeech()
+        # Obtém os serviços de áudio compartilhados pelo worker
+        audio_resources = get_audio_resources()
+        audio_manager = audio_resources.acquire()
+        tts = create_text_to_speech()
+        scheduler = TurnScheduler()
         db = get_db()
         cursor = db.cursor()
 
@@ -337,53 +512,33 @@ def continuar_conversa(chat_id):
 
             if not estado:
                 response_text = "Desculpe, não encontrei uma conversa ativa com este ID."
-                tts.speak(response_text)
-                time.sleep(1)
-                yield json.dumps({"error": response_text}) + "\n"
+                yield from responder(tts, scheduler, response_text, key="error")
                 return
 
-            # 2. Aguarda o áudio do cliente
-            print("Aguardando áudio do cliente...")
-            
-            # 3. Grava o áudio
-            audio_data, filename = audio_manager.record_audio(duration=10)
-            print("Áudio gravado com sucesso")
-            
-            # 4. Salva o áudio temporariamente
-            filepath = audio_manager.save_audio(audio_data, filename)
-            print(f"Áudio salvo em: {filepath}")
-            
-            # 5. Transcreve o áudio
-            transcription = audio_manager.process_audio(duration=10)
-            current_app.logger.info(f"Transcrição: {transcription}")
-            
-            # 6. Limpa o arquivo temporário
-            audio_manager.delete_audio(filename)
+            # 2. Recebe e transcreve o áudio do cliente, emitindo parciais
+            transcription = yield from ouvir_cliente(audio_manager, scheduler)
             
             if not transcription:
                 response_text = "Desculpe, não consegui entender. Pode repetir por favor?"
-                tts.speak(response_text)
-                time.sleep(1)
-                yield json.dumps({"message": response_text}) + "\n"
+                yield from responder(tts, scheduler, response_text)
                 return
 
-            # 7. Extrai informações do áudio
+            # 3. Extrai informações do áudio
+            yield etapa(scheduler, "parsing")
             informacoes = extrair_informacoes(transcription)
             endereco = informacoes.get("endereco")
 
-            # 8. Determina o estado atual e o próximo passo
+            # 4. Determina o estado atual e o próximo passo
             estado_id = estado[0]
             status = estado[3]  # Coluna `status`
 
             if status == "aguardando_endereco":
                 if not endereco:
                     response_text = "Desculpe, não consegui entender seu endereço. Pode repetir?"
-                    tts.speak(response_text)
-                    time.sleep(1)
-                    yield json.dumps({"message": response_text}) + "\n"
+                    yield from responder(tts, scheduler, response_text)
                     return
 
-                # 9. Atualiza o estado com o endereço
+                # 5. Atualiza o estado com o endereço
                 cursor.execute(
                     "UPDATE pedido_estado SET cliente_endereco = ?, status = 'em_progresso' WHERE id = ?",
                     (endereco, estado_id)
@@ -391,48 +546,37 @@ def continuar_conversa(chat_id):
                 db.commit()
 
                 response_text = "Endereço confirmado! Agora, qual é o seu pedido?"
-                tts.speak(response_text)
-                time.sleep(1)
-                yield json.dumps({"message": response_text}) + "\n"
+                yield from responder(tts, scheduler, response_text)
                 return
 
             if status == "em_progresso":
-                # 10. Processa o pedido
+                # 6. Processa o pedido
                 products = current_app.config.get('PRODUCTS', {})
                 synonyms = current_app.config.get('SYNONYMS', {})
-                pedido_processado = process_order(transcription, products, synonyms)
+                pedido_processado = process_order(transcription, products, synonyms, current_app.config.get('SYNONYMS_FILE'))
 
                 if not pedido_processado:
                     response_text = "Não consegui identificar os itens do seu pedido. Pode repetir, por favor?"
-                    tts.speak(response_text)
-                    time.sleep(1)
-                    yield json.dumps({"message": response_text}) + "\n"
+                    yield from responder(tts, scheduler, response_text)
                     return
 
-                # 11. Atualiza o estado com os itens do pedido
+                # 7. Atualiza o estado com os itens do pedido
                 cursor.execute(
                     "UPDATE pedido_estado SET itens = ?, status = 'aguardando_confirmacao' WHERE id = ?",
                     (json.dumps(pedido_processado), estado_id)
                 )
                 db.commit()
 
-                # 12. Formata a mensagem de confirmação
-                itens_texto = ", ".join([f"{item['quantidade']} {item['produto']}" for item in pedido_processado])
+                # 8. Formata a mensagem de confirmação
                 total = sum(item['quantidade'] * item['preco'] for item in pedido_processado)
                 
-                response_text = f"Confirmando seu pedido: {itens_texto}. Total: R$ {total:.2f}. Deseja confirmar ou fazer alterações?"
-                tts.speak(response_text)
-                time.sleep(1)
-                yield json.dumps({
-                    "message": response_text,
-                    "itens": pedido_processado,
-                    "total": total
-                }) + "\n"
+                response_text = confirmacao_pedido(pedido_processado, total)
+                yield from responder(tts, scheduler, response_text, itens=pedido_processado, total=total)
                 return
 
             if status == "aguardando_confirmacao":
-                if "confirmar" in transcription.lower():
-                    # 13. Finaliza o pedido
+                if "confirmar" in transcription.folded:
+                    # 9. Finaliza o pedido
                     cursor.execute(
                         "UPDATE pedido_estado SET status = 'finalizado' WHERE id = ?",
                         (estado_id,)
@@ -440,19 +584,22 @@ def continuar_conversa(chat_id):
                     db.commit()
 
                     response_text = "Pedido confirmado com sucesso! Obrigado por usar nossos serviços."
-                    tts.speak(response_text)
-                    time.sleep(1)
-                    yield json.dumps({"message": response_text}) + "\n"
+                    yield from responder(tts, scheduler, response_text)
                     return
 
                 response_text = "Você deseja confirmar o pedido ou adicionar mais itens?"
-                tts.speak(response_text)
-                time.sleep(1)
-                yield json.dumps({"message": response_text}) + "\n"
+                yield from responder(tts, scheduler, response_text)
                 return
 
+        except UnsupportedAudioError as e:
+            current_app.logger.warning(f"Áudio enviado inválido: {e}")
+            yield sse_event({"error": str(e)})
+
         except Exception as e:
             current_app.logger.error(f"Erro ao processar conversa: {e}")
-            yield json.dumps({"error": "Ocorreu um erro durante o processamento do áudio."}) + "\n"
+            yield sse_event({"error": "Ocorreu um erro durante o processamento do áudio."})
+
+        finally:
+            audio_resources.release(audio_manager)
 
     return Response(generate(), mimetype='text/event-stream') 
\ No newline at end of file
@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+"""
+In-memory audio clip shared between the recording and transcription stages.
+"""
+
+import io
+import os
+import struct
+import wave
+from datetime import datetime
+from typing import Generator, List, Optional
+
+import speech_recognition as sr
+
+from .vad import rms
+
+try:
+    import audioop
+except ImportError:  # Removido da biblioteca padrão no Python 3.13
+    audioop = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class AudioClip:
+    """Raw PCM audio captured once and handed to the next stage of the turn."""
+
+    def __init__(
+        self,
+        frames: bytes,
+        sample_rate: int,
+        sample_width: int = 2,
+        channels: int = 1,
+        filename: Optional[str] = None,
+        trimmed: float = 0.0
+    ):
+        """
+        Initialize the AudioClip.
+
+        Args:
+            frames: Raw PCM frames (little-endian, interleaved); any
+                bytes-like object, including a memoryview of the recorder buffer
+            sample_rate: Sample rate in Hz
+            sample_width: Bytes per sample
+            channels: Number of channels
+            filename: Name of the WAV file on disk, if the clip was saved
+            trimmed: Seconds of the capture window skipped by endpointing
+        """
+        self.frames = frames
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.channels = channels
+        self.filename = filename
+        self.trimmed = trimmed
+
+    @property
+    def duration(self) -> float:
+        """Duration of the clip in seconds."""
+        frame_size = self.sample_width * self.channels
+        return len(self.frames) / float(frame_size * self.sample_rate)
+
+    def resample(self, sample_rate: int, channels: int = 1) -> 'AudioClip':
+        """
+        Convert the clip to a lower sample rate and channel count.
+
+        Speech recognizers only need 16 kHz (or 8 kHz) mono, so shrinking
+        the clip before transcription cuts the bytes sent to the backend.
+        The conversion runs in C via ``audioop``, or NumPy when ``audioop``
+        is not available.
+
+        Args:
+            sample_rate: Target sample rate in Hz
+            channels: Target channel count (1 downmixes to mono)
+
+        Returns:
+            AudioClip: Converted clip, or this clip if nothing changes
+        """
+        if sample_rate == self.sample_rate and channels == self.channels:
+            return self
+
+        if audioop is not None:
+            frames = self.frames
+            if self.channels == 2 and channels == 1:
+                frames = audioop.tomono(frames, self.sample_width, 0.5, 0.5)
+            frames, _ = audioop.ratecv(
+                frames, self.sample_width, channels,
+                self.sample_rate, sample_rate, None
+            )
+        elif np is not None and self.sample_width == 2:
+            samples = np.frombuffer(self.frames, dtype='<i2').reshape(-1, self.channels).astype(np.float64)
+            if channels == 1 and self.channels > 1:
+                samples = samples.mean(axis=1, keepdims=True)
+            count = int(len(samples) * sample_rate / self.sample_rate)
+            positions = np.arange(count) * (self.sample_rate / sample_rate)
+            source = np.arange(len(samples))
+            resampled = np.column_stack([
+                np.interp(positions, source, samples[:, c]) for c in range(samples.shape[1])
+            ])
+            frames = np.round(resampled).astype('<i2').tobytes()
+        else:
+            return self
+
+        return AudioClip(
+            frames,
+            sample_rate=sample_rate,
+            sample_width=self.sample_width,
+            channels=channels,
+            filename=self.filename,
+            trimmed=self.trimmed
+        )
+
+    def trim_silence(self, threshold: float = 200.0, padding: float = 0.03, window: float = 0.01) -> 'AudioClip':
+        """
+        Remove leading and trailing silence, keeping a short padding.
+
+        Args:
+            threshold: RMS energy below which a window counts as silence
+            padding: Seconds of silence kept at each end
+            window: Length in seconds of the analysis windows
+
+        Returns:
+            AudioClip: Trimmed clip, or this clip if there is nothing to trim
+        """
+        frame_size = self.sample_width * self.channels
+        step = max(1, int(self.sample_rate * window)) * frame_size
+        frames = memoryview(self.frames).cast('B')
+        voiced = [
+            offset for offset in range(0, len(frames), step)
+            if rms(frames[offset:offset + step], self.sample_width) >= threshold
+        ]
+        if not voiced:
+            return self
+
+        pad = int(self.sample_rate * padding) * frame_size
+        start = max(0, voiced[0] - pad)
+        end = min(len(frames), voiced[-1] + step + pad)
+        if start == 0 and end == len(frames):
+            return self
+        return AudioClip(bytes(frames[start:end]), self.sample_rate, self.sample_width, self.channels)
+
+    @classmethod
+    def concat(cls, clips: List['AudioClip']) -> 'AudioClip':
+        """
+        Join clips of the same format into a single clip.
+
+        Args:
+            clips: Clips to be played one after the other
+
+        Returns:
+            AudioClip: Clip with the frames of every clip in order
+
+        Raises:
+            ValueError: If the clips do not share sample rate, width and channels
+        """
+        first = clips[0]
+        audio_format = (first.sample_rate, first.sample_width, first.channels)
+        if any((c.sample_rate, c.sample_width, c.channels) != audio_format for c in clips):
+            raise ValueError("Os trechos de áudio têm formatos diferentes.")
+        return cls(b''.join(bytes(c.frames) for c in clips), *audio_format)
+
+    def to_audio_data(self) -> sr.AudioData:
+        """
+        Convert the clip to the format expected by the speech recognizer.
+
+        Returns:
+            sr.AudioData: Audio data ready for transcription
+        """
+        return sr.AudioData(bytes(self.frames), self.sample_rate, self.sample_width)
+
+    def to_wav_bytes(self) -> bytes:
+        """
+        Encode the clip as a WAV file in memory.
+
+        Returns:
+            bytes: WAV file contents
+        """
+        buffer = io.BytesIO()
+        self._write_wav(buffer)
+        return buffer.getvalue()
+
+    def save(self, folder: str, filename: Optional[str] = None) -> str:
+        """
+        Write the clip to disk as a WAV file.
+
+        Args:
+            folder: Folder where the file will be written
+            filename: Optional filename, will generate one if not provided
+
+        Returns:
+            str: Path to the saved audio file
+        """
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"audio_{timestamp}.wav"
+
+        filepath = os.path.join(folder, filename)
+        with open(filepath, 'wb') as f:
+            self._write_wav(f)
+
+        self.filename = filename
+        return filepath
+
+    @classmethod
+    def from_wav(cls, source) -> 'AudioClip':
+        """
+        Read a WAV file into memory.
+
+        Args:
+            source: Path or binary file object of the WAV file
+
+        Returns:
+            AudioClip: Decoded PCM audio
+
+        Raises:
+            wave.Error: If the file is not a valid PCM WAV
+        """
+        wf = wave.open(source, 'rb')
+        try:
+            return cls(
+                wf.readframes(wf.getnframes()),
+                sample_rate=wf.getframerate(),
+                sample_width=wf.getsampwidth(),
+                channels=wf.getnchannels()
+            )
+        finally:
+            wf.close()
+
+    def _write_wav(self, fileobj) -> None:
+        """Write the WAV header and frames to a file object."""
+        wf = wave.open(fileobj, 'wb')
+        wf.setnchannels(self.channels)
+        wf.setsampwidth(self.sample_width)
+        wf.setframerate(self.sample_rate)
+        wf.writeframes(self.frames)
+        wf.close()
+
+def streaming_wav_header(sample_rate: int, sample_width: int = 2, channels: int = 1) -> bytes:
+    """
+    WAV header for audio whose length is not known yet.
+
+    The RIFF and data sizes are set to the maximum value, which players
+    treat as "read until the end of the stream".
+
+    Args:
+        sample_rate: Sample rate in Hz
+        sample_width: Bytes per sample
+        channels: Number of channels
+
+    Returns:
+        bytes: 44-byte header to be followed by raw PCM frames
+    """
+    block_align = sample_width * channels
+    return b''.join([
+        b'RIFF', struct.pack('<I', 0xFFFFFFFF), b'WAVE',
+        b'fmt ', struct.pack('<IHHIIHH', 16, 1, channels, sample_rate, sample_rate * block_align, block_align, sample_width * 8),
+        b'data', struct.pack('<I', 0xFFFFFFFF - 36)
+    ])
+
+class Resampler:
+    """Incremental counterpart of ``AudioClip.resample`` for audio arriving in chunks."""
+
+    def __init__(self, from_rate: int, to_rate: int, sample_width: int = 2, channels: int = 1):
+        """
+        Initialize the resampler.
+
+        Args:
+            from_rate: Sample rate of the incoming chunks in Hz
+            to_rate: Sample rate of the output in Hz
+            sample_width: Bytes per sample
+            channels: Channel count of the incoming chunks (output is mono)
+        """
+        self.from_rate = from_rate
+        self.to_rate = to_rate
+        self.sample_width = sample_width
+        self.channels = channels
+        self._state = None
+
+    def convert(self, chunk: bytes) -> bytes:
+        """
+        Convert the next chunk, carrying the filter state across chunks.
+
+        Args:
+            chunk: Raw PCM data at ``from_rate``
+
+        Returns:
+            bytes: Mono PCM data at ``to_rate``
+        """
+        if self.from_rate == self.to_rate and self.channels == 1:
+            return chunk
+
+        if audioop is None:
+            clip = AudioClip(chunk, self.from_rate, self.sample_width, self.channels)
+            return clip.resample(self.to_rate).frames
+
+        if self.channels == 2:
+            chunk = audioop.tomono(chunk, self.sample_width, 0.5, 0.5)
+        converted, self._state = audioop.ratecv(
+            chunk, self.sample_width, 1,
+            self.from_rate, self.to_rate, self._state
+        )
+        return converted
+
+class AudioCapture:
+    """
+    Audio delivered chunk by chunk while it is recorded or uploaded.
+
+    Iterating yields the PCM chunks as they arrive, so later stages can
+    start before the caller finishes; once exhausted, ``clip`` holds the
+    whole recording (None if the producer streamed it without keeping
+    it). The producer is a generator that returns the clip.
+    """
+
+    def __init__(
+        self,
+        chunks: Generator[bytes, None, AudioClip],
+        sample_rate: int,
+        sample_width: int = 2,
+        channels: int = 1
+    ):
+        """
+        Initialize the capture.
+
+        Args:
+            chunks: Generator yielding PCM chunks and returning the clip
+            sample_rate: Sample rate in Hz
+            sample_width: Bytes per sample
+            channels: Number of channels
+        """
+        self._chunks = chunks
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.channels = channels
+        self.clip: Optional[AudioClip] = None
+
+    def __iter__(self):
+        if self.clip is None:
+            self.clip = yield from self._chunks
+
+    def read_all(self) -> AudioClip:
+        """
+        Consume the remaining chunks.
+
+        Returns:
+            AudioClip: The complete recording
+        """
+        for _ in self:
+            pass
+        return self.clip
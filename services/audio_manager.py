@@ -4,34 +4,75 @@ Audio management service for handling voice recordings and processing.
 """
 
 import os
-import wave
-import pyaudio
 import speech_recognition as sr
-import time
-from typing import Optional, Tuple
+from typing import BinaryIO, Generator, Optional
 from datetime import datetime
 
+from .audio_clip import AudioCapture, AudioClip
+from .audio_upload import open_uploaded_audio
+from .noise_profiles import NoiseProfileCache
+from .pcm_buffer import PCMBuffer
+from .transcription import GoogleTranscriber, TranscriptionError, TranscriptionPool, TranscriptionStream
+from .turn_scheduler import TurnScheduler
+from .vad import EnergyVAD
+
+try:
+    import pyaudio
+except ImportError:  # Servidor sem placa de som: apenas áudio enviado pelo cliente
+    pyaudio = None
+
 class AudioManager:
     """Service for managing audio files and recordings."""
     
-    def __init__(self, upload_folder: str):
+    def __init__(
+        self,
+        upload_folder: str,
+        language: str = 'pt-BR',
+        transcribe_rate: Optional[int] = None,
+        transcriber: Optional[TranscriptionPool] = None,
+        audio=None,
+        noise_profiles: Optional[NoiseProfileCache] = None
+    ):
         """
         Initialize the AudioManager.
         
         Args:
             upload_folder: Path to the folder where audio files will be stored
+            language: Language code for speech recognition
+            transcribe_rate: Sample rate (Hz) sent to the speech recognizer,
+                defaults to the rate of the transcription backend
+            transcriber: Shared transcription pool; without one, a private
+                single-worker Google pool is created and shut down by ``close``
+            audio: Shared PyAudio instance; without one, this manager
+                creates (and terminates) its own
+            noise_profiles: Shared noise calibration cache; with one, the
+                VAD starts from the device's profile instead of calibrating
         """
         self.upload_folder = upload_folder
+        self.language = language
         if not os.path.exists(upload_folder):
             os.makedirs(upload_folder)
         
+        self._owns_transcriber = transcriber is None
+        if transcriber is None:
+            transcriber = TranscriptionPool(lambda: GoogleTranscriber(language=language), max_workers=1)
+        self.transcriber = transcriber
+        self.transcribe_rate = transcribe_rate or transcriber.sample_rate
+        
         # Configurações de áudio
-        self.format = pyaudio.paInt16
+        self.format = pyaudio.paInt16 if pyaudio else None
+        self.sample_width = 2
         self.channels = 1
         self.rate = 44100
         self.chunk = 1024
-        self.audio = pyaudio.PyAudio()
+        self._owns_audio = audio is None
+        if audio is None and pyaudio:
+            audio = pyaudio.PyAudio()
+        self.audio = audio
         self.recognizer = sr.Recognizer()
+        self.buffer: Optional[PCMBuffer] = None
+        self.noise_profiles = noise_profiles
+        self.device_key = 'default'
     
     def listen_until_silence(self, timeout: int = 5, phrase_time_limit: int = 10) -> Optional[str]:
         """
@@ -48,7 +89,7 @@ class AudioManager:
             print("Aguardando você começar a falar...")
             try:
                 audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
-                text = self.recognizer.recognize_google(audio, language='pt-BR')
+                text = self.recognizer.recognize_google(audio, language=self.language)
                 print(f"Texto transcrito: {text}")
                 return text
             except sr.WaitTimeoutError:
@@ -61,26 +102,87 @@ class AudioManager:
                 print(f"Erro de conexão com o serviço: {e}")
                 return None
     
-    def process_audio(self, duration: int = 10) -> str:
+    def process_audio(
+        self,
+        duration: int = 10,
+        silence_duration: Optional[float] = None,
+        scheduler: Optional[TurnScheduler] = None
+    ) -> str:
+        """
+        Grava a fala do usuário uma única vez e transcreve o mesmo áudio.
+        
+        Args:
+            duration: Duração máxima da gravação (em segundos)
+            silence_duration: Silêncio (em segundos) que encerra a gravação
+            scheduler: Agendador do turno; a gravação começa assim que a
+                resposta em reprodução termina, sem espera fixa
+            
+        Returns:
+            Texto transcrito ou string vazia
         """
-        Aguarda o usuário começar a falar e transcreve o áudio automaticamente.
+        if scheduler:
+            scheduler.wait_for_playback()
+        
+        clip = self.capture_microphone(duration, silence_duration=silence_duration, scheduler=scheduler).read_all()
+        text = self.transcribe(clip)
+        
+        if scheduler:
+            scheduler.signal_recognition_done()
+        return text
+    
+    def record_audio(self, duration: int, save: bool = False, silence_duration: Optional[float] = None) -> AudioClip:
         """
-        print("Aguardando 2 segundos antes de iniciar a gravação...")
-        time.sleep(2)
+        Record audio until the caller stops speaking or the duration is reached.
         
-        texto = self.listen_until_silence(timeout=5, phrase_time_limit=duration)
-        return texto or ""
+        Args:
+            duration: Maximum duration in seconds to record
+            save: Whether to also write the recording to the upload folder
+            silence_duration: Trailing silence in seconds that ends the
+                recording; None or 0 records the full duration
+            
+        Returns:
+            AudioClip: Recorded audio, a view over this manager's buffer
+                that stays valid until the next recording
+        """
+        return self.capture_microphone(duration, save, silence_duration).read_all()
     
-    def record_audio(self, duration: int) -> Tuple[bytes, str]:
+    def capture_microphone(
+        self,
+        duration: int,
+        save: bool = False,
+        silence_duration: Optional[float] = None,
+        scheduler: Optional[TurnScheduler] = None
+    ) -> AudioCapture:
         """
-        Record audio for a specified duration.
+        Start a microphone recording whose chunks can be consumed as they arrive.
         
         Args:
-            duration: Duration in seconds to record
+            duration: Maximum duration in seconds to record
+            save: Whether to also write the recording to the upload folder
+            silence_duration: Trailing silence in seconds that ends the
+                recording; None or 0 records the full duration
+            scheduler: Turn scheduler signalled once the input stream is open
             
         Returns:
-            Tuple[bytes, str]: Audio data and filename
+            AudioCapture: Chunks of the recording; ``clip`` is set at the end
         """
+        if self.audio is None:
+            raise RuntimeError("PyAudio não está disponível neste servidor.")
+        
+        chunks = self._record_chunks(duration, save, silence_duration, scheduler)
+        return AudioCapture(chunks, self.rate, self.sample_width, self.channels)
+    
+    def _record_chunks(
+        self,
+        duration: int,
+        save: bool,
+        silence_duration: Optional[float],
+        scheduler: Optional[TurnScheduler]
+    ) -> Generator[bytes, None, AudioClip]:
+        """Recording loop: yields each chunk read and returns the clip."""
+        if scheduler:
+            scheduler.start_capture()
+        
         # Iniciar gravação
         stream = self.audio.open(
             format=self.format,
@@ -90,33 +192,199 @@ class AudioManager:
             frames_per_buffer=self.chunk
         )
         
-        print(f"* Gravando por {duration} segundos...")
-        frames = []
+        # O microfone está aberto: a gravação começa sem espera fixa
+        if scheduler:
+            scheduler.signal_capture_ready()
         
-        for i in range(0, int(self.rate / self.chunk * duration)):
-            data = stream.read(self.chunk)
-            frames.append(data)
+        vad = None
+        if silence_duration:
+            vad = self._new_vad(silence_duration)
         
-        print("* Gravação finalizada")
+        buffer = self._get_buffer(duration)
         
-        # Parar e fechar stream
-        stream.stop_stream()
-        stream.close()
+        print(f"* Gravando por até {duration} segundos...")
         
-        # Gerar nome do arquivo
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"audio_{timestamp}.wav"
-        filepath = os.path.join(self.upload_folder, filename)
+        try:
+            for i in range(0, int(self.rate / self.chunk * duration)):
+                data = stream.read(self.chunk)
+                buffer.write(data)
+                yield data
+                
+                # Encerra assim que a fala termina
+                if buffer.full or (vad and vad.feed(data)):
+                    break
+        finally:
+            # Parar e fechar stream
+            stream.stop_stream()
+            stream.close()
+        
+        # O clipe referencia o buffer sem copiar os dados
+        clip = AudioClip(
+            buffer.view(),
+            sample_rate=self.rate,
+            sample_width=self.sample_width,
+            channels=self.channels
+        )
+        clip.trimmed = max(0.0, duration - clip.duration)
+        if vad:
+            self._update_noise_profile(vad, clip)
+        print(f"* Gravação finalizada: {clip.duration:.1f}s gravados, {clip.trimmed:.1f}s economizados")
+        
+        # Salvar arquivo WAV apenas quando solicitado
+        if save:
+            clip.save(self.upload_folder)
+        
+        return clip
+    
+    def _new_vad(self, silence_duration: float) -> EnergyVAD:
+        """
+        Create the VAD of a recording, starting from the device's cached
+        noise profile when there is a valid one.
+        
+        Args:
+            silence_duration: Trailing silence in seconds that ends the recording
+            
+        Returns:
+            EnergyVAD: Detector for the recording
+        """
+        vad = EnergyVAD(self.rate, self.sample_width, silence_duration=silence_duration)
+        profile = self.noise_profiles.get(self.device_key) if self.noise_profiles else None
+        if profile:
+            # Perfil válido: sem calibração, o limiar vale desde o primeiro bloco
+            vad.noise_floor = profile.energy_threshold / vad.threshold_ratio
+            vad.calibration_duration = 0.0
+        return vad
+    
+    def _update_noise_profile(self, vad: EnergyVAD, clip: AudioClip) -> None:
+        """
+        Store the calibration of a recording, or refresh the device's
+        profile from the silence that ended it.
+        
+        Args:
+            vad: Detector used in the recording
+            clip: Recorded audio
+        """
+        if self.noise_profiles is None:
+            return
+        if vad.calibration_duration:
+            if vad.elapsed >= vad.calibration_duration:
+                self.noise_profiles.store(self.device_key, vad.noise_floor * vad.threshold_ratio)
+            return
+        
+        # O fim da gravação é o silêncio que encerrou a fala
+        frame_width = self.sample_width * self.channels
+        tail_bytes = int(vad.trailing_silence * self.rate) * frame_width if vad.speech_detected else 0
+        tail = clip.frames[len(clip.frames) - tail_bytes:] if tail_bytes else b''
+        self.noise_profiles.refresh_from_silence(
+            self.device_key, tail, self.sample_width, vad.threshold_ratio
+        )
+    
+    def _get_buffer(self, duration: float) -> PCMBuffer:
+        """
+        Get the recording buffer, allocating it only when it is too small.
+        
+        Args:
+            duration: Maximum duration in seconds of the next recording
+            
+        Returns:
+            PCMBuffer: Rewound buffer
+        """
+        needed = int(self.rate / self.chunk * duration) * self.chunk * self.sample_width * self.channels
+        if self.buffer is None or self.buffer.capacity < needed:
+            self.buffer = PCMBuffer(needed)
+        self.buffer.clear()
+        return self.buffer
+    
+    def capture_upload(
+        self,
+        stream: BinaryIO,
+        extension: str,
+        save: bool = False,
+        keep_frames: bool = False
+    ) -> AudioCapture:
+        """
+        Start decoding uploaded audio whose chunks can be consumed as they arrive.
         
-        # Salvar arquivo WAV
-        wf = wave.open(filepath, 'wb')
-        wf.setnchannels(self.channels)
-        wf.setsampwidth(self.audio.get_sample_size(self.format))
-        wf.setframerate(self.rate)
-        wf.writeframes(b''.join(frames))
-        wf.close()
+        Args:
+            stream: Binary stream with the uploaded audio
+            extension: Audio format (wav, ogg or mp3)
+            save: Whether to also write the decoded audio to the upload folder
+            keep_frames: Whether to keep the decoded audio in ``clip``; by
+                default the chunks are only streamed
+            
+        Returns:
+            AudioCapture: Decoded chunks; ``clip`` is set at the end when kept
+        """
+        return open_uploaded_audio(
+            stream, extension,
+            sample_rate=self.transcribe_rate,
+            save_folder=self.upload_folder if save else None,
+            keep_frames=keep_frames
+        )
+    
+    def open_transcription(self, capture: AudioCapture) -> TranscriptionStream:
+        """
+        Start transcribing a capture while it is still in progress.
         
-        return b''.join(frames), filename
+        Args:
+            capture: Audio being recorded or uploaded
+            
+        Returns:
+            TranscriptionStream: Session fed with the capture's chunks
+        """
+        return self.transcriber.open_stream(capture.sample_rate, capture.sample_width, capture.channels)
+    
+    def transcribe_capture(self, capture: AudioCapture) -> str:
+        """
+        Transcreve o áudio enquanto ele chega, bloco a bloco.
+        
+        Args:
+            capture: Áudio sendo gravado ou enviado pelo cliente
+            
+        Returns:
+            Texto transcrito ou string vazia
+        """
+        session = self.open_transcription(capture)
+        try:
+            for chunk in capture:
+                session.feed(chunk)
+            text = session.finish()
+        except TranscriptionError as e:
+            print(e)
+            return ""
+        finally:
+            session.close()
+        
+        if not text:
+            print("Não entendi o que foi falado.")
+        else:
+            print(f"Texto transcrito: {text}")
+        return text
+    
+    def transcribe(self, clip: AudioClip) -> str:
+        """
+        Transcreve um áudio já gravado, sem acessar o microfone novamente.
+        
+        Args:
+            clip: Áudio gravado em memória
+            
+        Returns:
+            Texto transcrito ou string vazia
+        """
+        # Reduz para mono na taxa do reconhecedor antes de enviar
+        clip = clip.resample(self.transcribe_rate)
+        
+        try:
+            text = self.transcriber.transcribe(clip)
+        except TranscriptionError as e:
+            print(e)
+            return ""
+        
+        if not text:
+            print("Não entendi o que foi falado.")
+        else:
+            print(f"Texto transcrito: {text}")
+        return text
     
     def save_audio(self, audio_data: bytes, filename: Optional[str] = None) -> str:
         """
@@ -171,6 +439,15 @@ class AudioManager:
         filepath = os.path.join(self.upload_folder, filename)
         return filepath if os.path.exists(filepath) else None
     
+    def close(self) -> None:
+        """Release the transcription pool and PyAudio instance this manager created itself."""
+        if self._owns_transcriber:
+            self.transcriber.shutdown()
+            self._owns_transcriber = False
+        if self._owns_audio and self.audio is not None:
+            self.audio.terminate()
+            self.audio = None
+    
     def __del__(self):
         """Cleanup audio resources."""
-        self.audio.terminate() 
\ No newline at end of file
+        self.close() 
\ No newline at end of file
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Audio resources owned by the application and shared across requests.
+"""
+
+import atexit
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from flask import current_app
+
+from .audio_manager import AudioManager, pyaudio
+from .noise_profiles import NoiseProfileCache
+from .transcription import TranscriptionPool
+
+class AudioResources:
+    """
+    Process-wide pool of audio resources.
+
+    A single PyAudio instance (whose creation enumerates the host audio
+    devices) is created lazily on first use. AudioManager instances, each
+    with its recognizer and preallocated recording buffer, are created on
+    demand and returned to the pool after every turn, so none of this
+    setup happens in the request hot path once the worker is warm.
+    """
+
+    def __init__(
+        self,
+        upload_folder: str,
+        language: str = 'pt-BR',
+        transcriber: Optional[TranscriptionPool] = None,
+        max_idle: int = 4,
+        noise_profiles: Optional[NoiseProfileCache] = None
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            upload_folder: Folder where recordings are saved
+            language: Language code for speech recognition
+            transcriber: Shared transcription pool
+            max_idle: Maximum number of idle AudioManagers kept for reuse
+            noise_profiles: Shared noise calibration cache of the managers
+        """
+        self.upload_folder = upload_folder
+        self.language = language
+        self.transcriber = transcriber
+        self.noise_profiles = noise_profiles
+        self._idle: queue.LifoQueue = queue.LifoQueue(maxsize=max_idle)
+        self._lock = threading.Lock()
+        self._pyaudio = None
+
+        os.makedirs(upload_folder, exist_ok=True)
+
+    def get_pyaudio(self):
+        """
+        Get the shared PyAudio instance, creating it on first use.
+
+        Returns:
+            pyaudio.PyAudio, or None when PyAudio is not installed
+        """
+        if self._pyaudio is None and pyaudio is not None:
+            with self._lock:
+                if self._pyaudio is None:
+                    self._pyaudio = pyaudio.PyAudio()
+        return self._pyaudio
+
+    def acquire(self) -> AudioManager:
+        """
+        Check out an AudioManager for the current turn.
+
+        Returns:
+            AudioManager: Idle manager, or a new one if none is available
+        """
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return AudioManager(
+                upload_folder=self.upload_folder,
+                language=self.language,
+                transcriber=self.transcriber,
+                audio=self.get_pyaudio(),
+                noise_profiles=self.noise_profiles
+            )
+
+    def release(self, audio_manager: AudioManager) -> None:
+        """
+        Return an AudioManager to the pool, closing it if the pool is full.
+
+        Args:
+            audio_manager: Manager checked out with ``acquire``
+        """
+        try:
+            self._idle.put_nowait(audio_manager)
+        except queue.Full:
+            audio_manager.close()
+
+    @contextmanager
+    def checkout(self) -> Iterator[AudioManager]:
+        """Context manager around ``acquire``/``release``."""
+        audio_manager = self.acquire()
+        try:
+            yield audio_manager
+        finally:
+            self.release(audio_manager)
+
+    def terminate(self) -> None:
+        """Release the shared PyAudio instance."""
+        with self._lock:
+            if self._pyaudio is not None:
+                self._pyaudio.terminate()
+                self._pyaudio = None
+
+def init_app(app) -> None:
+    """
+    Create the audio resource pool of this worker process.
+
+    Call it after the transcription and noise profile ``init_app``: the
+    pool hands their shared instances to every AudioManager.
+
+    Args:
+        app: Flask application instance
+    """
+    resources = AudioResources(
+        upload_folder=app.config.get('AUDIO_UPLOAD_FOLDER', 'uploads'),
+        language=app.config.get('SPEECH_LANGUAGE', 'pt-BR'),
+        transcriber=app.extensions.get('transcription'),
+        max_idle=app.config.get('AUDIO_POOL_SIZE', 4),
+        noise_profiles=app.extensions.get('noise_profiles')
+    )
+    atexit.register(resources.terminate)
+    app.extensions['audio'] = resources
+
+def get_audio_resources() -> AudioResources:
+    """
+    Get the audio resource pool of the current application.
+
+    Returns:
+        AudioResources: Pool created by ``init_app``
+    """
+    return current_app.extensions['audio']
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+Ingestion of client-uploaded audio for the conversation endpoints.
+"""
+
+import io
+import os
+import shutil
+import subprocess
+import threading
+import wave
+from datetime import datetime
+from typing import BinaryIO, Generator, Iterator, Optional, Set, Tuple
+
+from werkzeug.sansio.multipart import Data, Epilogue, File, MultipartDecoder, NEED_DATA
+
+from .audio_clip import AudioCapture, AudioClip
+
+# Content types aceitos no corpo bruto da requisição
+CONTENT_TYPE_EXTENSIONS = {
+    'audio/wav': 'wav',
+    'audio/x-wav': 'wav',
+    'audio/wave': 'wav',
+    'audio/ogg': 'ogg',
+    'audio/mpeg': 'mp3',
+    'audio/mp3': 'mp3',
+}
+
+UPLOAD_FIELD = 'audio'
+READ_SIZE = 8192
+
+class UnsupportedAudioError(ValueError):
+    """Raised when the uploaded audio format is not accepted."""
+
+def get_extension(filename: Optional[str]) -> Optional[str]:
+    """
+    Get the lowercase extension of a filename.
+
+    Args:
+        filename: Name of the uploaded file
+
+    Returns:
+        Extension without the dot, or None
+    """
+    if not filename or '.' not in filename:
+        return None
+    return filename.rsplit('.', 1)[1].lower()
+
+class MultipartFileStream(io.RawIOBase):
+    """
+    One file field of a multipart body, read while the body arrives.
+
+    ``request.files`` only exists after werkzeug has read (and spooled)
+    the whole request, so the decoder would wait for the end of the
+    upload. This stream parses the body incrementally instead: the
+    fields before the file are skipped and its contents are handed to
+    the decoder chunk by chunk.
+    """
+
+    def __init__(self, stream: BinaryIO, boundary: bytes, field: str = UPLOAD_FIELD):
+        """
+        Read the body up to the start of the file field.
+
+        Args:
+            stream: Raw request body
+            boundary: Multipart boundary from the Content-Type
+            field: Name of the file field
+
+        Raises:
+            UnsupportedAudioError: If the body is not valid multipart
+        """
+        super().__init__()
+        self._stream = stream
+        self._decoder = MultipartDecoder(boundary)
+        self._pending = memoryview(b'')
+        self._in_field = False
+        self.filename: Optional[str] = None
+        self.mimetype: Optional[str] = None
+
+        while True:
+            event = self._next_event()
+            if event is None:
+                return
+            if isinstance(event, File) and event.name == field:
+                self.filename = event.filename
+                self.mimetype = (event.headers.get('Content-Type') or '').split(';')[0].strip() or None
+                self._in_field = True
+                return
+
+    def _next_event(self):
+        """Next multipart event, reading more of the body when needed; None at the end."""
+        while True:
+            try:
+                event = self._decoder.next_event()
+            except ValueError as e:
+                raise UnsupportedAudioError(f"Corpo multipart inválido: {e}") from e
+            if isinstance(event, Epilogue):
+                return None
+            if event is not NEED_DATA:
+                return event
+            if self._decoder.complete:
+                raise UnsupportedAudioError("Corpo multipart incompleto.")
+            self._decoder.receive_data(self._stream.read(READ_SIZE) or None)
+
+    @property
+    def found(self) -> bool:
+        """Whether the body has the file field."""
+        return self.filename is not None
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        """Copy the next bytes of the file field into ``buffer``."""
+        while not self._pending and self._in_field:
+            event = self._next_event()
+            if isinstance(event, Data):
+                self._pending = memoryview(event.data)
+                self._in_field = event.more_data
+            else:
+                self._in_field = False
+
+        count = min(len(buffer), len(self._pending))
+        buffer[:count] = self._pending[:count]
+        self._pending = self._pending[count:]
+        return count
+
+def get_uploaded_audio(request, allowed_extensions: Set[str]) -> Optional[Tuple[BinaryIO, str]]:
+    """
+    Locate the audio sent by the client, without reading it.
+
+    Accepts a multipart form with an ``audio`` file field, or a raw
+    (optionally chunked) body with an ``audio/*`` Content-Type. Either
+    way the returned stream reads the request body as it arrives.
+
+    Args:
+        request: Flask request
+        allowed_extensions: Extensions accepted by the application
+
+    Returns:
+        Tuple of (stream, extension), or None if no audio was sent
+
+    Raises:
+        UnsupportedAudioError: If the audio format is not allowed
+    """
+    mimetype = request.mimetype or ''
+
+    if mimetype == 'multipart/form-data':
+        boundary = request.mimetype_params.get('boundary')
+        if not boundary:
+            return None
+        # Não usa request.files: ele lê o corpo inteiro antes de devolver o arquivo
+        stream = MultipartFileStream(request.stream, boundary.encode('latin-1'))
+        if not stream.found:
+            return None
+        extension = get_extension(stream.filename) or CONTENT_TYPE_EXTENSIONS.get(stream.mimetype)
+    elif mimetype.startswith('audio/'):
+        extension = request.args.get('format') or CONTENT_TYPE_EXTENSIONS.get(mimetype)
+        stream = request.stream
+    else:
+        return None
+
+    if extension not in allowed_extensions:
+        raise UnsupportedAudioError(f"Formato de áudio não suportado: {extension}")
+
+    return stream, extension
+
+def iter_wav_frames(stream: BinaryIO, frames_per_read: int = 1024) -> Tuple[wave.Wave_read, Iterator[bytes]]:
+    """
+    Decode a WAV stream incrementally.
+
+    Args:
+        stream: Binary stream positioned at the start of the WAV file
+        frames_per_read: Number of frames decoded per iteration
+
+    Returns:
+        Tuple of (wave reader, iterator of PCM chunks)
+    """
+    try:
+        reader = wave.open(stream, 'rb')
+    except (wave.Error, EOFError) as e:
+        raise UnsupportedAudioError(f"Arquivo WAV inválido: {e}") from e
+
+    def frames() -> Iterator[bytes]:
+        try:
+            while True:
+                data = reader.readframes(frames_per_read)
+                if not data:
+                    break
+                yield data
+        finally:
+            reader.close()
+
+    return reader, frames()
+
+def iter_ffmpeg_frames(stream: BinaryIO, sample_rate: int, channels: int = 1) -> Iterator[bytes]:
+    """
+    Decode a compressed stream (ogg, mp3) to 16-bit PCM with ffmpeg.
+
+    The input is piped to ffmpeg as it arrives, so the compressed file
+    is never held in memory.
+
+    Args:
+        stream: Binary stream with the encoded audio
+        sample_rate: Output sample rate in Hz
+        channels: Output channel count
+
+    Returns:
+        Iterator of PCM chunks
+    """
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg não encontrado para decodificar o áudio enviado.")
+
+    process = subprocess.Popen(
+        [ffmpeg, '-loglevel', 'error', '-i', 'pipe:0',
+         '-f', 's16le', '-acodec', 'pcm_s16le',
+         '-ac', str(channels), '-ar', str(sample_rate), 'pipe:1'],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL
+    )
+
+    def feed() -> None:
+        try:
+            while True:
+                data = stream.read(READ_SIZE)
+                if not data:
+                    break
+                process.stdin.write(data)
+        except (BrokenPipeError, ValueError):
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+    # Alimenta o ffmpeg em paralelo para evitar deadlock entre stdin e stdout
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+
+    try:
+        while True:
+            data = process.stdout.read(READ_SIZE)
+            if not data:
+                break
+            yield data
+    finally:
+        process.stdout.close()
+        process.wait()
+        feeder.join()
+
+    if process.returncode != 0:
+        raise UnsupportedAudioError("Não foi possível decodificar o áudio enviado.")
+
+def _open_wav_writer(folder: str, sample_rate: int, sample_width: int, channels: int) -> Tuple[wave.Wave_write, str]:
+    """Create a WAV file in the folder, named like ``AudioClip.save`` does."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"audio_{timestamp}.wav"
+    writer = wave.open(os.path.join(folder, filename), 'wb')
+    writer.setnchannels(channels)
+    writer.setsampwidth(sample_width)
+    writer.setframerate(sample_rate)
+    return writer, filename
+
+def open_uploaded_audio(
+    stream: BinaryIO,
+    extension: str,
+    sample_rate: int = 16000,
+    save_folder: Optional[str] = None,
+    keep_frames: bool = True
+) -> AudioCapture:
+    """
+    Start decoding an uploaded audio stream.
+
+    Args:
+        stream: Binary stream with the uploaded audio
+        extension: Audio format (wav, ogg or mp3)
+        sample_rate: Sample rate used when decoding compressed formats
+        save_folder: Folder where the decoded audio is written as WAV, if
+            any; the file is written chunk by chunk
+        keep_frames: Whether to keep the decoded audio for ``clip``;
+            consumers that stream the chunks (to a transcription session)
+            pass False, so the upload is never held in memory
+
+    Returns:
+        AudioCapture: PCM chunks as they are decoded; ``clip`` is None
+        when the frames are not kept
+    """
+    if extension == 'wav':
+        reader, chunks = iter_wav_frames(stream)
+        sample_width = reader.getsampwidth()
+        channels = reader.getnchannels()
+        sample_rate = reader.getframerate()
+    else:
+        chunks = iter_ffmpeg_frames(stream, sample_rate)
+        sample_width = 2
+        channels = 1
+
+    def decode() -> Generator[bytes, None, Optional[AudioClip]]:
+        frames = bytearray() if keep_frames else None
+        writer, filename = None, None
+        if save_folder:
+            writer, filename = _open_wav_writer(save_folder, sample_rate, sample_width, channels)
+        try:
+            for chunk in chunks:
+                if frames is not None:
+                    frames += chunk
+                if writer is not None:
+                    writer.writeframesraw(chunk)
+                yield chunk
+        finally:
+            if writer is not None:
+                # Corrige o tamanho no cabeçalho do WAV
+                writer.close()
+
+        if frames is None:
+            return None
+        return AudioClip(
+            frames,
+            sample_rate=sample_rate,
+            sample_width=sample_width,
+            channels=channels,
+            filename=filename
+        )
+
+    return AudioCapture(decode(), sample_rate, sample_width, channels)
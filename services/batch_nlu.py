@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Offline replay of transcripts through the order NLU, in parallel.
+"""
+
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Union
+
+from .order_processor import extrair_informacoes, get_matcher, process_order
+from .transcript import Transcript
+
+# Catálogo do processo de trabalho, definido por _init_worker
+_catalog: Optional[tuple] = None
+
+def analyze(
+    texto: str,
+    products: Dict[str, float],
+    synonyms: Dict[str, str],
+    synonyms_file: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Run every NLU stage of a turn on one transcript.
+
+    Args:
+        texto: Texto transcrito
+        products: Dicionário de produtos e preços
+        synonyms: Dicionário de sinônimos para produtos
+        synonyms_file: Arquivo JSON com mais sinônimos por produto (opcional)
+
+    Returns:
+        dict: ``informacoes`` (nome, telefone, endereco) and ``itens``
+        (None when no product was found)
+    """
+    transcricao = Transcript(texto)
+    return {
+        "informacoes": extrair_informacoes(transcricao),
+        "itens": process_order(transcricao, products, synonyms, synonyms_file)
+    }
+
+def _init_worker(products: Dict[str, float], synonyms: Dict[str, str], synonyms_file: Optional[str]) -> None:
+    """Keep the catalog of the worker and compile its matcher once."""
+    global _catalog
+    _catalog = (products, synonyms, synonyms_file)
+    get_matcher(*_catalog)
+
+def _analyze_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Analyze one record; a failure becomes an ``erro`` field instead of aborting the batch."""
+    if "texto" not in record:
+        # Linha inválida ou sem texto: o erro já foi anotado
+        return record
+    try:
+        return {**record, **analyze(record["texto"], *_catalog)}
+    except Exception as e:
+        return {**record, "erro": f"{type(e).__name__}: {e}"}
+
+def _analyze_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Analyze a chunk of records with the worker's catalog."""
+    return [_analyze_record(record) for record in records]
+
+def _as_record(item: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Turn a transcript into a record with a ``texto`` field, or an ``erro`` one."""
+    if isinstance(item, str):
+        return {"texto": item}
+    if not isinstance(item, dict):
+        return {"erro": f"Registro inválido: {item!r}"}
+    if "texto" not in item:
+        if "transcricao" in item:
+            return {**item, "texto": item["transcricao"]}
+        if "erro" not in item:
+            return {**item, "erro": "Registro sem o campo texto ou transcricao"}
+    return item
+
+def analyze_batch(
+    transcripts: Iterable[Union[str, Dict[str, Any]]],
+    products: Dict[str, float],
+    synonyms: Dict[str, str],
+    synonyms_file: Optional[str] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 256
+) -> Iterator[Dict[str, Any]]:
+    """
+    Analyze many transcripts, yielding the results in input order.
+
+    The transcripts are read lazily and sent to a process pool in chunks;
+    only a few chunks per worker are in flight, so a day of call logs is
+    streamed without being loaded at once. The catalog matcher is compiled
+    before the pool starts (and inherited by forked workers) or once per
+    worker otherwise.
+
+    Args:
+        transcripts: Texts, or records (dicts) with a ``texto`` or
+            ``transcricao`` field; other fields are copied to the result
+        products: Dicionário de produtos e preços
+        synonyms: Dicionário de sinônimos para produtos
+        synonyms_file: Arquivo JSON com mais sinônimos por produto (opcional)
+        workers: Number of processes; 1 analyzes in the calling process.
+            Defaults to the number of CPUs.
+        chunk_size: Transcripts sent to a worker at a time
+
+    Yields:
+        dict: The record, plus ``informacoes`` and ``itens``; a record that
+        cannot be analyzed gets an ``erro`` field instead, and the batch
+        goes on
+    """
+    records = map(_as_record, transcripts)
+    chunks = iter(lambda: list(islice(records, chunk_size)), [])
+    workers = workers or os.cpu_count() or 1
+    _init_worker(products, synonyms, synonyms_file)
+
+    if workers == 1:
+        for chunk in chunks:
+            yield from _analyze_records(chunk)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(products, synonyms, synonyms_file)
+    ) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_analyze_records, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def read_ndjson(stream: Iterable[str]) -> Iterator[Union[str, Dict[str, Any]]]:
+    """
+    Read transcripts from NDJSON: one JSON string or object per line.
+
+    Args:
+        stream: Lines of the file; blank lines are skipped
+
+    Yields:
+        The text or record of each line; a malformed line yields a record
+        with its ``linha`` number and the ``erro``
+    """
+    for number, line in enumerate(stream, start=1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield {"linha": number, "erro": f"JSON inválido: {e}"}
+
+def write_ndjson(results: Iterable[Dict[str, Any]], stream: IO[str]) -> int:
+    """
+    Write results as NDJSON, one line as soon as each one is ready.
+
+    Args:
+        results: Results of ``analyze_batch``
+        stream: Output text stream
+
+    Returns:
+        int: Number of lines written
+    """
+    count = 0
+    for result in results:
+        stream.write(json.dumps(result, ensure_ascii=False) + "\n")
+        count += 1
+    return count
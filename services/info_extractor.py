@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Precompiled extraction of the customer's phone, name and address.
+"""
+
+import re
+from typing import Dict, NamedTuple, Optional, Tuple, Union
+
+from .transcript import Transcript, as_transcript
+
+# Telefone com DDD e celular: "11 98765-4321"
+TELEFONE = r'(?P<telefone>\d{2}[\s\-]?\d{5}[\s\-]?\d{4})'
+# Telefone com DDD opcional e 4 ou 5 dígitos no prefixo
+TELEFONE_LIVRE = r'(?P<telefone>\b(?:\d{2}[\s-]?)?\d{4,5}[\s-]?\d{4}\b)'
+# Nome depois de "me chamo", "meu nome é", etc.
+NOME_APRESENTACAO = r'\b(?:me\s+chamo|meu\s+nome\s+[ée]|sou\s+(?:o|a)?\s*)\s+(?P<nome>[A-Za-zÀ-ÿ\s]+)(?=\s|$)'
+# Endereço depois de "meu endereço é", "moro em", etc.
+ENDERECO_APRESENTACAO = r'\b(?:meu\s+endere[çc]o\s+[ée]|moro\s+em|fico\s+em)\s+(?P<endereco>[^,.!?]+)'
+
+class ExtractedField(NamedTuple):
+    """Value of a field and where it was found in the transcript."""
+
+    value: str
+    span: Tuple[int, int]
+
+def extracted_field(texto: str, start: int, end: int) -> Optional[ExtractedField]:
+    """
+    Build a field from a slice of the transcript, without surrounding spaces.
+
+    Args:
+        texto: Transcript
+        start: Start of the slice
+        end: End of the slice
+
+    Returns:
+        ExtractedField, or None if the slice is blank
+    """
+    value = texto[start:end]
+    stripped = value.strip()
+    if not stripped:
+        return None
+    if len(stripped) != len(value):
+        start += len(value) - len(value.lstrip())
+    return ExtractedField(stripped, (start, start + len(stripped)))
+
+_NAO_DIGITO = re.compile(r'\D')
+
+def only_digits(value: str) -> str:
+    """Keep only the digits of a phone number."""
+    return _NAO_DIGITO.sub('', value)
+
+class InfoExtractor:
+    """
+    Finds several fields in a transcript with patterns compiled once.
+
+    Every field is searched in the lowercased view of the Transcript,
+    shared with the other stages of the turn; the values are sliced from
+    the original text by offset.
+    Each field is still its own search: a single alternation of all the
+    patterns was measured to be slower, because CPython's ``re`` can no
+    longer skip ahead to the literal start of each pattern.
+    """
+
+    def __init__(self, *patterns: str, lowercase: bool = True):
+        """
+        Compile the extractor.
+
+        Args:
+            *patterns: One lowercase regex per field, each with a named
+                group (``(?P<campo>...)``) capturing the value
+            lowercase: Whether the patterns need the lowercased view; a
+                phone pattern alone does not
+        """
+        self.lowercase = lowercase
+        self.patterns = []
+        for pattern in patterns:
+            compiled = re.compile(pattern)
+            (field,) = compiled.groupindex
+            self.patterns.append((field, compiled))
+
+    def spans(self, texto: Union[str, Transcript]) -> Dict[str, Tuple[int, int]]:
+        """
+        Find the first occurrence of each field.
+
+        Args:
+            texto: Texto transcrito (str ou Transcript)
+
+        Returns:
+            dict: Field name -> offsets of the captured value (which may
+            have surrounding spaces); fields not found are left out
+        """
+        visao = as_transcript(texto).lowered if self.lowercase else texto
+        found = {}
+        for field, pattern in self.patterns:
+            match = pattern.search(visao)
+            if match:
+                found[field] = match.span(field)
+        return found
+
+    def extract(self, texto: Union[str, Transcript]) -> Dict[str, ExtractedField]:
+        """
+        Find the first occurrence of each field, with its value.
+
+        Args:
+            texto: Texto transcrito (str ou Transcript)
+
+        Returns:
+            dict: Field name -> value without surrounding spaces and its
+            offsets; fields not found or blank are left out
+        """
+        found = {}
+        for field, (start, end) in self.spans(texto).items():
+            extracted = extracted_field(texto, start, end)
+            if extracted:
+                found[field] = extracted
+        return found
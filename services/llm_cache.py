@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+Cache of language-model responses for repeated utterances.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from flask import current_app, has_app_context
+
+from .transcript import Transcript
+
+def normalize_utterance(text: str) -> str:
+    """
+    Normalize a transcript for cache lookups.
+
+    Case, accents and punctuation are dropped, so "Quero uma Coca." and
+    "quero uma coca" share an entry.
+
+    Args:
+        text: Texto transcrito
+
+    Returns:
+        str: Words of the folded transcript, separated by single spaces
+    """
+    return ' '.join(token for token, _, _ in Transcript(text).tokens if token[0].isalnum())
+
+def catalog_version(*parts: Any) -> str:
+    """
+    Fingerprint of a catalog (products, synonyms), for callers without a version.
+
+    Args:
+        *parts: JSON-serializable parts of the catalog
+
+    Returns:
+        str: Short SHA-256 hex digest
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def llm_cache_key(
+    operation: str,
+    text: str,
+    catalog: str = '',
+    model: str = '',
+    prompt_version: int = 0
+) -> str:
+    """
+    Build the cache key of a model response.
+
+    Args:
+        operation: Name of the call (e.g. ``process_order``)
+        text: Texto transcrito; normalized with ``normalize_utterance``
+        catalog: Catalog version the prompt was built from
+        model: Model name
+        prompt_version: Version of the prompt template
+
+    Returns:
+        str: SHA-256 hex digest identifying the response
+    """
+    parts = (operation, normalize_utterance(text), catalog, model, str(prompt_version))
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+class LLMCache:
+    """
+    Two-tier cache of model responses, with expiry.
+
+    The memory tier is an LRU bounded by the number of entries; the SQLite
+    tier survives restarts and is shared by the worker processes. Both
+    keep the response as JSON, so callers never share a mutable result.
+    Entries expire ``ttl`` seconds after they were stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        path: Optional[str] = None,
+        ttl: float = 24 * 3600,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Size of the memory tier
+            path: SQLite file of the persistent tier; None keeps the cache
+                in memory only
+            ttl: Seconds a response stays valid
+            clock: Wall clock in seconds (shared by the processes)
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, Tuple[float, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, timeout=5, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a response in memory, then in SQLite.
+
+        Args:
+            key: Key built with ``llm_cache_key``
+
+        Returns:
+            The cached response, or None if missing or expired
+        """
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(entry[1])
+            if entry is not None:
+                del self._entries[key]
+
+            row = self._load(key, now)
+            if row is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, row)
+            return json.loads(row[1])
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Store a response in both tiers.
+
+        Args:
+            key: Key built with ``llm_cache_key``
+            value: JSON-serializable response
+        """
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return
+        entry = (self.clock() + self.ttl, payload)
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                try:
+                    self._db.execute("INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?)", (key, payload, entry[0]))
+                    self._db.commit()
+                except sqlite3.Error:
+                    pass
+
+    def get_or_call(self, key: str, call: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """
+        Return a cached response, calling the model and storing it on a miss.
+
+        Args:
+            key: Key built with ``llm_cache_key``
+            call: Calls the model; None (a failure) is not cached
+
+        Returns:
+            The response, or None if the call failed
+        """
+        value = self.get(key)
+        if value is None:
+            value = call()
+            if value is not None:
+                self.put(key, value)
+        return value
+
+    def purge(self) -> int:
+        """
+        Delete the expired entries of the persistent tier.
+
+        Returns:
+            int: Number of entries deleted
+        """
+        if self._db is None:
+            return 0
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (self.clock(),))
+            self._db.commit()
+            return cursor.rowcount
+
+    def metrics(self) -> Dict[str, float]:
+        """
+        Counters of the cache.
+
+        Returns:
+            dict: hits, disk_hits, misses, hit_rate and entries in memory
+        """
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                'entries': len(self._entries)
+            }
+
+    def _remember(self, key: str, entry: Tuple[float, str]) -> None:
+        """Insert into the memory tier and evict the least recently used (lock held)."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self, key: str, now: float) -> Optional[Tuple[float, str]]:
+        """Read a valid entry from the persistent tier (lock held)."""
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT expires_at, value FROM llm_cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        return tuple(row) if row else None
+
+def init_app(app) -> None:
+    """
+    Create the model response cache of this worker process.
+
+    Args:
+        app: Flask application instance
+    """
+    path = app.config.get('LLM_CACHE_PATH')
+    if path is None:
+        path = os.path.join(app.config.get('TEMP_DIR', 'temp'), 'llm_cache.sqlite3')
+    app.extensions['llm_cache'] = LLMCache(
+        max_entries=app.config.get('LLM_CACHE_MAX_ENTRIES', 1024),
+        path=path or None,
+        ttl=app.config.get('LLM_CACHE_TTL', 24 * 3600)
+    )
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """
+    Get the model response cache of the current application.
+
+    Returns:
+        LLMCache, or None outside an application context
+    """
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('llm_cache')
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Local-first NLU: the language model is only asked about ambiguous turns.
+"""
+
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from flask import current_app, has_app_context
+
+# Resolvido pelas regras locais com confiança suficiente
+LOCAL = 'local'
+# Ambíguo, respondido pelo modelo de linguagem
+LLM = 'llm'
+# Ambíguo, mas o modelo não estava disponível ou falhou: vale o resultado local
+FALLBACK = 'fallback'
+
+TIERS = (LOCAL, LLM, FALLBACK)
+
+class NLUStats:
+    """Thread-safe count of turns answered by each tier, per operation."""
+
+    def __init__(self):
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(TIERS, 0))
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, tier: str) -> None:
+        """
+        Count one turn.
+
+        Args:
+            operation: NLU operation (e.g. ``process_order``)
+            tier: LOCAL, LLM or FALLBACK
+        """
+        with self._lock:
+            self._counts[operation][tier] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        Current counters.
+
+        Returns:
+            dict: Operation -> count per tier and ``local_fraction``, the
+            share of turns answered without waiting for the model
+        """
+        with self._lock:
+            snapshot = {}
+            for operation, counts in self._counts.items():
+                total = sum(counts.values())
+                snapshot[operation] = {
+                    **counts,
+                    'local_fraction': counts[LOCAL] / total if total else 0.0
+                }
+            return snapshot
+
+def run_cascade(
+    operation: str,
+    local: Callable[[], Tuple[Any, float]],
+    remote: Optional[Callable[[], Optional[Any]]],
+    threshold: float,
+    stats: Optional[NLUStats] = None
+) -> Any:
+    """
+    Answer with the local rules, escalating to the model when unsure.
+
+    Args:
+        operation: Name used in the counters
+        local: Runs the local rules; returns the result and its
+            confidence, from 0 to 1
+        remote: Asks the model; returns None on failure. None when no
+            model is configured
+        threshold: Minimum confidence to answer locally
+        stats: Counters to update
+
+    Returns:
+        The local result when confident, else the model's, else the
+        local result anyway
+    """
+    result, confidence = local()
+    tier = LOCAL
+    if confidence < threshold:
+        remote_result = remote() if remote is not None else None
+        if remote_result:
+            result, tier = remote_result, LLM
+        else:
+            tier = FALLBACK
+    if stats is not None:
+        stats.record(operation, tier)
+    return result
+
+def init_app(app) -> None:
+    """
+    Create the NLU counters of this worker process.
+
+    Args:
+        app: Flask application instance
+    """
+    app.extensions['nlu_stats'] = NLUStats()
+
+def get_nlu_stats() -> Optional[NLUStats]:
+    """
+    Get the NLU counters of the current application.
+
+    Returns:
+        NLUStats, or None outside an application context
+    """
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('nlu_stats')
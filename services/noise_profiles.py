@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Cache of ambient-noise calibration profiles, one per input device.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from flask import current_app
+
+from .vad import rms
+
+class NoiseProfile:
+    """Energy threshold calibrated for one input device."""
+
+    def __init__(self, energy_threshold: float, updated_at: float):
+        """
+        Initialize the profile.
+
+        Args:
+            energy_threshold: Energy above which audio counts as speech
+            updated_at: Clock time of the last calibration or refresh
+        """
+        self.energy_threshold = energy_threshold
+        self.updated_at = updated_at
+        self.refreshes = 0
+
+class NoiseProfileCache:
+    """
+    Thread-safe store of noise profiles keyed by device.
+
+    A full calibration (listening to silence before the caller speaks) is
+    only needed when a device has no profile or its profile has expired.
+    Between calibrations the threshold follows the trailing silence of
+    each turn, smoothed the same way ``adjust_for_ambient_noise`` does.
+    """
+
+    def __init__(self, ttl: float = 600, damping: float = 0.8, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds without calibration or refresh after which a
+                profile expires
+            damping: Weight of the current threshold when refreshing
+                (0 replaces it, 1 keeps it)
+            clock: Monotonic clock in seconds
+        """
+        self.ttl = ttl
+        self.damping = damping
+        self.clock = clock
+        self._profiles: Dict[str, NoiseProfile] = {}
+        self._lock = threading.Lock()
+
+    def get(self, device: str) -> Optional[NoiseProfile]:
+        """
+        Get the profile of a device if it has not expired.
+
+        Args:
+            device: Device key
+
+        Returns:
+            NoiseProfile or None
+        """
+        with self._lock:
+            profile = self._profiles.get(device)
+            if profile is None:
+                return None
+            if self.clock() - profile.updated_at > self.ttl:
+                del self._profiles[device]
+                return None
+            return profile
+
+    def store(self, device: str, energy_threshold: float) -> NoiseProfile:
+        """
+        Store the result of a full calibration.
+
+        Args:
+            device: Device key
+            energy_threshold: Calibrated threshold
+
+        Returns:
+            NoiseProfile: New profile of the device
+        """
+        profile = NoiseProfile(energy_threshold, self.clock())
+        with self._lock:
+            self._profiles[device] = profile
+        return profile
+
+    def refresh_from_silence(
+        self,
+        device: str,
+        frames: bytes,
+        sample_width: int = 2,
+        energy_ratio: float = 1.5
+    ) -> Optional[NoiseProfile]:
+        """
+        Refresh a profile from audio known to contain only background noise.
+
+        Args:
+            device: Device key
+            frames: Raw PCM of the silence (e.g. the tail of an utterance)
+            sample_width: Bytes per sample
+            energy_ratio: Multiplier from noise energy to speech threshold
+
+        Returns:
+            NoiseProfile: Refreshed profile, or None if the device has no
+                valid profile to refresh
+        """
+        if not frames:
+            return None
+
+        target = rms(frames, sample_width) * energy_ratio
+        with self._lock:
+            profile = self._profiles.get(device)
+            if profile is None:
+                return None
+            profile.energy_threshold = profile.energy_threshold * self.damping + target * (1 - self.damping)
+            profile.updated_at = self.clock()
+            profile.refreshes += 1
+            return profile
+
+    def clear(self) -> None:
+        """Discard every profile, forcing a new calibration."""
+        with self._lock:
+            self._profiles.clear()
+
+def init_app(app) -> None:
+    """
+    Create the noise profile cache of this worker process.
+
+    Args:
+        app: Flask application instance
+    """
+    app.extensions['noise_profiles'] = NoiseProfileCache(ttl=app.config.get('NOISE_PROFILE_TTL', 600))
+
+def get_noise_profiles() -> NoiseProfileCache:
+    """
+    Get the noise profile cache of the current application.
+
+    Returns:
+        NoiseProfileCache: Cache created by ``init_app``
+    """
+    return current_app.extensions['noise_profiles']
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Single-pass lexer that splits a Portuguese order into items.
+"""
+
+import re
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+from .transcript import Transcript, as_transcript
+
+# As palavras abaixo estão sem acento, como em Transcript.folded
+_DIGITS = re.compile(r"(\d+)x?")
+SEPARATORS = {',', ';', '.', '!', '?', 'e'}
+
+NUMBER_WORDS = {
+    'um': 1, 'uma': 1,
+    'dois': 2, 'duas': 2,
+    'tres': 3,
+    'quatro': 4,
+    'cinco': 5,
+    'seis': 6,
+    'sete': 7,
+    'oito': 8,
+    'nove': 9,
+    'dez': 10,
+    'onze': 11,
+    'doze': 12,
+    'quinze': 15,
+    'vinte': 20
+}
+DOZEN_WORDS = {'duzia', 'duzias'}
+
+# Palavras entre a quantidade e o produto ("2 x", "3 unidades de")
+QUANTITY_UNITS = {'x', 'unidade', 'unidades', 'un', 'de', 'do', 'da'}
+
+# Pedidos de remoção; "não quero" ocupa duas palavras
+REMOVAL_WORDS = {'sem', 'tira', 'tire', 'tirar', 'tirando', 'retira', 'retire', 'retirar'}
+
+# Palavras que não fazem parte do nome do produto nem do ingrediente
+FILLER_WORDS = {
+    'quero', 'queria', 'gostaria', 'vou', 'querer', 'eu', 'me', 'mim', 'pra', 'para',
+    'manda', 'mande', 'traz', 'traga', 've', 'pode', 'poderia', 'mas', 'entao',
+    'tambem', 'mais', 'so', 'por', 'favor', 'o', 'a', 'os', 'as', 'de', 'do', 'da',
+    'dos', 'das', 'meia'
+}
+
+class OrderItem(NamedTuple):
+    """One item of an order, as said by the customer."""
+
+    quantity: Optional[int]
+    """Quantity said before the product, or None if none was said."""
+    product: str
+    """Text naming the product, as it appears in the transcript."""
+    span: Tuple[int, int]
+    """Offsets of ``product`` in the transcript."""
+    modifiers: List[str]
+    """Ingredients the customer asked to remove."""
+
+class _Builder:
+    """Item being read."""
+
+    def __init__(self, quantity: Optional[int] = None):
+        self.quantity = quantity
+        self.start = self.end = None
+        self.modifiers: List[List[int]] = []
+
+def lex_order(texto: Union[str, Transcript]) -> List[OrderItem]:
+    """
+    Split a transcribed order into items in a single pass.
+
+    Quantities may be digits or number words ("dois", "uma dúzia de").
+    Items are separated by "e", commas or a new quantity; removals
+    ("sem cebola", "não quero picles", "pode tirar a cebola") apply to the
+    item before them, even when said after a separator.
+
+    Args:
+        texto: Texto transcrito do pedido (str ou Transcript)
+
+    Returns:
+        list: Items in the order they were said; items without a product
+        name are dropped
+    """
+    tokens = as_transcript(texto).tokens
+    items: List[_Builder] = []
+    current: Optional[_Builder] = None
+    removing = False
+    closed = True
+    i = 0
+
+    while i < len(tokens):
+        word, start, end = tokens[i]
+        i += 1
+        following = tokens[i][0] if i < len(tokens) else ''
+
+        # Separadores: o próximo nome começa um novo item
+        if word in SEPARATORS:
+            closed = True
+            continue
+
+        # Quantidade: começa um novo item
+        digits = _DIGITS.fullmatch(word)
+        quantity = int(digits.group(1)) if digits else NUMBER_WORDS.get(word)
+        if word == 'meia' and following in DOZEN_WORDS:
+            quantity = 6
+        elif quantity is not None and following in DOZEN_WORDS:
+            quantity *= 12
+        if quantity is not None:
+            if following in DOZEN_WORDS:
+                i += 1
+            while i < len(tokens) and tokens[i][0] in QUANTITY_UNITS:
+                i += 1
+            current = _Builder(quantity)
+            items.append(current)
+            removing = closed = False
+            continue
+
+        # Remoção de ingredientes do item anterior
+        if word in REMOVAL_WORDS or (word == 'nao' and following == 'quero'):
+            if word == 'nao':
+                i += 1
+            if current is not None:
+                current.modifiers.append([])
+                removing = True
+            closed = False
+            continue
+
+        if word in FILLER_WORDS:
+            continue
+
+        if removing and not closed:
+            modifier = current.modifiers[-1]
+            if not modifier:
+                modifier.append(start)
+            modifier[1:] = [end]
+            continue
+
+        # Nome do produto
+        if current is None or (closed and current.start is not None):
+            current = _Builder()
+            items.append(current)
+        if current.start is None:
+            current.start = start
+        current.end = end
+        removing = closed = False
+
+    return [
+        OrderItem(
+            item.quantity,
+            texto[item.start:item.end],
+            (item.start, item.end),
+            [texto[m[0]:m[1]] for m in item.modifiers if m]
+        )
+        for item in items
+        if item.start is not None
+    ]
@@ -3,10 +3,55 @@
 Order processing service for handling order-related operations.
 """
 
+import json
+import os
 import re
-from typing import Dict, List, Any, Optional
+import threading
+from typing import Dict, Hashable, List, Any, Optional, Tuple, Union
 
-def extrair_informacoes(texto: str) -> Dict[str, str]:
+from .info_extractor import TELEFONE, ExtractedField, InfoExtractor, extracted_field, only_digits
+from .order_lexer import (
+    DOZEN_WORDS,
+    FILLER_WORDS,
+    NUMBER_WORDS,
+    QUANTITY_UNITS,
+    REMOVAL_WORDS,
+    SEPARATORS,
+    OrderItem,
+    lex_order
+)
+from .transcript import _FOLD, Transcript, accent_insensitive, as_transcript
+
+# Compilado uma vez: o telefone separa o nome (antes) do endereço (depois)
+_EXTRATOR = InfoExtractor(TELEFONE, lowercase=False)
+# Mesmo padrão com os grupos do DDD, prefixo e sufixo, para extrair_informacoes
+_TELEFONE = re.compile(r'(\d{2})[\s\-]?(\d{5})[\s\-]?(\d{4})')
+
+def extrair_campos(texto: Union[str, Transcript]) -> Dict[str, ExtractedField]:
+    """
+    Extrai as informações do cliente com a posição de cada uma no texto.
+    
+    Args:
+        texto: Texto transcrito do áudio
+        
+    Returns:
+        Dict com os campos encontrados (nome, telefone, endereco)
+    """
+    campos = {}
+    telefone = _EXTRATOR.extract(texto).get("telefone")
+    if telefone:
+        inicio, fim = telefone.span
+        campos["telefone"] = ExtractedField(only_digits(telefone.value), telefone.span)
+        
+        # Nome antes do telefone, endereço depois
+        for campo, trecho in (("nome", (0, inicio)), ("endereco", (fim, len(texto)))):
+            extraido = extracted_field(texto, *trecho)
+            if extraido:
+                campos[campo] = extraido
+    
+    return campos
+
+def extrair_informacoes(texto: Union[str, Transcript]) -> Dict[str, str]:
     """
     Extrai informações do cliente a partir do texto transcrito.
     
@@ -22,26 +67,320 @@ def extrair_informacoes(texto: str) -> Dict[str, str]:
         "endereco": ""
     }
     
-    # Extrair telefone
-    telefone_match = re.search(r'(\d{2})[\s\-]?(\d{5})[\s\-]?(\d{4})', texto)
+    # Uma única busca, com o padrão compilado na importação
+    telefone_match = _TELEFONE.search(texto)
     if telefone_match:
-        informacoes["telefone"] = f"{telefone_match.group(1)}{telefone_match.group(2)}{telefone_match.group(3)}"
+        informacoes["telefone"] = "".join(telefone_match.groups())
+        
+        # Nome antes do telefone, endereço depois
+        informacoes["nome"] = texto[:telefone_match.start()].strip()
+        informacoes["endereco"] = texto[telefone_match.end():].strip()
     
-    # Extrair nome (assume que o nome vem antes do telefone)
-    if telefone_match:
-        nome_text = texto[:telefone_match.start()].strip()
-        if nome_text:
-            informacoes["nome"] = nome_text
+    return informacoes
+
+def _trie_regex(terms: List[str]) -> str:
+    """
+    Build an alternation of terms factored by common prefix.
+
+    The regex engine then follows one branch per character, like an
+    Aho-Corasick automaton, instead of trying every term at each position;
+    longer terms are preferred ("batata frita" over "batata").
+    """
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        pattern = '(?:' + '|'.join(branches) + ')'
+        return pattern + '?' if '' in node else pattern
+
+    return build(trie)
+
+# Palavras com papel no pedido: um termo do catálogo dentro delas confundiria o atalho
+_PALAVRAS_DO_PEDIDO = set(NUMBER_WORDS) | DOZEN_WORDS | QUANTITY_UNITS | REMOVAL_WORDS | FILLER_WORDS | SEPARATORS | {'nao'}
+
+# O que só o lexer sabe tratar fora da quantidade de um produto
+_ESPECIAIS = frozenset(NUMBER_WORDS) | DOZEN_WORDS | REMOVAL_WORDS | {'nao'}
+
+# Hífen, sublinhado ou símbolos: o lexer separa as palavras de outro jeito
+_ESTRANHA = 1 << 30
+
+def _termo_simples(termo: str) -> bool:
+    """Whether the lexer reads a catalog term alone as one plain product name."""
+    if any(termo in palavra for palavra in _PALAVRAS_DO_PEDIDO):
+        return False
+    # Depois de uma quantidade, o lexer pula as unidades ("2 x burguer" é "burguer")
+    palavras = termo.split()
+    if not palavras or palavras[0] in QUANTITY_UNITS:
+        return False
+    return lex_order(termo) == [OrderItem(None, termo, (0, len(termo)), [])]
+
+def _valor(palavra: str) -> Optional[int]:
+    """Quantity read by the lexer from a word without accents ("2", "2x", "duas"), or None."""
+    if palavra.isdecimal():
+        return int(palavra)
+    if palavra[-1:] == 'x' and palavra[:-1].isdecimal():
+        return int(palavra[:-1])
+    return NUMBER_WORDS.get(palavra)
+
+def _sem_pontuacao(texto: str) -> str:
+    """Text with the punctuation that separates items turned into spaces."""
+    return texto.replace(',', ' ').replace(';', ' ').replace('.', ' ').replace('!', ' ').replace('?', ' ')
+
+class _Memo(dict):
+    """
+    Values computed on first lookup and kept, up to a size.
     
-    # Extrair endereço (assume que o endereço vem depois do telefone)
-    if telefone_match:
-        endereco_text = texto[telefone_match.end():].strip()
-        if endereco_text:
-            informacoes["endereco"] = endereco_text
+    Orders repeat the same words, so ``map(memo.__getitem__, ...)`` stays
+    in C for almost all of them.
+    """
     
-    return informacoes
+    def __init__(self, func, maximo: int = 10000):
+        super().__init__()
+        self.func = func
+        self.maximo = maximo
+    
+    def __missing__(self, chave):
+        valor = self.func(chave)
+        if len(self) >= self.maximo:
+            self.clear()
+        self[chave] = valor
+        return valor
 
-def process_order(texto: str, products: Dict[str, float], synonyms: Dict[str, str]) -> Optional[List[Dict[str, Any]]]:
+def _peso(palavra: str) -> int:
+    """
+    Weight of a word of the text for the plain-order shortcut.
+    
+    Args:
+        palavra: Lowercase word, as split by whitespace ("refri,")
+        
+    Returns:
+        int: How many quantities, removals and dozens it has (the shortcut
+        only accepts quantities right before a product), or ``_ESTRANHA``
+        if the lexer splits it differently
+    """
+    partes = _sem_pontuacao(palavra).split()
+    if partes != [palavra]:
+        return sum(map(_PESOS.__getitem__, partes))
+    if not palavra.isalnum():
+        return _ESTRANHA
+    dobrada = palavra if palavra.isascii() else palavra.translate(_FOLD)
+    return int(dobrada in _ESPECIAIS or _valor(dobrada) is not None)
+
+def _quantidade(invertida: str) -> int:
+    """Quantity of a reversed quantity word ("2", "sêrt"); 1 if there is none."""
+    palavra = invertida[::-1]
+    if not palavra.isascii():
+        palavra = palavra.translate(_FOLD)
+    return _valor(palavra) or 1 if palavra else 1
+
+_PESOS = _Memo(_peso)
+_QUANTIDADES = _Memo(_quantidade)
+
+def _sobrepostos(terms: Dict[str, str]) -> bool:
+    """
+    Whether a term ends with the first words of another ("pizza doce" and "doce de leite").
+    
+    Read from the end, the text would then give other mentions than read
+    from the start, as the lexer does.
+    """
+    prefixos = {termo[:i] for termo in terms for i in range(1, len(termo))}
+    return any(
+        termo[i:] in prefixos
+        for termo in terms
+        for i in range(1, len(termo))
+        if termo[i - 1].isspace() and not termo[i].isspace()
+    )
+
+def _reverse_regex(terms: List[str]) -> str:
+    """
+    Regex of the reversed text: a term, then what was said right before it.
+    
+    Groups: the reversed term; the reversed quantity ("2", "2x", "três")
+    when only whitespace and units ("unidades de") come between it and the
+    term; and the character glued before the term, if any.
+    """
+    def alternativas(palavras):
+        return '|'.join(accent_insensitive(palavra[::-1]) for palavra in sorted(palavras, key=len, reverse=True))
+    
+    return (
+        f'({_trie_regex([termo[::-1] for termo in terms])})'
+        rf'(?:\s+(?:(?:{alternativas(QUANTITY_UNITS)})\s+)*(x?\d+|{alternativas(NUMBER_WORDS)})(?!\S)|(?=\S)(.))?'
+    )
+
+class ProductMatcher:
+    """
+    Finds the products named in a text in a single pass.
+
+    Product names and synonyms are compiled into one regex, so each
+    mention is matched once.
+    
+    Most orders are plain ("2 pizza e um refri": each quantity right
+    before its product); ``quantities`` reads them with a second regex,
+    over the reversed text, that matches each product together with the
+    quantity said before it. Anything else is left to the lexer.
+    """
+    
+    def __init__(self, terms: Dict[str, str]):
+        """
+        Compile the matcher.
+        
+        Args:
+            terms: Lowercase name or synonym -> product name
+        """
+        self.terms = terms
+        self.order = {produto: i for i, produto in enumerate(dict.fromkeys(terms.values()))}
+        self.pattern = re.compile(_trie_regex(list(terms))) if terms else None
+        # O atalho só vale quando o lexer lê cada termo como um nome simples
+        self.reverse = None
+        if terms and all(_termo_simples(termo) for termo in terms) and not _sobrepostos(terms):
+            self.reverse = re.compile(_reverse_regex(list(terms)))
+            self.reversed_terms = {termo[::-1]: produto for termo, produto in terms.items()}
+    
+    @classmethod
+    def from_catalog(
+        cls,
+        products: Dict[str, float],
+        synonyms: Dict[str, str],
+        global_synonyms: Optional[Dict[str, List[str]]] = None
+    ) -> 'ProductMatcher':
+        """
+        Build the matcher of a catalog.
+        
+        Args:
+            products: Dicionário de produtos e preços
+            synonyms: Sinônimo -> produto
+            global_synonyms: Produto -> sinônimos (``data/global_synonyms.json``);
+                only products present in the catalog are used
+                
+        Returns:
+            ProductMatcher: Compiled matcher
+        """
+        names = {produto.lower(): produto for produto in products}
+        terms = {nome: produto for nome, produto in names.items()}
+        for produto, lista in (global_synonyms or {}).items():
+            if produto.lower() in names:
+                for sin in lista:
+                    terms.setdefault(sin.lower(), names[produto.lower()])
+        for sin, produto in synonyms.items():
+            if produto.lower() in names:
+                terms[sin.lower()] = names[produto.lower()]
+        return cls(terms)
+    
+    def find(self, texto: str) -> List[str]:
+        """
+        Find the products named in a text.
+        
+        Args:
+            texto: Texto em minúsculas
+            
+        Returns:
+            list: Products in order of mention
+        """
+        if self.pattern is None:
+            return []
+        return [self.terms[match.group()] for match in self.pattern.finditer(texto)]
+    
+    def quantities(self, texto: str) -> Optional[Dict[str, int]]:
+        """
+        Read a plain order in a single pass, as the lexer would.
+        
+        Args:
+            texto: Texto em minúsculas
+            
+        Returns:
+            dict: Product -> quantity of its first mention, or None when
+            the text has a removal, a dozen, a quantity not right before a
+            product or words the lexer splits differently (the lexer is
+            needed)
+        """
+        if self.reverse is None:
+            return None
+        # Quantidades, remoções e dúzias; cada quantidade precisa vir logo antes de um produto
+        pendentes = sum(map(_PESOS.__getitem__, texto.split()))
+        if pendentes >= _ESTRANHA:
+            return None
+        
+        # De trás para frente, o produto vem antes da sua quantidade e o regex lê os dois
+        mencoes = self.reverse.findall(texto[::-1])
+        if not mencoes:
+            return None if pendentes else {}
+        termos, quantidades, colados = zip(*mencoes)
+        # O produto começa uma palavra ("pizzas" vale; "xpizza" fica para o lexer)
+        if colados.count('') != len(colados) or len(quantidades) - quantidades.count('') != pendentes:
+            return None
+        # A primeira menção de cada produto é a última a ser gravada
+        return dict(zip(map(self.reversed_terms.__getitem__, termos), map(_QUANTIDADES.__getitem__, quantidades)))
+
+# (chave do catálogo, matcher): trocados juntos, para serem lidos sem o lock
+_matcher: Optional[Tuple[tuple, ProductMatcher]] = None
+_matcher_lock = threading.Lock()
+
+def _load_global_synonyms(path: Optional[str]) -> Dict[str, List[str]]:
+    """Read the global synonyms file, if there is one."""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def get_matcher(
+    products: Dict[str, float],
+    synonyms: Dict[str, str],
+    synonyms_file: Optional[str] = None,
+    version: Optional[Hashable] = None
+) -> ProductMatcher:
+    """
+    Get the compiled matcher of a catalog.
+    
+    The matcher is compiled again when the catalog version changes or,
+    without a version, when a product name or synonym changes (also in
+    place, in the same dict); and when the synonyms file is modified.
+    Comparing the names costs about 40 µs per call for a thousand
+    products; a version skips it.
+    
+    Args:
+        products: Dicionário de produtos e preços
+        synonyms: Sinônimo -> produto
+        synonyms_file: Path of ``global_synonyms.json`` (optional)
+        version: Version of the catalog (e.g. its last update time)
+        
+    Returns:
+        ProductMatcher: Matcher of the catalog
+    """
+    global _matcher
+    mtime = os.path.getmtime(synonyms_file) if synonyms_file and os.path.exists(synonyms_file) else None
+    if version is not None:
+        catalog = ('version', version)
+    else:
+        # Os preços ficam fora da chave: são lidos do catálogo a cada pedido
+        catalog = (list(products), synonyms)
+    key = (catalog, synonyms_file, mtime)
+    atual = _matcher
+    if atual is not None and atual[0] == key:
+        return atual[1]
+    with _matcher_lock:
+        if _matcher is None or _matcher[0] != key:
+            if version is None:
+                # Cópia: o dict pode mudar depois, no mesmo objeto
+                key = ((catalog[0], dict(synonyms)), synonyms_file, mtime)
+            _matcher = (key, ProductMatcher.from_catalog(products, synonyms, _load_global_synonyms(synonyms_file)))
+        return _matcher[1]
+
+def process_order(
+    texto: Union[str, Transcript],
+    products: Dict[str, float],
+    synonyms: Dict[str, str],
+    synonyms_file: Optional[str] = None,
+    catalog_version: Optional[Hashable] = None
+) -> Optional[List[Dict[str, Any]]]:
     """
     Processa o texto do pedido e retorna os itens identificados.
     
@@ -49,31 +388,36 @@ def process_order(texto: str, products: Dict[str, float], synonyms: Dict[str, st
         texto: Texto transcrito do pedido
         products: Dicionário de produtos e preços
         synonyms: Dicionário de sinônimos para produtos
+        synonyms_file: Arquivo JSON com mais sinônimos por produto (opcional)
+        catalog_version: Versão do catálogo; sem ela, os nomes são comparados a cada pedido
         
     Returns:
         Lista de itens do pedido ou None se não conseguir processar
     """
-    itens = []
-    texto = texto.lower()
-    
-    # Substituir sinônimos
-    for sin, prod in synonyms.items():
-        texto = texto.replace(sin.lower(), prod.lower())
-    
-    # Procurar por produtos e quantidades
-    for produto, preco in products.items():
-        produto = produto.lower()
-        if produto in texto:
-            # Tentar extrair quantidade
-            quantidade = 1
-            qtd_match = re.search(rf'(\d+)\s*{produto}', texto)
-            if qtd_match:
-                quantidade = int(qtd_match.group(1))
-            
-            itens.append({
-                "produto": produto,
-                "quantidade": quantidade,
-                "preco": preco
-            })
+    matcher = get_matcher(products, synonyms, synonyms_file, catalog_version)
+    
+    # Pedido simples: uma passada só; senão, o lexer separa os itens
+    minusculo = texto.lowered if isinstance(texto, Transcript) else texto.lower()
+    if len(minusculo) != len(texto):
+        minusculo = as_transcript(texto).lowered
+    encontrados = matcher.quantities(minusculo)
+    if encontrados is None:
+        transcricao = as_transcript(texto)
+        # Quantidade dita antes de cada produto; vale a primeira menção
+        encontrados = {}
+        for item in lex_order(transcricao):
+            inicio, fim = item.span
+            for i, produto in enumerate(matcher.find(transcricao.lowered[inicio:fim])):
+                encontrados.setdefault(produto, item.quantity if i == 0 and item.quantity else 1)
+    
+    # Itens na ordem do catálogo
+    itens = [
+        {
+            "produto": produto.lower(),
+            "quantidade": encontrados[produto],
+            "preco": products[produto]
+        }
+        for produto in sorted(encontrados, key=matcher.order.__getitem__)
+    ]
     
-    return itens if itens else None 
\ No newline at end of file
+    return itens if itens else None
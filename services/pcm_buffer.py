@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Preallocated PCM buffer reused across recordings.
+"""
+
+class PCMBuffer:
+    """
+    Fixed-size ``bytearray`` that recorded chunks are copied into.
+
+    The buffer is allocated once for the longest capture and rewound at
+    the start of every recording, so memory per turn stays flat. Readers
+    get a ``memoryview`` of the recorded region instead of a copy; the
+    view is only valid until the next recording rewinds the buffer.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Initialize the buffer.
+
+        Args:
+            capacity: Size of the buffer in bytes
+        """
+        self._data = bytearray(capacity)
+        self._view = memoryview(self._data)
+        self._size = 0
+
+    @property
+    def capacity(self) -> int:
+        """Size of the buffer in bytes."""
+        return len(self._data)
+
+    @property
+    def size(self) -> int:
+        """Number of bytes recorded so far."""
+        return self._size
+
+    @property
+    def full(self) -> bool:
+        """Whether the buffer has no room left."""
+        return self._size >= len(self._data)
+
+    def clear(self) -> None:
+        """Rewind the buffer for a new recording (no reallocation)."""
+        self._size = 0
+
+    def write(self, chunk: bytes) -> int:
+        """
+        Copy a chunk into the buffer.
+
+        Args:
+            chunk: Raw PCM data
+
+        Returns:
+            int: Number of bytes written (less than the chunk when full)
+        """
+        count = min(len(chunk), len(self._data) - self._size)
+        self._view[self._size:self._size + count] = chunk[:count] if count < len(chunk) else chunk
+        self._size += count
+        return count
+
+    def view(self) -> memoryview:
+        """
+        Zero-copy view of the recorded region.
+
+        Returns:
+            memoryview: Recorded PCM data
+        """
+        return self._view[:self._size]
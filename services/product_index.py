@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Hash index from product names and synonyms to catalog products.
+"""
+
+import threading
+from typing import Any, Dict, Hashable, List, Optional
+
+from .transcript import Transcript
+
+def normalize_name(nome: str) -> str:
+    """Lowercase a product name, fold its accents and collapse its whitespace."""
+    return ' '.join(Transcript(nome).folded.split())
+
+class ProductIndex:
+    """
+    Resolves a spoken product name to a catalog product in O(1).
+
+    Names and synonyms are indexed by their normalized form, so accents
+    missing from the transcription still match. When two
+    products share a name or synonym, the first one in the catalog wins,
+    as in the linear search this replaces.
+    """
+
+    def __init__(self, produtos: List[Dict[str, Any]], sinonimos: Dict[str, List[str]]):
+        """
+        Build the index.
+
+        Args:
+            produtos: Catalog products (``id``, ``nome``, ``preco``)
+            sinonimos: Lowercase product name -> its synonyms
+        """
+        self.products: Dict[Any, Dict[str, Any]] = {}
+        self.ids: Dict[str, Any] = {}
+        for produto in produtos:
+            self.products.setdefault(produto['id'], produto)
+            nome = produto['nome'].lower()
+            for termo in [nome, *sinonimos.get(nome, [])]:
+                self.ids.setdefault(normalize_name(termo), produto['id'])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def lookup(self, nome: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the product with a given name or synonym.
+
+        Args:
+            nome: Name as spoken in the order
+
+        Returns:
+            The product, or None if the name is unknown
+        """
+        produto_id = self.ids.get(normalize_name(nome))
+        return None if produto_id is None else self.products[produto_id]
+
+    def lookup_prefix(self, nome: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the product named by the longest leading run of words.
+
+        Lets "big mac bem passado" resolve to "Big Mac".
+
+        Args:
+            nome: Name as spoken in the order
+
+        Returns:
+            The product, or None if no prefix is a known name
+        """
+        palavras = nome.split()
+        for n in range(len(palavras), 0, -1):
+            produto = self.lookup(' '.join(palavras[:n]))
+            if produto is not None:
+                return produto
+        return None
+
+_index_key = None
+_index: Optional[ProductIndex] = None
+_index_lock = threading.Lock()
+
+def get_product_index(
+    produtos: List[Dict[str, Any]],
+    sinonimos: Dict[str, List[str]],
+    version: Optional[Hashable] = None
+) -> ProductIndex:
+    """
+    Get the index of a catalog, building it once per catalog version.
+
+    Args:
+        produtos: Catalog products
+        sinonimos: Lowercase product name -> its synonyms
+        version: Version of the catalog (e.g. its last update time). Without
+            it, the index is rebuilt when a product or synonym changes (also
+            in place, in the same list). Comparing the catalog costs about
+            0.3 ms per thousand products; a version skips it.
+
+    Returns:
+        ProductIndex: Index of the catalog
+    """
+    global _index_key, _index
+    if version is not None:
+        key = ('version', version)
+    else:
+        # Cópias rasas: uma edição posterior do catálogo não altera a chave guardada
+        key = (list(map(dict, produtos)), list(sinonimos), list(map(tuple, sinonimos.values())))
+    with _index_lock:
+        if key != _index_key:
+            _index = ProductIndex(produtos, sinonimos)
+            _index_key = key
+        return _index
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Spoken response templates whose fixed parts are synthesized only once.
+"""
+
+import ast
+import inspect
+import re
+from string import Formatter
+from typing import Callable, Iterable, List, Optional, Sequence
+
+from .audio_clip import AudioClip
+
+class Prompt(str):
+    """
+    Text of a response that also keeps the segments it was built from.
+
+    It behaves as the full string everywhere (JSON, logs, comparisons);
+    TextToSpeech uses ``segments`` to synthesize each part separately, so
+    the fixed text and common slot values are served from the cache.
+    """
+
+    def __new__(cls, segments: Sequence[str]):
+        prompt = super().__new__(cls, ''.join(segments))
+        prompt.segments = tuple(segments)
+        return prompt
+
+class PromptTemplate:
+    """A ``str.format`` template split into fixed segments and slots."""
+
+    def __init__(self, template: str):
+        """
+        Parse the template.
+
+        Args:
+            template: Text with ``{slot}`` fields, optionally with a format
+                spec (e.g. ``{total:.2f}``)
+        """
+        self.template = template
+        self._parts = list(Formatter().parse(template))
+
+    @property
+    def fixed_segments(self) -> List[str]:
+        """Fixed text between the slots, in order."""
+        return [literal for literal, _, _, _ in self._parts if literal]
+
+    def fill(self, **values) -> Prompt:
+        """
+        Fill the slots of the template.
+
+        Args:
+            **values: Value of each slot; a Prompt value contributes its
+                own segments
+
+        Returns:
+            Prompt: Full text and its segments
+        """
+        segments = []
+        for literal, field, spec, conversion in self._parts:
+            if literal:
+                segments.append(literal)
+            if field is None:
+                continue
+            value = values[field]
+            if isinstance(value, Prompt):
+                segments.extend(value.segments)
+                continue
+            if conversion:
+                value = Formatter().convert_field(value, conversion)
+            segments.append(format(value, spec or ''))
+        return Prompt(segments)
+
+def join_prompts(prompts: Iterable[Prompt], separator: str) -> Prompt:
+    """
+    Join prompts like ``str.join``, keeping their segments.
+
+    Args:
+        prompts: Prompts to join
+        separator: Text placed between them
+
+    Returns:
+        Prompt: Joined prompt
+    """
+    segments = []
+    for i, prompt in enumerate(prompts):
+        if i:
+            segments.append(separator)
+        segments.extend(prompt.segments)
+    return Prompt(segments)
+
+def is_spoken(segment: str) -> bool:
+    """Whether a segment has anything to pronounce (not only spaces or punctuation)."""
+    return any(c.isalnum() for c in segment)
+
+def splice(prompt: Prompt, synthesize: Callable[[str], Optional[AudioClip]]) -> Optional[AudioClip]:
+    """
+    Build the audio of a prompt by concatenating the PCM of its segments.
+
+    Each segment is trimmed of the silence the engine adds around it, so
+    the parts join without gaps.
+
+    Args:
+        prompt: Prompt to be spoken
+        synthesize: Returns the (cached) audio of a text
+
+    Returns:
+        AudioClip, or None if any segment could not be synthesized
+    """
+    clips = []
+    for segment in prompt.segments:
+        if not is_spoken(segment):
+            continue
+        clip = synthesize(segment.strip())
+        if clip is None:
+            return None
+        clips.append(clip.trim_silence())
+    return AudioClip.concat(clips) if clips else None
+
+# Fim de frase, ou vírgula seguida de espaço
+_BOUNDARY = re.compile(r'(?<=[.!?;,])\s+')
+
+def split_clauses(text: str, min_chars: int = 40) -> List[Prompt]:
+    """
+    Split a response into sentences, and long sentences into clauses, so
+    each part can be synthesized and played while the next is rendered.
+    
+    A comma only ends a clause once it has ``min_chars`` characters; the
+    segments of a Prompt are kept, so clauses still splice from the cache.
+    
+    Args:
+        text: Text or Prompt to split
+        min_chars: Minimum length of a clause ended by a comma
+        
+    Returns:
+        list: Clauses in order, as Prompts
+    """
+    segments = text.segments if isinstance(text, Prompt) else (text,)
+    clauses = []
+    current = []
+    
+    def close():
+        if any(is_spoken(s) for s in current):
+            clauses.append(Prompt(current))
+        current.clear()
+    
+    for segment in segments:
+        start = 0
+        for match in _BOUNDARY.finditer(segment):
+            if match.start() > start:
+                current.append(segment[start:match.start()])
+            start = match.end()
+            if segment[match.start() - 1] != ',' or sum(map(len, current)) >= min_chars:
+                close()
+            else:
+                current.append(match.group())
+        if start < len(segment):
+            current.append(segment[start:])
+    close()
+    return clauses
+
+# Respostas personalizadas
+AGRADECIMENTO_NOME = PromptTemplate("Obrigado, {nome}. Agora, informe seu endereço completo.")
+CONFIRMACAO_PEDIDO = PromptTemplate(
+    "Confirmando seu pedido: {itens}. Total: R$ {total:.2f}. Deseja confirmar ou fazer alterações?"
+)
+ITEM_PEDIDO = PromptTemplate("{quantidade} {produto}")
+
+TEMPLATES = [AGRADECIMENTO_NOME, CONFIRMACAO_PEDIDO, ITEM_PEDIDO]
+
+def confirmacao_pedido(itens: List[dict], total: float) -> Prompt:
+    """
+    Build the order confirmation, with each quantity and product as its own slot.
+
+    Args:
+        itens: Processed order items (``quantidade`` and ``produto``)
+        total: Order total
+
+    Returns:
+        Prompt: Confirmation message
+    """
+    itens_texto = join_prompts(
+        (ITEM_PEDIDO.fill(quantidade=item['quantidade'], produto=item['produto']) for item in itens),
+        ", "
+    )
+    return CONFIRMACAO_PEDIDO.fill(itens=itens_texto, total=total)
+
+def find_static_prompts(*modules) -> List[str]:
+    """
+    Collect the literal responses assigned to ``response_text`` in modules.
+
+    Args:
+        *modules: Controller modules to scan
+
+    Returns:
+        list: Distinct response strings, in order of appearance
+    """
+    found = []
+    for module in modules:
+        for node in ast.walk(ast.parse(inspect.getsource(module))):
+            if not (isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant)):
+                continue
+            text = node.value.value
+            if (
+                isinstance(text, str)
+                and any(isinstance(t, ast.Name) and t.id == 'response_text' for t in node.targets)
+                and text not in found
+            ):
+                found.append(text)
+    return found
+
+def warm_texts(static_prompts: Iterable[str], templates: Iterable[PromptTemplate] = TEMPLATES, clauses: bool = False) -> List[str]:
+    """
+    Texts whose audio is looked up in the cache when the prompts are spoken.
+
+    Args:
+        static_prompts: Fixed responses
+        templates: Templates whose fixed segments are spliced
+        clauses: Whether responses are synthesized clause by clause
+            (background synthesis) instead of whole
+
+    Returns:
+        list: Distinct texts to be synthesized
+    """
+    texts = []
+    for prompt in static_prompts:
+        if clauses:
+            texts.extend(str(clause) for clause in split_clauses(prompt))
+        else:
+            texts.append(prompt)
+    for template in templates:
+        texts.extend(segment.strip() for segment in template.fixed_segments if is_spoken(segment))
+    return list(dict.fromkeys(texts))
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Background synthesis of spoken responses played by the client.
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional
+
+from flask import current_app
+
+from .audio_clip import AudioClip
+from .prompts import split_clauses
+from .text_to_speech import TextToSpeech
+
+class SynthesisError(RuntimeError):
+    """The engine could not synthesize part of a response."""
+
+class SpeechJob:
+    """
+    Synthesis of one response, split into clauses rendered in order.
+
+    The clauses are queued together, so while the first one is being
+    streamed the next ones are already being synthesized.
+    """
+
+    def __init__(self, clauses: List[Future]):
+        """
+        Initialize the job.
+
+        Args:
+            clauses: Futures resolving to the audio of each clause
+        """
+        self.clauses = clauses
+
+    def done(self) -> bool:
+        """Whether every clause has been synthesized."""
+        return all(future.done() for future in self.clauses)
+
+    def iter_clips(self, timeout: Optional[float] = None) -> Iterator[AudioClip]:
+        """
+        Yield the audio of each clause as soon as it is ready.
+
+        Args:
+            timeout: Maximum wait in seconds for each clause
+
+        Yields:
+            AudioClip: Audio of the next clause
+
+        Raises:
+            concurrent.futures.TimeoutError: If a clause takes longer than ``timeout``
+            SynthesisError: If a clause could not be synthesized
+        """
+        for future in self.clauses:
+            clip = future.result(timeout)
+            if clip is None:
+                raise SynthesisError("Não foi possível sintetizar a resposta.")
+            yield clip
+
+    def result(self, timeout: Optional[float] = None) -> AudioClip:
+        """
+        Wait for every clause and join them.
+
+        Args:
+            timeout: Maximum wait in seconds for each clause
+
+        Returns:
+            AudioClip: Audio of the whole response
+        """
+        clips = list(self.iter_clips(timeout))
+        if not clips:
+            raise SynthesisError("A resposta não tem texto a ser falado.")
+        first = clips[0]
+        return AudioClip.concat([clip.resample(first.sample_rate, first.channels) for clip in clips])
+
+class SpeechJobs:
+    """
+    Queue of responses to be synthesized off the request thread.
+
+    The turn handler submits the text and returns right away with a job
+    id; the audio endpoint waits for the job and serves the clip. Each
+    worker thread keeps its own TextToSpeech (engines are not thread-safe);
+    they share the prompt cache.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], TextToSpeech],
+        max_workers: int = 2,
+        max_jobs: int = 256,
+        min_clause_chars: int = 40
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            factory: Creates the TextToSpeech of a worker thread
+            max_workers: Number of synthesis threads
+            max_jobs: Number of finished jobs kept for download; the
+                oldest are forgotten first
+            min_clause_chars: Minimum length of a clause ended by a comma
+        """
+        self.factory = factory
+        self.max_jobs = max_jobs
+        self.min_clause_chars = min_clause_chars
+        self._jobs: 'OrderedDict[str, SpeechJob]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tts')
+
+    def submit(self, text: str) -> str:
+        """
+        Queue the synthesis of a response.
+
+        Args:
+            text: Text (or Prompt) to be spoken
+
+        Returns:
+            str: Job id used to fetch the audio
+        """
+        job_id = uuid.uuid4().hex
+        job = SpeechJob([
+            self._executor.submit(self._synthesize, clause)
+            for clause in split_clauses(text, self.min_clause_chars)
+        ])
+        with self._lock:
+            self._jobs[job_id] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[SpeechJob]:
+        """
+        Get a job by id.
+
+        Args:
+            job_id: Id returned by ``submit``
+
+        Returns:
+            SpeechJob, or None for an unknown or expired job
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _synthesize(self, text: str) -> Optional[AudioClip]:
+        """Synthesize a response on the current worker thread."""
+        tts = getattr(self._local, 'tts', None)
+        if tts is None:
+            tts = self._local.tts = self.factory()
+        return tts.synthesize(text)
+
+    def shutdown(self) -> None:
+        """Stop the workers."""
+        self._executor.shutdown(wait=False)
+
+def init_app(app) -> None:
+    """
+    Create the background synthesis queue of this worker process.
+
+    Must run after the prompt cache is created.
+
+    Args:
+        app: Flask application instance
+    """
+    config = app.config
+    cache = app.extensions.get('tts_cache')
+
+    def factory() -> TextToSpeech:
+        return TextToSpeech(
+            rate=config.get('SPEECH_RATE', 150),
+            volume=config.get('SPEECH_VOLUME', 0.9),
+            language=config.get('SPEECH_LANGUAGE', 'pt-BR'),
+            cache=cache
+        )
+
+    app.extensions['speech_jobs'] = SpeechJobs(factory, max_workers=config.get('TTS_WORKERS', 2))
+
+def get_speech_jobs() -> SpeechJobs:
+    """
+    Get the background synthesis queue of the current application.
+
+    Returns:
+        SpeechJobs: Queue created by ``init_app``
+    """
+    return current_app.extensions['speech_jobs']
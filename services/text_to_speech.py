@@ -3,17 +3,163 @@
 Text-to-speech service for converting text to audio.
 """
 
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import wave
 import pyttsx3
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Optional, TypeVar
+from flask import current_app
+
+from .audio_clip import AudioClip
+from .prompts import Prompt, find_static_prompts, splice, warm_texts
+from .tts_cache import TTSCache, cache_key, get_tts_cache
+
+T = TypeVar('T')
+
+_driver_locks: Dict[Optional[str], threading.Lock] = {}
+_driver_locks_guard = threading.Lock()
+
+def driver_lock(driver: Optional[str]) -> threading.Lock:
+    """
+    Get the lock that serializes rendering with a pyttsx3 driver.
+    
+    Args:
+        driver: pyttsx3 driver name, None for the platform default
+        
+    Returns:
+        threading.Lock: Lock shared by every engine of the driver
+    """
+    with _driver_locks_guard:
+        return _driver_locks.setdefault(driver, threading.Lock())
+
+class EngineRegistry:
+    """
+    One pyttsx3 engine per thread, created on first use and then reused.
+    
+    Loading the platform driver is the expensive part of ``pyttsx3.init``,
+    and engines must stay on the thread that created them. Each thread
+    therefore keeps its own engine, with rate and volume only updated when
+    they change; a wedged engine is discarded with ``reset``.
+    
+    The drivers (SAPI5/COM, NSSpeechSynthesizer, eSpeak) are not safe to
+    render from several threads at once, even through separate engines, so
+    registries of the same driver share ``lock``, which ``TextToSpeech``
+    holds while rendering to a file (not while speaking aloud).
+    """
+    
+    def __init__(self, driver: Optional[str] = None):
+        """
+        Initialize the registry.
+        
+        Args:
+            driver: pyttsx3 driver name, None for the platform default
+        """
+        self.driver = driver
+        self.created = 0
+        self.lock = driver_lock(driver)
+        self._local = threading.local()
+    
+    def get(self, rate: int, volume: float) -> pyttsx3.Engine:
+        """
+        Get the engine of the current thread.
+        
+        Args:
+            rate: Speech rate in words per minute
+            volume: Volume from 0.0 to 1.0
+            
+        Returns:
+            pyttsx3.Engine: Engine owned by the current thread
+        """
+        engine = getattr(self._local, 'engine', None)
+        if engine is None:
+            # pyttsx3.init compartilha o engine entre threads; aqui cada thread tem o seu
+            engine = pyttsx3.Engine(self.driver)
+            self._local.engine = engine
+            self._local.properties = None
+            self.created += 1
+        
+        if self._local.properties != (rate, volume):
+            engine.setProperty('rate', rate)  # Velocidade da fala
+            engine.setProperty('volume', volume)  # Volume (0.0 a 1.0)
+            self._local.properties = (rate, volume)
+        return engine
+    
+    def reset(self) -> None:
+        """Discard the engine of the current thread; the next ``get`` creates a new one."""
+        engine = getattr(self._local, 'engine', None)
+        self._local.engine = None
+        if engine is not None:
+            try:
+                engine.stop()
+                engine.endLoop()
+            except Exception:
+                pass
+
+# Engines do processo, um por thread
+ENGINES = EngineRegistry()
 
 class TextToSpeech:
     """Service for converting text to speech."""
     
-    def __init__(self):
-        """Initialize the text-to-speech engine."""
-        self.engine = pyttsx3.init()
-        self.engine.setProperty('rate', 150)  # Velocidade da fala
-        self.engine.setProperty('volume', 0.9)  # Volume (0.0 a 1.0)
+    ENGINE = 'pyttsx3'
+    
+    def __init__(
+        self,
+        rate: int = 150,
+        volume: float = 0.9,
+        language: str = 'pt-BR',
+        cache: Optional[TTSCache] = None,
+        audio=None,
+        engines: Optional[EngineRegistry] = None,
+        lock_timeout: float = 30.0
+    ):
+        """
+        Initialize the text-to-speech service.
+        
+        Args:
+            rate: Speech rate in words per minute
+            volume: Volume from 0.0 to 1.0
+            language: Language of the voice, part of the cache key
+            cache: Prompt cache; without one every prompt is synthesized
+            audio: Shared PyAudio instance used to play cached prompts
+            engines: Engine registry (defaults to the process-wide one)
+            lock_timeout: Maximum wait in seconds for the driver to be free
+                before a rendering is given up
+        """
+        self.rate = rate
+        self.volume = volume
+        self.language = language
+        self.cache = cache
+        self.audio = audio
+        self.engines = engines or ENGINES
+        self.lock_timeout = lock_timeout
+    
+    @property
+    def engine(self) -> pyttsx3.Engine:
+        """Engine of the current thread, created on first use."""
+        return self.engines.get(self.rate, self.volume)
+    
+    def _run(self, action: Callable[[pyttsx3.Engine], T]) -> T:
+        """
+        Run an action on the engine, recreating it once if it is wedged.
+        
+        Args:
+            action: Receives the engine of the current thread
+            
+        Returns:
+            Result of the action
+        """
+        try:
+            return action(self.engine)
+        except RuntimeError:
+            # Ex.: "run loop already started" após uma fala interrompida
+            self.engines.reset()
+            return action(self.engine)
     
     def speak(self, text: str) -> None:
         """
@@ -22,23 +168,185 @@ class TextToSpeech:
         Args:
             text: Text to be spoken
         """
-        self.engine.say(text)
-        self.engine.runAndWait()
+        clip = None
+        if self.cache is not None and self.audio is not None:
+            clip = self.synthesize(text)
+        
+        # Sem cache ou saída de áudio, o próprio engine fala o texto
+        if clip is None:
+            self._run(lambda engine: self._say(engine, text))
+            return
+        self.play(clip)
+    
+    def synthesize(self, text: str) -> Optional[AudioClip]:
+        """
+        Get the audio of a text from the cache, rendering it on a miss.
+        
+        A Prompt built from a template is assembled from the audio of its
+        segments, so only slot values never heard before are rendered.
+        
+        Args:
+            text: Text to be spoken
+        
+        Returns:
+            AudioClip, or None if the engine could not render the text
+        """
+        if isinstance(text, Prompt) and len(text.segments) > 1:
+            return splice(text, self._synthesize_text)
+        return self._synthesize_text(text)
+    
+    def _synthesize_text(self, text: str) -> Optional[AudioClip]:
+        """Get the audio of a single text from the cache, rendering it on a miss."""
+        key = cache_key(text, self.language, self.rate, self.volume, self.ENGINE)
+        if self.cache is None:
+            return self._render(text)
+        return self.cache.get_or_render(key, lambda: self._render(text))
+    
+    def play(self, clip: AudioClip) -> None:
+        """
+        Play PCM audio on the default output device.
+        
+        Args:
+            clip: Audio to be played
+        """
+        stream = self.audio.open(
+            format=self.audio.get_format_from_width(clip.sample_width),
+            channels=clip.channels,
+            rate=clip.sample_rate,
+            output=True
+        )
+        try:
+            stream.write(bytes(clip.frames))
+        finally:
+            stream.stop_stream()
+            stream.close()
+    
+    def _render(self, text: str) -> Optional[AudioClip]:
+        """Render a text to PCM through a temporary WAV file."""
+        fd, filename = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        try:
+            if not self.save_to_file(text, filename):
+                return None
+            return AudioClip.from_wav(filename)
+        except (OSError, EOFError, wave.Error):
+            # Alguns drivers (ex.: nsss) não geram WAV PCM
+            return None
+        finally:
+            os.unlink(filename)
     
     def save_to_file(self, text: str, filename: str) -> bool:
         """
         Convert text to speech and save to a file.
         
+        Only one rendering per driver runs at a time (see ``EngineRegistry``);
+        if the driver stays busy for ``lock_timeout`` seconds (e.g. a hung
+        engine), the rendering fails instead of waiting forever.
+        
         Args:
             text: Text to be spoken
             filename: Path to save the audio file
-            
+        
         Returns:
             bool: True if successful, False otherwise
         """
+        if not self.engines.lock.acquire(timeout=self.lock_timeout):
+            print(f"Erro: o driver de voz continua ocupado após {self.lock_timeout:.0f}s; síntese cancelada.")
+            return False
         try:
-            self.engine.save_to_file(text, filename)
-            self.engine.runAndWait()
+            self._run(lambda engine: self._save(engine, text, filename))
             return True
         except Exception:
-            return False 
\ No newline at end of file
+            return False
+        finally:
+            self.engines.lock.release()
+    
+    @staticmethod
+    def _say(engine: pyttsx3.Engine, text: str) -> None:
+        """Speak a text and wait until it finishes."""
+        engine.say(text)
+        engine.runAndWait()
+    
+    @staticmethod
+    def _save(engine: pyttsx3.Engine, text: str, filename: str) -> None:
+        """Render a text to a file and wait until it finishes."""
+        engine.save_to_file(text, filename)
+        engine.runAndWait()
+
+def create_text_to_speech() -> TextToSpeech:
+    """
+    Create a TextToSpeech configured by the current application, using its
+    prompt cache and shared audio output.
+    
+    Returns:
+        TextToSpeech: Service for the current request
+    """
+    config = current_app.config
+    audio_resources = current_app.extensions.get('audio')
+    return TextToSpeech(
+        rate=config.get('SPEECH_RATE', 150),
+        volume=config.get('SPEECH_VOLUME', 0.9),
+        language=config.get('SPEECH_LANGUAGE', 'pt-BR'),
+        cache=get_tts_cache(),
+        audio=audio_resources.get_pyaudio() if audio_resources else None,
+        lock_timeout=config.get('TTS_JOB_TIMEOUT', 30)
+    )
+
+def _render_prompt(text: str, rate: int, volume: float) -> Optional[AudioClip]:
+    """Render one prompt in a warm-up worker process (its own engine and driver)."""
+    try:
+        return TextToSpeech(rate=rate, volume=volume)._render(text)
+    except Exception:
+        # Ex.: driver indisponível neste processo
+        return None
+
+def warm_tts_cache(max_workers: Optional[int] = None) -> Dict[str, float]:
+    """
+    Synthesize, in parallel, every static response of the application's
+    controllers (and the fixed segments of the templates) into the prompt
+    cache, so the first callers do not pay for synthesis.
+    
+    The pyttsx3 drivers render one text at a time per process (see
+    ``EngineRegistry``), so the prompts missing from the cache are rendered
+    by a pool of processes and stored by this one.
+    
+    Args:
+        max_workers: Synthesis processes (defaults to ``TTS_WORKERS``)
+        
+    Returns:
+        dict: ``count`` of prompts rendered, ``failed``, ``bytes`` of PCM
+            and ``seconds`` taken
+    """
+    config = current_app.config
+    cache = get_tts_cache()
+    if cache is None or not cache.folder:
+        raise RuntimeError("O cache de prompts não tem pasta em disco (TTS_CACHE_FOLDER); o aquecimento não seria aproveitado.")
+    
+    modules = dict.fromkeys(sys.modules[bp.import_name] for bp in current_app.blueprints.values())
+    texts = warm_texts(find_static_prompts(*modules), clauses=config.get('TTS_MODE') == 'client')
+    rate = config.get('SPEECH_RATE', 150)
+    volume = config.get('SPEECH_VOLUME', 0.9)
+    language = config.get('SPEECH_LANGUAGE', 'pt-BR')
+    
+    started = time.perf_counter()
+    keys = {text: cache_key(text, language, rate, volume, TextToSpeech.ENGINE) for text in texts}
+    clips = {text: cache.get(key) for text, key in keys.items()}
+    missing = [text for text, clip in clips.items() if clip is None]
+    if missing:
+        # spawn: cada processo carrega o seu próprio driver, sem herdar o estado deste
+        context = multiprocessing.get_context('spawn')
+        workers = min(len(missing), max_workers or config.get('TTS_WORKERS', 2))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            rendered = executor.map(_render_prompt, missing, [rate] * len(missing), [volume] * len(missing))
+            for text, clip in zip(missing, rendered):
+                if clip is not None:
+                    cache.put(keys[text], clip)
+                clips[text] = clip
+    rendered = [clip for clip in clips.values() if clip is not None]
+    
+    return {
+        'count': len(rendered),
+        'failed': len(clips) - len(rendered),
+        'bytes': sum(len(clip.frames) for clip in rendered),
+        'seconds': time.perf_counter() - started
+    }
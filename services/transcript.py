@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Transcript of one turn, normalized once for every NLU stage.
+"""
+
+import re
+import unicodedata
+from typing import List, Tuple, Union
+
+# Palavras (com hífen, como "coca-cola") e pontuação que separa itens
+_TOKEN = re.compile(r"[^\W_]+(?:-[^\W_]+)*|[,;.!?]")
+
+def _fold_table() -> dict:
+    """Map each accented Latin letter to its base letter, one character to one."""
+    table = {}
+    for code in range(0xC0, 0x250):
+        char = chr(code)
+        base = unicodedata.normalize('NFD', char)[0]
+        if base != char and base.isascii():
+            table[code] = base
+    return table
+
+_FOLD = _fold_table()
+
+# Letra sem acento -> a letra e suas variantes acentuadas (minúsculas)
+_ACCENTED: dict = {}
+for _code, _base in _FOLD.items():
+    if chr(_code).islower():
+        _ACCENTED.setdefault(_base, _base)
+        _ACCENTED[_base] += chr(_code)
+del _code, _base
+
+def accent_insensitive(word: str) -> str:
+    """
+    Regex for an unaccented lowercase word, with or without its accents.
+
+    Matches in ``lowered`` what the word matches in ``folded`` ("tres"
+    also finds "três").
+
+    Args:
+        word: Word as in ``folded``
+
+    Returns:
+        str: Regex source
+    """
+    return ''.join(f'[{_ACCENTED[c]}]' if c in _ACCENTED else re.escape(c) for c in word)
+
+class _memoized:
+    """
+    Attribute computed on first access and stored in the instance.
+
+    Like ``functools.cached_property`` without its lock (Python < 3.12),
+    which costs more than lowercasing a transcript; two threads computing
+    the same value at once is harmless.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        value = obj.__dict__[self.name] = self.func(obj)
+        return value
+
+class Transcript(str):
+    """
+    Text of a turn that also keeps its normalized forms.
+
+    It behaves as the transcribed string everywhere (logs, JSON, database);
+    the stages that parse it read ``lowered``, ``folded`` and ``tokens``,
+    which are computed on first use and then shared. All forms have the
+    same length as the text, so an offset found in any of them slices the
+    original.
+    """
+
+    @_memoized
+    def lowered(self) -> str:
+        """Lowercase text."""
+        lowered = self.lower()
+        if len(lowered) != len(self):
+            # Raro ("İ" vira dois caracteres): mantém esses caracteres como estão
+            lowered = ''.join(c.lower() if len(c.lower()) == 1 else c for c in self)
+        return lowered
+
+    @_memoized
+    def folded(self) -> str:
+        """Lowercase text without accents ("não" -> "nao")."""
+        return self.lowered.translate(_FOLD)
+
+    @_memoized
+    def tokens(self) -> List[Tuple[str, int, int]]:
+        """Words and separating punctuation of ``folded``, with their offsets."""
+        return [(m.group(), m.start(), m.end()) for m in _TOKEN.finditer(self.folded)]
+
+def as_transcript(texto: Union[str, Transcript]) -> Transcript:
+    """
+    Wrap a text, reusing it if it already is a Transcript.
+
+    Args:
+        texto: Transcribed text
+
+    Returns:
+        Transcript: The same text, with its normalized forms
+    """
+    return texto if isinstance(texto, Transcript) else Transcript(texto)
@@ -0,0 +1,595 @@
+# -*- coding: utf-8 -*-
+"""
+Pluggable speech-to-text backends and the worker pool that runs them.
+"""
+
+import json
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Iterable, List, Optional
+
+import speech_recognition as sr
+from flask import current_app
+
+from .audio_clip import AudioClip, Resampler
+
+class TranscriptionError(RuntimeError):
+    """Raised when a backend fails (as opposed to hearing nothing)."""
+
+class Transcriber:
+    """
+    Base class for speech-to-text backends.
+
+    ``load`` runs once per worker before the first request, so heavy
+    models are warm by the time a turn needs them. ``transcribe`` returns
+    an empty string when nothing intelligible was said.
+    """
+
+    name = 'base'
+    sample_rate = 16000
+    streaming = False
+
+    def load(self) -> None:
+        """Load models or open connections for this worker."""
+
+    def transcribe(self, clip: AudioClip) -> str:
+        """
+        Transcribe a clip already converted to ``sample_rate`` mono.
+
+        Args:
+            clip: Audio to transcribe
+
+        Returns:
+            str: Transcribed text, or an empty string
+        """
+        raise NotImplementedError
+
+    def recognition(self, on_partial: Callable[[str], None]) -> 'Recognition':
+        """
+        Start recognizing an utterance fed chunk by chunk.
+
+        Args:
+            on_partial: Called with the current partial transcription
+
+        Returns:
+            Recognition: Open recognition
+        """
+        return Recognition(self, on_partial)
+
+    def transcribe_stream(self, chunks: Iterable[bytes], on_partial: Callable[[str], None]) -> str:
+        """
+        Transcribe audio while it arrives, reporting partial hypotheses.
+
+        Backends without incremental recognition (``streaming = False``)
+        collect the chunks and transcribe once at the end.
+
+        Args:
+            chunks: PCM chunks at ``sample_rate`` mono
+            on_partial: Called with the current partial transcription
+
+        Returns:
+            str: Final transcribed text, or an empty string
+        """
+        recognition = self.recognition(on_partial)
+        for chunk in chunks:
+            recognition.accept(chunk)
+        return recognition.finish()
+
+class Recognition:
+    """
+    One utterance being recognized incrementally.
+
+    Chunks are accepted in order and never concurrently, but not
+    necessarily on the worker that started the recognition, so the state
+    of the utterance lives here and not in the backend. This base class
+    collects the audio and transcribes it once at the end.
+    """
+
+    def __init__(self, backend: Transcriber, on_partial: Callable[[str], None]):
+        """
+        Initialize the recognition.
+
+        Args:
+            backend: Backend that started it
+            on_partial: Called with the current partial transcription
+        """
+        self.backend = backend
+        self.on_partial = on_partial
+        self.frames = bytearray()
+
+    def accept(self, chunk: bytes) -> None:
+        """Add the next PCM chunk at the backend rate."""
+        self.frames += chunk
+
+    def finish(self) -> str:
+        """Return the final transcription, or an empty string."""
+        return self.backend.transcribe(AudioClip(self.frames, self.backend.sample_rate))
+
+class GoogleTranscriber(Transcriber):
+    """Google Web Speech API through ``speech_recognition``."""
+
+    name = 'google'
+
+    def __init__(self, language: str = 'pt-BR', sample_rate: int = 16000, partial_interval: float = 0.0):
+        """
+        Initialize the backend.
+
+        Args:
+            language: Language code for recognition
+            sample_rate: Sample rate (Hz) sent to the API
+            partial_interval: Seconds of new audio between interim
+                recognitions of a live capture, 0 disables them
+        """
+        self.language = language
+        self.sample_rate = sample_rate
+        self.partial_interval = partial_interval
+        # A API não é incremental: os parciais vêm de reconhecer de novo o áudio acumulado
+        self.streaming = partial_interval > 0
+        self.recognizer = None
+
+    def load(self) -> None:
+        """Create the recognizer used by this worker."""
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, clip: AudioClip) -> str:
+        """Transcribe a clip with a network call to Google."""
+        try:
+            return self.recognizer.recognize_google(clip.to_audio_data(), language=self.language)
+        except sr.UnknownValueError:
+            return ""
+        except sr.RequestError as e:
+            raise TranscriptionError(f"Erro de conexão com o serviço: {e}") from e
+
+    def recognition(self, on_partial: Callable[[str], None]) -> 'Recognition':
+        """Recognize the audio received so far every ``partial_interval`` seconds."""
+        return GoogleRecognition(self, on_partial)
+
+class GoogleRecognition(Recognition):
+    """
+    Utterance sent whole to Google at each interval of new audio.
+
+    Each interim recognition costs one API call over the audio accumulated
+    so far; a failed one is skipped, since only the final text is required.
+    """
+
+    def __init__(self, backend: GoogleTranscriber, on_partial: Callable[[str], None]):
+        super().__init__(backend, on_partial)
+        self.step = int(backend.partial_interval * backend.sample_rate) * 2
+        self.recognized = 0
+        self.text = ''
+
+    def _recognize(self) -> str:
+        self.text = super().finish()
+        self.recognized = len(self.frames)
+        return self.text
+
+    def accept(self, chunk: bytes) -> None:
+        """Add the chunk and report a new hypothesis once enough audio arrived."""
+        self.frames += chunk
+        if len(self.frames) - self.recognized < self.step:
+            return
+        try:
+            text = self._recognize()
+        except TranscriptionError:
+            self.recognized, self.text = len(self.frames), ''
+            return
+        if text:
+            self.on_partial(text)
+
+    def finish(self) -> str:
+        """Recognize the whole utterance, unless the last interim already did."""
+        if self.recognized == len(self.frames) and self.text:
+            return self.text
+        return self._recognize()
+
+class VoskTranscriber(Transcriber):
+    """Offline recognition with a local Vosk (Kaldi) model."""
+
+    name = 'vosk'
+    streaming = True
+
+    def __init__(self, model_path: str, sample_rate: int = 16000):
+        """
+        Initialize the backend.
+
+        Args:
+            model_path: Folder of the Vosk model (e.g. vosk-model-small-pt)
+            sample_rate: Sample rate (Hz) expected by the model
+        """
+        self.model_path = model_path
+        self.sample_rate = sample_rate
+        self.model = None
+
+    def load(self) -> None:
+        """Load the acoustic model into memory."""
+        try:
+            from vosk import Model, SetLogLevel
+        except ImportError as e:
+            raise TranscriptionError("O pacote 'vosk' é necessário para o reconhecimento offline.") from e
+
+        SetLogLevel(-1)
+        self.model = Model(self.model_path)
+
+    def transcribe(self, clip: AudioClip) -> str:
+        """Transcribe a clip locally, without network access."""
+        frames = memoryview(clip.frames)
+        step = self.sample_rate // 4 * clip.sample_width
+        chunks = (frames[i:i + step] for i in range(0, len(frames), step))
+        return self.transcribe_stream(chunks, lambda partial: None)
+
+    def recognition(self, on_partial: Callable[[str], None]) -> Recognition:
+        """Start a Kaldi recognizer that reports Vosk's partial results."""
+        return VoskRecognition(self, on_partial)
+
+class VoskRecognition(Recognition):
+    """Utterance decoded by a Kaldi recognizer as the chunks arrive."""
+
+    def __init__(self, backend: VoskTranscriber, on_partial: Callable[[str], None]):
+        from vosk import KaldiRecognizer
+
+        super().__init__(backend, on_partial)
+        self.recognizer = KaldiRecognizer(backend.model, backend.sample_rate)
+        self.phrases: List[str] = []
+
+    def accept(self, chunk: bytes) -> None:
+        """Decode the chunk and report the phrases heard so far."""
+        if self.recognizer.AcceptWaveform(bytes(chunk)):
+            # Fim de frase detectado pelo Vosk: o trecho já é definitivo
+            text = json.loads(self.recognizer.Result()).get('text', '')
+            if text:
+                self.phrases.append(text)
+                self.on_partial(' '.join(self.phrases))
+        else:
+            partial = json.loads(self.recognizer.PartialResult()).get('partial', '')
+            if partial:
+                self.on_partial(' '.join(self.phrases + [partial]))
+
+    def finish(self) -> str:
+        """Flush the recognizer and join every phrase."""
+        text = json.loads(self.recognizer.FinalResult()).get('text', '')
+        if text:
+            self.phrases.append(text)
+        return ' '.join(self.phrases)
+
+class FakeTranscriber(Transcriber):
+    """Deterministic backend for tests: returns scripted transcriptions in order."""
+
+    name = 'fake'
+    streaming = True
+    chunks_per_word = 4
+
+    def __init__(self, responses: Optional[Iterable[str]] = None, default: str = "", sample_rate: int = 16000):
+        """
+        Initialize the backend.
+
+        Args:
+            responses: Transcriptions returned by successive calls
+            default: Transcription returned once the script is exhausted
+            sample_rate: Sample rate (Hz) expected by the backend
+        """
+        self.responses = list(responses or [])
+        self.default = default
+        self.sample_rate = sample_rate
+        self.loaded = 0
+        self.calls: List[AudioClip] = []
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Count loads so tests can check that workers are warmed once."""
+        with self._lock:
+            self.loaded += 1
+
+    def transcribe(self, clip: AudioClip) -> str:
+        """Return the next scripted transcription."""
+        with self._lock:
+            self.calls.append(clip)
+            if self.responses:
+                return self.responses.pop(0)
+            return self.default
+
+    def recognition(self, on_partial: Callable[[str], None]) -> Recognition:
+        """Reveal one more word of the next scripted transcription every few chunks."""
+        return FakeRecognition(self, on_partial)
+
+class FakeRecognition(Recognition):
+    """Scripted utterance revealed word by word as the chunks arrive."""
+
+    def __init__(self, backend: FakeTranscriber, on_partial: Callable[[str], None]):
+        super().__init__(backend, on_partial)
+        self.count = 0
+        self.text: Optional[str] = None
+        self.words: List[str] = []
+
+    def accept(self, chunk: bytes) -> None:
+        """Count the chunk and report the words revealed so far."""
+        self.frames += chunk
+        self.count += 1
+        if self.text is None:
+            self.text = super().finish()
+            self.words = self.text.split()
+        per_word = self.backend.chunks_per_word
+        shown = min(len(self.words), self.count // per_word)
+        if shown and self.count % per_word == 0:
+            self.on_partial(' '.join(self.words[:shown]))
+
+    def finish(self) -> str:
+        """Return the scripted transcription."""
+        if self.text is None:
+            self.text = super().finish()
+        return self.text
+
+BACKENDS: Dict[str, type] = {
+    GoogleTranscriber.name: GoogleTranscriber,
+    VoskTranscriber.name: VoskTranscriber,
+    FakeTranscriber.name: FakeTranscriber,
+}
+
+class TranscriptionPool:
+    """
+    Bounded thread pool with one warm backend instance per worker.
+
+    Recognition is network I/O (Google) or native code that releases the
+    GIL (Vosk), so threads are enough to run turns in parallel; the pool
+    size caps how many recognitions run at once. Streaming sessions only
+    occupy a worker while they decode the chunks already received, so
+    more captures than workers can be transcribed live.
+    """
+
+    def __init__(self, factory: Callable[[], Transcriber], max_workers: int = 2, timeout: Optional[float] = None):
+        """
+        Initialize the pool.
+
+        Args:
+            factory: Creates the backend instance of each worker
+            max_workers: Maximum number of concurrent transcriptions
+            timeout: Seconds to wait for a transcription, None waits forever
+        """
+        self.factory = factory
+        self.max_workers = max_workers
+        self.timeout = timeout
+        probe = factory()
+        self.sample_rate = probe.sample_rate
+        self.streaming = probe.streaming
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='transcriber',
+            initializer=self._init_worker
+        )
+
+    def _init_worker(self) -> None:
+        """Create and load the backend of the current worker thread."""
+        backend = self.factory()
+        backend.load()
+        self._local.backend = backend
+
+    def warm(self) -> None:
+        """Start every worker now so models are loaded before the first turn."""
+        barrier = threading.Barrier(self.max_workers, timeout=60)
+        futures = [self._executor.submit(barrier.wait) for _ in range(self.max_workers)]
+        for future in futures:
+            future.result()
+
+    def submit(self, clip: AudioClip) -> Future:
+        """
+        Queue a clip for transcription.
+
+        Args:
+            clip: Audio at the pool's sample rate
+
+        Returns:
+            Future: Resolves to the transcribed text
+        """
+        return self._executor.submit(self._run, clip)
+
+    def transcribe(self, clip: AudioClip) -> str:
+        """
+        Transcribe a clip on one of the workers and wait for the result.
+
+        Args:
+            clip: Audio at the pool's sample rate
+
+        Returns:
+            str: Transcribed text, or an empty string
+        """
+        return self.submit(clip).result(timeout=self.timeout)
+
+    def open_stream(self, sample_rate: int, sample_width: int = 2, channels: int = 1) -> 'TranscriptionStream':
+        """
+        Start a transcription fed chunk by chunk during the capture.
+
+        Args:
+            sample_rate: Sample rate of the chunks that will be fed
+            sample_width: Bytes per sample of the chunks
+            channels: Channel count of the chunks
+
+        Returns:
+            TranscriptionStream: Open session
+        """
+        return TranscriptionStream(self, sample_rate, sample_width, channels)
+
+    def _run(self, clip: AudioClip) -> str:
+        return self._local.backend.transcribe(clip)
+
+    def shutdown(self) -> None:
+        """Stop the workers."""
+        self._executor.shutdown(wait=False)
+
+class TranscriptionStream:
+    """
+    Transcription session fed while the audio is still being captured.
+
+    Chunks are resampled to the backend rate as they arrive. With a
+    streaming backend each batch of chunks received is decoded by a task
+    on the pool, which frees its worker as soon as the batch is done, and
+    the partial hypotheses are collected for the caller; other backends
+    receive the whole utterance when the session finishes, so they only
+    hold a worker for the recognition itself.
+    """
+
+    _END = None
+
+    def __init__(self, pool: TranscriptionPool, sample_rate: int, sample_width: int = 2, channels: int = 1):
+        """
+        Initialize the session.
+
+        Args:
+            pool: Pool that runs the backend
+            sample_rate: Sample rate of the chunks that will be fed
+            sample_width: Bytes per sample of the chunks
+            channels: Channel count of the chunks
+        """
+        self.pool = pool
+        self.resampler = Resampler(sample_rate, pool.sample_rate, sample_width, channels)
+        self._partials: queue.Queue = queue.Queue()
+        self._last_partial = ''
+        self._closed = False
+        self._frames = None if pool.streaming else bytearray()
+        self._pending: Deque[Optional[bytes]] = deque()
+        self._scheduled = False
+        self._lock = threading.Lock()
+        self._recognition: Optional[Recognition] = None
+        self._result: Future = Future()
+
+    def _schedule(self, chunk: Optional[bytes]) -> None:
+        """Queue a chunk (or the end) and start a decoding task if none is pending."""
+        with self._lock:
+            if self._result.done():
+                return
+            self._pending.append(chunk)
+            if not self._scheduled:
+                self._scheduled = True
+                self.pool._executor.submit(self._decode)
+
+    def _decode(self) -> None:
+        """Decode the chunks queued so far on the current worker."""
+        with self._lock:
+            batch = list(self._pending)
+            self._pending.clear()
+        try:
+            if self._recognition is None:
+                self._recognition = self.pool._local.backend.recognition(self._partials.put)
+            for chunk in batch:
+                if chunk is self._END:
+                    self._result.set_result(self._recognition.finish())
+                    break
+                self._recognition.accept(chunk)
+        except Exception as e:
+            self._result.set_exception(e)
+        with self._lock:
+            # Os trechos que chegaram durante a decodificação voltam ao fim da fila do pool
+            if self._pending and not self._result.done():
+                self.pool._executor.submit(self._decode)
+            else:
+                self._pending.clear()
+                self._scheduled = False
+
+    def feed(self, chunk: bytes) -> List[str]:
+        """
+        Send the next captured chunk.
+
+        Args:
+            chunk: Raw PCM data in the capture format
+
+        Returns:
+            List of new partial transcriptions since the last call
+        """
+        converted = self.resampler.convert(chunk)
+        if self._frames is None:
+            self._schedule(bytes(converted))
+        else:
+            self._frames += converted
+        return self.partials()
+
+    def partials(self) -> List[str]:
+        """
+        Collect the partial transcriptions produced so far.
+
+        Returns:
+            List of new, distinct partial transcriptions
+        """
+        new = []
+        while True:
+            try:
+                partial = self._partials.get_nowait()
+            except queue.Empty:
+                return new
+            if partial != self._last_partial:
+                self._last_partial = partial
+                new.append(partial)
+
+    def finish(self) -> str:
+        """
+        Signal the end of the audio and wait for the final transcription.
+
+        Returns:
+            str: Transcribed text, or an empty string
+        """
+        if self._frames is not None:
+            self._closed = True
+            return self.pool.transcribe(AudioClip(self._frames, self.pool.sample_rate))
+
+        self.close()
+        return self._result.result(timeout=self.pool.timeout)
+
+    def close(self) -> None:
+        """End the recognition even if the capture was interrupted."""
+        if not self._closed and self._frames is None:
+            self._schedule(self._END)
+        self._closed = True
+
+def create_transcriber_factory(config) -> Callable[[], Transcriber]:
+    """
+    Build the backend factory described by the application config.
+
+    Args:
+        config: Flask config (or any mapping)
+
+    Returns:
+        Callable creating a new backend instance
+    """
+    name = config.get('TRANSCRIBER_BACKEND', 'google')
+    if name not in BACKENDS:
+        raise ValueError(f"Backend de transcrição desconhecido: {name}")
+
+    sample_rate = config.get('AUDIO_TRANSCRIBE_RATE') or 16000
+
+    if name == GoogleTranscriber.name:
+        language = config.get('SPEECH_LANGUAGE', 'pt-BR')
+        interval = config.get('TRANSCRIBER_PARTIAL_INTERVAL', 0.0)
+        return lambda: GoogleTranscriber(language=language, sample_rate=sample_rate, partial_interval=interval)
+
+    if name == VoskTranscriber.name:
+        model_path = config.get('VOSK_MODEL_PATH')
+        return lambda: VoskTranscriber(model_path, sample_rate=sample_rate)
+
+    # Um único roteiro compartilhado entre os workers mantém a ordem determinística
+    fake = FakeTranscriber(config.get('TRANSCRIBER_FAKE_RESPONSES'), sample_rate=sample_rate)
+    return lambda: fake
+
+def init_app(app) -> None:
+    """
+    Create the transcription pool of this worker process.
+
+    Args:
+        app: Flask application instance
+    """
+    pool = TranscriptionPool(
+        create_transcriber_factory(app.config),
+        max_workers=app.config.get('TRANSCRIBER_WORKERS', 2),
+        timeout=app.config.get('TRANSCRIBER_TIMEOUT')
+    )
+    if app.config.get('TRANSCRIBER_WARM', True):
+        pool.warm()
+    app.extensions['transcription'] = pool
+
+def get_transcription_pool() -> Optional[TranscriptionPool]:
+    """
+    Get the transcription pool of the current application.
+
+    Returns:
+        TranscriptionPool, or None if the app did not create one
+    """
+    return current_app.extensions.get('transcription')
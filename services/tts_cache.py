@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+Content-addressed cache of synthesized speech.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import wave
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from flask import current_app, has_app_context
+
+from .audio_clip import AudioClip
+
+def cache_key(
+    text: str,
+    language: Optional[str] = None,
+    rate: Optional[float] = None,
+    volume: Optional[float] = None,
+    engine: str = ''
+) -> str:
+    """
+    Build the cache key of a synthesized prompt.
+
+    Args:
+        text: Text to be spoken
+        language: Language or voice of the synthesis
+        rate: Speech rate
+        volume: Speech volume
+        engine: Name of the TTS engine
+
+    Returns:
+        str: SHA-256 hex digest identifying the audio
+    """
+    parts = (text, language or '', '' if rate is None else str(rate), '' if volume is None else str(volume), engine)
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+class TTSCache:
+    """
+    Two-tier cache of synthesized prompts.
+
+    The memory tier is an LRU bounded by the total size of the PCM frames;
+    the disk tier keeps each prompt as ``<key>.wav`` so it survives
+    restarts and is shared by the worker processes. A prompt found on disk
+    is promoted to memory.
+
+    The disk tier is an LRU too, bounded by the size of its files: a hit
+    touches the file's modification time, and a store removes the least
+    recently used files beyond the budget. Stores follow a synthesis, so
+    listing the folder there is cheap in comparison.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 32 * 1024 * 1024,
+        folder: Optional[str] = None,
+        disk_max_bytes: int = 256 * 1024 * 1024
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Budget of the memory tier, in bytes of PCM
+            folder: Folder of the disk tier; None keeps the cache in memory only
+            disk_max_bytes: Budget of the disk tier, in bytes of WAV files
+        """
+        self.max_bytes = max_bytes
+        self.folder = folder
+        self.disk_max_bytes = disk_max_bytes
+        self.size = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._clips: 'OrderedDict[str, AudioClip]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+    def get(self, key: str) -> Optional[AudioClip]:
+        """
+        Look up a prompt in memory, then on disk.
+
+        Args:
+            key: Key built with ``cache_key``
+
+        Returns:
+            AudioClip or None
+        """
+        with self._lock:
+            clip = self._clips.get(key)
+            if clip is not None:
+                self._clips.move_to_end(key)
+                self.hits += 1
+                return clip
+
+        clip = self._load(key)
+        if clip is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, clip)
+        return clip
+
+    def put(self, key: str, clip: AudioClip) -> None:
+        """
+        Store a prompt in both tiers.
+
+        Args:
+            key: Key built with ``cache_key``
+            clip: Synthesized audio
+        """
+        with self._lock:
+            self._remember(key, clip)
+        self._store(key, clip)
+
+    def get_or_render(self, key: str, render: Callable[[], Optional[AudioClip]]) -> Optional[AudioClip]:
+        """
+        Return a cached prompt, synthesizing and storing it on a miss.
+
+        Args:
+            key: Key built with ``cache_key``
+            render: Synthesizes the prompt; may return None on failure
+
+        Returns:
+            AudioClip, or None if the prompt could not be synthesized
+        """
+        clip = self.get(key)
+        if clip is None:
+            clip = render()
+            if clip is not None:
+                self.put(key, clip)
+        return clip
+
+    def _remember(self, key: str, clip: AudioClip) -> None:
+        """Insert into the memory tier and evict down to the budget (lock held)."""
+        size = len(clip.frames)
+        if size > self.max_bytes:
+            return
+
+        previous = self._clips.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous.frames)
+        self._clips[key] = clip
+        self.size += size
+
+        while self.size > self.max_bytes:
+            _, evicted = self._clips.popitem(last=False)
+            self.size -= len(evicted.frames)
+
+    def _path(self, key: str) -> str:
+        """Path of a prompt in the disk tier."""
+        return os.path.join(self.folder, f"{key}.wav")
+
+    def _load(self, key: str) -> Optional[AudioClip]:
+        """Read a prompt from the disk tier."""
+        if not self.folder:
+            return None
+        path = self._path(key)
+        try:
+            clip = AudioClip.from_wav(path)
+            # Marca o uso para a remoção por LRU
+            os.utime(path)
+        except (OSError, EOFError, wave.Error):
+            return None
+        return clip
+
+    def _store(self, key: str, clip: AudioClip) -> None:
+        """Write a prompt to the disk tier atomically."""
+        if not self.folder:
+            return
+        data = clip.to_wav_bytes()
+        if len(data) > self.disk_max_bytes:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """Remove the least recently used files until the disk tier fits its budget."""
+        files = []
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.wav'):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        files.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+
+        total = sum(size for _, size, _ in files)
+        files.sort()
+        for _, size, path in files:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                # Outro processo pode ter removido o arquivo antes
+                os.unlink(path)
+            except OSError:
+                pass
+            total -= size
+
+def init_app(app) -> None:
+    """
+    Create the prompt cache of this worker process.
+
+    Args:
+        app: Flask application instance
+    """
+    folder = app.config.get('TTS_CACHE_FOLDER')
+    if folder is None:
+        folder = os.path.join(app.config.get('TEMP_DIR', 'temp'), 'tts_cache')
+    app.extensions['tts_cache'] = TTSCache(
+        max_bytes=app.config.get('TTS_CACHE_MAX_BYTES', 32 * 1024 * 1024),
+        folder=folder or None,
+        disk_max_bytes=app.config.get('TTS_CACHE_DISK_MAX_BYTES', 256 * 1024 * 1024)
+    )
+
+def get_tts_cache() -> Optional[TTSCache]:
+    """
+    Get the prompt cache of the current application.
+
+    Returns:
+        TTSCache, or None outside an application context
+    """
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('tts_cache')
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Event-driven scheduling of a conversation turn.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+class TurnScheduler:
+    """
+    Coordinates the stages of a turn with events instead of fixed sleeps.
+
+    Playback completion, capture readiness and recognition completion are
+    signalled through ``threading.Event`` objects, so the next stage starts
+    as soon as the previous one is done. The scheduler also measures how
+    long the turn spent in each stage; time outside any stage is reported
+    as ``idle``.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        """
+        Initialize the scheduler for a new turn.
+
+        Args:
+            clock: Monotonic clock in seconds
+        """
+        self.clock = clock
+        self.playback_done = threading.Event()
+        self.playback_done.set()  # Nada está tocando no início do turno
+        self.capture_ready = threading.Event()
+        self.recognition_done = threading.Event()
+
+        self._started = clock()
+        self._stage: Optional[str] = None
+        self._stage_started = 0.0
+        self._durations: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def stage(self) -> Optional[str]:
+        """Name of the stage in progress, or None."""
+        return self._stage
+
+    def begin(self, stage: str) -> None:
+        """
+        Start a stage, ending the one in progress.
+
+        Args:
+            stage: Stage name (e.g. ``recording``, ``parsing``)
+        """
+        with self._lock:
+            now = self.clock()
+            self._close(now)
+            self._stage = stage
+            self._stage_started = now
+
+    def end(self) -> None:
+        """End the stage in progress, if any."""
+        with self._lock:
+            self._close(self.clock())
+
+    def _close(self, now: float) -> None:
+        """Add the elapsed time of the current stage to its total."""
+        if self._stage is not None:
+            elapsed = now - self._stage_started
+            self._durations[self._stage] = self._durations.get(self._stage, 0.0) + elapsed
+            self._stage = None
+
+    def speak(self, tts, text: str) -> None:
+        """
+        Play a response and signal ``playback_done`` when it finishes.
+
+        Args:
+            tts: Text-to-speech service
+            text: Text to be spoken
+        """
+        self.playback_done.clear()
+        self.begin('speaking')
+        try:
+            tts.speak(text)
+        finally:
+            self.end()
+            self.playback_done.set()
+
+    def wait_for_playback(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the response being played has finished.
+
+        Args:
+            timeout: Maximum wait in seconds; None waits indefinitely
+
+        Returns:
+            bool: True if playback is done, False on timeout
+        """
+        if self.playback_done.is_set():
+            return True
+        self.begin('waiting_playback')
+        try:
+            return self.playback_done.wait(timeout)
+        finally:
+            self.end()
+
+    def start_capture(self) -> None:
+        """Prepare a new capture: clears the capture and recognition events."""
+        self.capture_ready.clear()
+        self.recognition_done.clear()
+        self.begin('opening')
+
+    def signal_capture_ready(self) -> None:
+        """Signal that the input is open and audio is flowing."""
+        self.capture_ready.set()
+        self.begin('recording')
+
+    def signal_recognition_done(self) -> None:
+        """Signal that the transcription of the capture is available."""
+        self.end()
+        self.recognition_done.set()
+
+    def timings(self) -> Dict[str, int]:
+        """
+        Time spent in each stage of the turn so far.
+
+        Returns:
+            dict: Milliseconds per stage, plus ``idle`` (time outside any
+                stage) and ``total``
+        """
+        with self._lock:
+            now = self.clock()
+            durations = dict(self._durations)
+            if self._stage is not None:
+                durations[self._stage] = durations.get(self._stage, 0.0) + now - self._stage_started
+            total = now - self._started
+
+        result = {stage: round(seconds * 1000) for stage, seconds in durations.items()}
+        result['idle'] = max(0, round((total - sum(durations.values())) * 1000))
+        result['total'] = round(total * 1000)
+        return result
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Voice activity detection used to end recordings when the caller stops speaking.
+"""
+
+import math
+from array import array
+
+try:
+    import audioop
+except ImportError:  # Removido da biblioteca padrão no Python 3.13
+    audioop = None
+
+def rms(chunk: bytes, sample_width: int = 2) -> float:
+    """
+    Root-mean-square energy of a PCM chunk.
+
+    Args:
+        chunk: Raw PCM data
+        sample_width: Bytes per sample
+
+    Returns:
+        float: RMS energy of the chunk
+    """
+    if audioop is not None:
+        return float(audioop.rms(chunk, sample_width))
+
+    samples = array({1: 'b', 2: 'h', 4: 'i'}[sample_width])
+    samples.frombytes(bytes(chunk[:len(chunk) - len(chunk) % sample_width]))
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+class EnergyVAD:
+    """
+    Frame classifier that tracks speech and trailing silence over PCM chunks.
+
+    The first chunks calibrate the noise floor; a chunk counts as speech
+    when its energy exceeds the floor by ``threshold_ratio`` (and at least
+    ``min_threshold``). Speech is classified during the calibration too,
+    so only chunks below the threshold ever raise the floor. Once speech
+    has been heard, ``silence_duration`` seconds of silence end the capture.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        sample_width: int = 2,
+        silence_duration: float = 0.8,
+        threshold_ratio: float = 3.0,
+        min_threshold: float = 300.0,
+        calibration_duration: float = 0.3
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            sample_rate: Sample rate of the chunks in Hz
+            sample_width: Bytes per sample
+            silence_duration: Trailing silence (seconds) that ends the capture
+            threshold_ratio: Energy over the noise floor considered speech
+            min_threshold: Lower bound for the speech energy threshold
+            calibration_duration: Audio (seconds) used to estimate the noise floor
+        """
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.silence_duration = silence_duration
+        self.threshold_ratio = threshold_ratio
+        self.min_threshold = min_threshold
+        self.calibration_duration = calibration_duration
+
+        self.noise_floor = 0.0
+        self.speech_detected = False
+        self.trailing_silence = 0.0
+        self.elapsed = 0.0
+
+    @property
+    def threshold(self) -> float:
+        """Current energy threshold for speech."""
+        return max(self.min_threshold, self.noise_floor * self.threshold_ratio)
+
+    def is_speech(self, chunk: bytes) -> bool:
+        """
+        Classify a chunk and update the detector state.
+
+        Args:
+            chunk: Raw PCM data
+
+        Returns:
+            bool: True if the chunk contains speech
+        """
+        energy = rms(chunk, self.sample_width)
+        seconds = len(chunk) / float(self.sample_width * self.sample_rate)
+        calibrating = self.elapsed < self.calibration_duration
+        self.elapsed += seconds
+
+        # Fala já na calibração (quem responde de imediato, "sim") conta
+        # como fala e nunca entra no nível de ruído
+        speech = energy > self.threshold
+        if speech:
+            self.speech_detected = True
+            self.trailing_silence = 0.0
+        else:
+            self.trailing_silence += seconds
+            if not self.speech_detected:
+                if calibrating:
+                    # Média móvel do ruído ambiente durante a calibração
+                    rate = min(1.0, seconds / self.calibration_duration * 2)
+                else:
+                    # Continua acompanhando o ruído enquanto ninguém fala
+                    rate = 0.05
+                self.noise_floor += (energy - self.noise_floor) * rate
+
+        return speech
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Process a chunk and tell whether the capture should stop.
+
+        Args:
+            chunk: Raw PCM data
+
+        Returns:
+            bool: True once speech ended with enough trailing silence
+        """
+        self.is_speech(chunk)
+        return self.speech_detected and self.trailing_silence >= self.silence_duration
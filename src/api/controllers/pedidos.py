@@ -7,9 +7,12 @@ import uuid
 from datetime import datetime
 from flask import Blueprint, request, jsonify, current_app
 from models.pedido import Pedido, PedidoEstado
-from services.audio_manager import AudioManager
+from services.audio_upload import get_uploaded_audio, UnsupportedAudioError
+from services.audio_resources import get_audio_resources
 from services.order_processor import process_order, extrair_informacoes
-from services.text_to_speech import TextToSpeech
+from services.transcript import Transcript
+from services.prompts import AGRADECIMENTO_NOME
+from services.text_to_speech import create_text_to_speech
 from core.database import get_db
 
 pedidos_bp = Blueprint("pedidos", __name__)
@@ -67,15 +70,30 @@ def conversa_interativa():
     Returns:
         JSON response with conversation state and messages
     """
-    audio_manager = AudioManager()
-    tts = TextToSpeech()
+    audio_resources = get_audio_resources()
+    audio_manager = audio_resources.acquire()
+    tts = create_text_to_speech()
     db = get_db()
     cursor = db.cursor()
 
     try:
-        # Captura e transcreve o áudio do cliente
-        transcription = audio_manager.process_audio(duration=10)
+        # Usa o áudio enviado pelo cliente; sem upload, grava no microfone do servidor
+        upload = get_uploaded_audio(request, current_app.config.get('AUDIO_ALLOWED_EXTENSIONS', {'wav'}))
+        if upload:
+            stream, extension = upload
+            # Transcreve enquanto o corpo da requisição chega
+            capture = audio_manager.capture_upload(
+                stream, extension,
+                save=current_app.config.get('AUDIO_SAVE_RECORDINGS', False)
+            )
+            transcription = audio_manager.transcribe_capture(capture)
+        else:
+            transcription = audio_manager.process_audio(
+                duration=current_app.config.get('AUDIO_MAX_DURATION', 10),
+                silence_duration=current_app.config.get('AUDIO_VAD_SILENCE')
+            )
         current_app.logger.info(f"Transcrição: {transcription}")
+        transcription = Transcript(transcription)
 
         # Extrai informações do áudio
         informacoes = extrair_informacoes(transcription)
@@ -123,7 +141,7 @@ def conversa_interativa():
             )
             db.commit()
 
-            response_text = f"Obrigado, {nome}. Agora, informe seu endereço completo."
+            response_text = AGRADECIMENTO_NOME.fill(nome=nome)
             tts.speak(response_text)
             return jsonify({"message": response_text}), 200
 
@@ -167,7 +185,7 @@ def conversa_interativa():
             return jsonify({"message": response_text, "itens": pedido_processado}), 200
 
         if status == "aguardando_confirmacao":
-            if "confirmar" in transcription.lower():
+            if "confirmar" in transcription.folded:
                 cursor.execute(
                     "UPDATE pedido_estado SET status = 'finalizado' WHERE id = ?",
                     (estado_id,)
@@ -182,6 +200,13 @@ def conversa_interativa():
             tts.speak(response_text)
             return jsonify({"message": response_text}), 200
 
+    except UnsupportedAudioError as e:
+        current_app.logger.warning(f"Áudio enviado inválido: {e}")
+        return jsonify({"error": str(e)}), 400
+
     except Exception as e:
         current_app.logger.error(f"Erro ao processar conversa: {e}")
-        return jsonify({"error": "Ocorreu um erro durante o processamento do áudio."}), 500 
\ No newline at end of file
+        return jsonify({"error": "Ocorreu um erro durante o processamento do áudio."}), 500
+
+    finally:
+        audio_resources.release(audio_manager) 
\ No newline at end of file
@@ -3,6 +3,8 @@ API routes registration.
 """
 
 from flask import Blueprint, send_from_directory, jsonify
+from services.llm_cache import get_llm_cache
+from services.nlu_cascade import get_nlu_stats
 from .controllers import pedidos_bp, clientes_bp
 
 def register_routes(app):
@@ -27,6 +29,16 @@ def register_routes(app):
     def serve_interface(path):
         return send_from_directory('interface_teste', path)
     
+    # Register NLU counters: fração dos turnos resolvidos sem o ChatGPT
+    @app.route('/nlu/stats')
+    def nlu_stats():
+        stats = get_nlu_stats()
+        cache = get_llm_cache()
+        return jsonify({
+            "tiers": stats.snapshot() if stats else {},
+            "llm_cache": cache.metrics() if cache else {}
+        }), 200
+    
     # Register root route
     @app.route('/')
     def home():
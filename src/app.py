@@ -12,6 +12,13 @@ from flask_sqlalchemy import SQLAlchemy
 from src.config.settings import Config
 from src.api.routes import register_routes
 from src.cli import init_app as init_cli
+from services.transcription import init_app as init_transcription
+from services.audio_resources import init_app as init_audio
+from services.tts_cache import init_app as init_tts_cache
+from services.speech_jobs import init_app as init_speech_jobs
+from services.noise_profiles import init_app as init_noise_profiles
+from services.llm_cache import init_app as init_llm_cache
+from services.nlu_cascade import init_app as init_nlu_stats
 
 # Initialize extensions
 db = SQLAlchemy()
@@ -35,6 +42,15 @@ def create_app(config_class=Config):
     # Initialize database
     db.init_app(app)
     
+    # Start the transcription workers, the shared audio resources and the speech services
+    init_transcription(app)
+    init_noise_profiles(app)
+    init_audio(app)
+    init_tts_cache(app)
+    init_speech_jobs(app)
+    init_llm_cache(app)
+    init_nlu_stats(app)
+    
     # Register routes
     register_routes(app)
     
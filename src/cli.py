@@ -7,6 +7,7 @@ import click
 from flask.cli import with_appcontext
 from flask import current_app
 from core.database import get_db
+from services.text_to_speech import warm_tts_cache
 
 @click.command('init-db')
 @with_appcontext
@@ -20,6 +21,23 @@ def init_db_command():
     except Exception as e:
         click.echo(f'Error initializing database: {e}', err=True)
 
+@click.command('warm-tts')
+@click.option('--workers', type=int, default=None, help='Synthesis processes (defaults to TTS_WORKERS).')
+@with_appcontext
+def warm_tts_command(workers):
+    """Pre-render the static prompts into the TTS cache."""
+    try:
+        result = warm_tts_cache(workers)
+        click.echo(
+            f"Rendered {result['count']} prompts ({result['bytes'] / 1024:.0f} KiB) "
+            f"in {result['seconds']:.1f}s."
+        )
+        if result['failed']:
+            click.echo(f"{result['failed']} prompts could not be synthesized.", err=True)
+    except Exception as e:
+        click.echo(f'Error warming the TTS cache: {e}', err=True)
+
 def init_app(app):
     """Register CLI commands with the app."""
-    app.cli.add_command(init_db_command) 
\ No newline at end of file
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(warm_tts_command) 
\ No newline at end of file
@@ -30,11 +30,37 @@ class Config:
     # File paths
     TEMP_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'temp')
     
+    # Audio settings
+    AUDIO_UPLOAD_FOLDER = os.getenv('AUDIO_UPLOAD_FOLDER', os.path.join(TEMP_DIR, 'audio'))
+    AUDIO_ALLOWED_EXTENSIONS = {'ogg', 'wav', 'mp3'}
+    AUDIO_SAVE_RECORDINGS = os.getenv('AUDIO_SAVE_RECORDINGS', 'False').lower() == 'true'
+    AUDIO_MAX_DURATION = int(os.getenv('AUDIO_MAX_DURATION', '10'))
+    AUDIO_VAD_SILENCE = float(os.getenv('AUDIO_VAD_SILENCE', '0.8'))  # 0 desativa o VAD
+    AUDIO_TRANSCRIBE_RATE = int(os.getenv('AUDIO_TRANSCRIBE_RATE', '16000'))  # 8000 para telefonia
+    AUDIO_POOL_SIZE = int(os.getenv('AUDIO_POOL_SIZE', '4'))
+    NOISE_PROFILE_TTL = int(os.getenv('NOISE_PROFILE_TTL', '600'))  # segundos até recalibrar um dispositivo ocioso
+    TTS_CACHE_FOLDER = os.getenv('TTS_CACHE_FOLDER', os.path.join(TEMP_DIR, 'tts_cache'))  # vazio desativa o disco
+    TTS_CACHE_MAX_BYTES = int(os.getenv('TTS_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+    TTS_MODE = os.getenv('TTS_MODE', 'server')  # 'client': o cliente baixa e reproduz o áudio da resposta
+    TTS_WORKERS = int(os.getenv('TTS_WORKERS', '2'))
+    TTS_JOB_TIMEOUT = int(os.getenv('TTS_JOB_TIMEOUT', '30'))
+    
+    # Transcription settings
+    TRANSCRIBER_BACKEND = os.getenv('TRANSCRIBER_BACKEND', 'google')  # google, vosk ou fake
+    TRANSCRIBER_WORKERS = int(os.getenv('TRANSCRIBER_WORKERS', '2'))
+    TRANSCRIBER_TIMEOUT = float(os.getenv('TRANSCRIBER_TIMEOUT', '30'))
+    TRANSCRIBER_WARM = True
+    VOSK_MODEL_PATH = os.getenv('VOSK_MODEL_PATH', 'models/vosk-model-small-pt')
+    
     # API settings
     API_PREFIX = '/api/v1'
     
     # ChatGPT settings
     CHATGPT_MODEL = os.getenv('CHATGPT_MODEL', 'gpt-3.5-turbo')
+    LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', os.path.join(TEMP_DIR, 'llm_cache.sqlite3'))  # vazio desativa o SQLite
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '1024'))
+    LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', str(24 * 3600)))  # segundos
+    NLU_CONFIDENCE_THRESHOLD = float(os.getenv('NLU_CONFIDENCE_THRESHOLD', '0.8'))  # abaixo disso consulta o ChatGPT
     
     @staticmethod
     def init_app(app):
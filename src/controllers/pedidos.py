@@ -3,12 +3,25 @@ Pedidos controller for handling order-related operations.
 """
 
 from flask import Blueprint, request, jsonify, current_app
-from src.services.audio_manager import AudioManager
+from services.audio_resources import get_audio_resources
 from src.models.pedido import Pedido
 from src.database import db
 
 pedidos_bp = Blueprint('pedidos', __name__)
 
+def gravar_e_transcrever() -> str:
+    """
+    Record and transcribe the caller with an AudioManager from the app pool.
+    
+    Returns:
+        str: Transcribed text, or an empty string
+    """
+    with get_audio_resources().checkout() as audio_manager:
+        return audio_manager.process_audio(
+            duration=current_app.config.get('AUDIO_MAX_DURATION', 10),
+            silence_duration=current_app.config.get('AUDIO_VAD_SILENCE')
+        )
+
 @pedidos_bp.route('/api/v1/audio/conversa', methods=['POST'])
 def iniciar_conversa():
     """Start a new conversation."""
@@ -16,14 +29,8 @@ def iniciar_conversa():
         return jsonify({'error': 'Application context not found'}), 500
         
     try:
-        # Create audio manager with current app config
-        audio_manager = AudioManager(
-            language=current_app.config.get('SPEECH_LANGUAGE', 'pt-BR'),
-            upload_folder=current_app.config.get('AUDIO_UPLOAD_FOLDER', 'uploads')
-        )
-        
         # Process audio and get transcription
-        transcription = audio_manager.process_audio()
+        transcription = gravar_e_transcrever()
         
         # Create new order
         pedido = Pedido(transcricao=transcription)
@@ -49,14 +56,8 @@ def conversa_interativa(chat_id):
         # Get existing order
         pedido = Pedido.query.get_or_404(chat_id)
         
-        # Create audio manager with current app config
-        audio_manager = AudioManager(
-            language=current_app.config.get('SPEECH_LANGUAGE', 'pt-BR'),
-            upload_folder=current_app.config.get('AUDIO_UPLOAD_FOLDER', 'uploads')
-        )
-        
         # Process audio and get transcription
-        transcription = audio_manager.process_audio()
+        transcription = gravar_e_transcrever()
         
         # Update order with new transcription
         pedido.transcricao = f"{pedido.transcricao}\n{transcription}"
@@ -8,20 +8,46 @@ from typing import Optional
 import speech_recognition as sr
 import logging
 
+from services.audio_clip import AudioClip
+from services.noise_profiles import NoiseProfileCache
+from services.transcription import GoogleTranscriber, TranscriptionError, TranscriptionPool
+
 class AudioManager:
     """Service for managing audio recording and transcription."""
     
-    def __init__(self, language: str = 'pt-BR', upload_folder: str = 'uploads'):
+    def __init__(
+        self,
+        language: str = 'pt-BR',
+        upload_folder: str = 'uploads',
+        transcriber: Optional[TranscriptionPool] = None,
+        noise_profiles: Optional[NoiseProfileCache] = None,
+        device_index: Optional[int] = None,
+        calibration_duration: float = 1.0
+    ):
         """
         Initialize the AudioManager service.
         
         Args:
             language: Language code for speech recognition
             upload_folder: Folder to save audio files
+            transcriber: Shared transcription pool (defaults to a private
+                Google pool, shut down by ``close``)
+            noise_profiles: Shared noise calibration cache (defaults to a private one)
+            device_index: Microphone device index, None for the system default
+            calibration_duration: Seconds of ambient noise listened to when
+                the device has no valid profile
         """
         self.language = language
         self.upload_folder = upload_folder
         self.recognizer = sr.Recognizer()
+        self._owns_transcriber = transcriber is None
+        self.transcriber = transcriber or TranscriptionPool(
+            lambda: GoogleTranscriber(language=language), max_workers=1
+        )
+        self.noise_profiles = noise_profiles or NoiseProfileCache()
+        self.device_index = device_index
+        self.device_key = 'default' if device_index is None else str(device_index)
+        self.calibration_duration = calibration_duration
         self.logger = logging.getLogger(__name__)
     
     def process_audio(self, duration: int = 5) -> str:
@@ -35,28 +61,28 @@ class AudioManager:
             str: Transcribed text
         """
         try:
-            with sr.Microphone() as source:
-                self.logger.info("Ajustando para ruído ambiente...")
-                self.recognizer.adjust_for_ambient_noise(source)
+            with sr.Microphone(device_index=self.device_index) as source:
+                self._calibrate(source)
                 
                 self.logger.info(f"Gravando por {duration} segundos...")
                 audio = self.recognizer.listen(source, timeout=duration)
+            
+            self._refresh_noise_profile(audio)
                 
-                self.logger.info("Transcrevendo áudio...")
-                text = self.recognizer.recognize_google(audio, language=self.language)
-                self.logger.info(f"Transcrição: {text}")
-                
-                return text
+            self.logger.info("Transcrevendo áudio...")
+            clip = AudioClip(audio.frame_data, audio.sample_rate, audio.sample_width)
+            text = self.transcriber.transcribe(clip.resample(self.transcriber.sample_rate))
+            if not text:
+                self.logger.error("Não foi possível entender o áudio.")
+            self.logger.info(f"Transcrição: {text}")
+            
+            return text
                 
         except sr.WaitTimeoutError:
             self.logger.error("Tempo de gravação excedido.")
             return ""
             
-        except sr.UnknownValueError:
-            self.logger.error("Não foi possível entender o áudio.")
-            return ""
-            
-        except sr.RequestError as e:
+        except TranscriptionError as e:
             self.logger.error(f"Erro na requisição ao serviço de reconhecimento: {e}")
             return ""
             
@@ -64,6 +90,39 @@ class AudioManager:
             self.logger.error(f"Erro ao processar áudio: {e}")
             return ""
     
+    def _calibrate(self, source: sr.AudioSource) -> None:
+        """
+        Set the recognizer threshold from the device's cached noise profile,
+        listening to the ambient noise only when there is no valid profile.
+        
+        Args:
+            source: Open microphone
+        """
+        profile = self.noise_profiles.get(self.device_key)
+        if profile:
+            self.recognizer.energy_threshold = profile.energy_threshold
+            return
+        
+        self.logger.info("Ajustando para ruído ambiente...")
+        self.recognizer.adjust_for_ambient_noise(source, duration=self.calibration_duration)
+        self.noise_profiles.store(self.device_key, self.recognizer.energy_threshold)
+    
+    def _refresh_noise_profile(self, audio: sr.AudioData) -> None:
+        """
+        Refresh the noise profile from the silence that ends the utterance.
+        
+        ``listen`` keeps ``non_speaking_duration`` seconds of the pause that
+        ended the phrase, so the tail of the audio is background noise.
+        
+        Args:
+            audio: Audio returned by ``listen``
+        """
+        tail_bytes = int(self.recognizer.non_speaking_duration * audio.sample_rate) * audio.sample_width
+        tail = audio.frame_data[-tail_bytes:] if tail_bytes else b''
+        self.noise_profiles.refresh_from_silence(
+            self.device_key, tail, audio.sample_width, self.recognizer.dynamic_energy_ratio
+        )
+    
     def save_audio(self, audio_data: bytes, filename: str) -> None:
         """
         Save audio data to a file.
@@ -88,4 +147,14 @@ class AudioManager:
         Returns:
             str: Full path to the audio file
         """
-        return os.path.join(self.upload_folder, filename) 
\ No newline at end of file
+        return os.path.join(self.upload_folder, filename)
+    
+    def close(self) -> None:
+        """Shut down the transcription pool if this manager created it."""
+        if self._owns_transcriber:
+            self.transcriber.shutdown()
+            self._owns_transcriber = False
+    
+    def __del__(self):
+        """Cleanup the private transcription pool."""
+        self.close()
@@ -5,25 +5,49 @@ OpenAI service for enhanced order processing and information extraction.
 import openai
 from typing import Dict, List, Any, Optional
 from flask import current_app
+from services.llm_cache import LLMCache, catalog_version, get_llm_cache, llm_cache_key
 
 class OpenAIService:
     """Service for handling OpenAI API interactions."""
     
-    def __init__(self):
-        """Initialize the OpenAI service with API key from config."""
+    # Incrementar quando o prompt mudar, para não reaproveitar respostas antigas do cache
+    EXTRACT_PROMPT_VERSION = 1
+    ORDER_PROMPT_VERSION = 1
+    
+    def __init__(self, cache: Optional[LLMCache] = None):
+        """
+        Initialize the OpenAI service with API key from config.
+        
+        Args:
+            cache: Response cache; defaults to the application's
+        """
         openai.api_key = current_app.config['OPENAI_API_KEY']
         self.model = current_app.config['CHATGPT_MODEL']
+        self.cache = cache if cache is not None else get_llm_cache()
+    
+    def _cached(self, key: str, call):
+        """Answer from the cache when there is one, calling the API on a miss."""
+        if self.cache is None:
+            return call()
+        return self.cache.get_or_call(key, call)
     
     def extract_order_info(self, text: str) -> Dict[str, Any]:
         """
         Extract order information using OpenAI's API.
         
+        Repeated utterances are answered from the response cache.
+        
         Args:
             text: Text to process
             
         Returns:
             Dict with extracted information
         """
+        key = llm_cache_key('extract_order_info', text, model=self.model, prompt_version=self.EXTRACT_PROMPT_VERSION)
+        return self._cached(key, lambda: self._extract_order_info(text))
+    
+    def _extract_order_info(self, text: str) -> Dict[str, Any]:
+        """Call the API to extract the order information."""
         try:
             prompt = f"""
             Analise o seguinte texto de pedido e extraia as informações relevantes:
@@ -64,18 +88,36 @@ class OpenAIService:
             current_app.logger.error(f"Erro ao processar pedido com OpenAI: {e}")
             return None
     
-    def process_order(self, text: str, products: Dict[str, float], synonyms: Dict[str, str]) -> Optional[List[Dict[str, Any]]]:
+    def process_order(
+        self,
+        text: str,
+        products: Dict[str, float],
+        synonyms: Dict[str, str],
+        catalog: Optional[str] = None
+    ) -> Optional[List[Dict[str, Any]]]:
         """
         Process order using OpenAI's API for better understanding.
         
+        Repeated utterances against the same catalog are answered from the
+        response cache.
+        
         Args:
             text: Order text
             products: Available products and prices
             synonyms: Product synonyms
+            catalog: Catalog version; defaults to a fingerprint of
+                ``products`` and ``synonyms``
             
         Returns:
             List of ordered items or None if processing fails
         """
+        if catalog is None:
+            catalog = catalog_version(products, synonyms)
+        key = llm_cache_key('process_order', text, catalog, self.model, self.ORDER_PROMPT_VERSION)
+        return self._cached(key, lambda: self._process_order(text, products, synonyms))
+    
+    def _process_order(self, text: str, products: Dict[str, float], synonyms: Dict[str, str]) -> Optional[List[Dict[str, Any]]]:
+        """Call the API to identify the ordered items."""
         try:
             # Cria uma string com os produtos disponíveis
             products_str = "\n".join([f"- {prod}: R${price:.2f}" for prod, price in products.items()])
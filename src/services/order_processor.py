@@ -2,130 +2,228 @@
 Order processor service for handling order processing and information extraction.
 """
 
-import re
-from typing import Dict, List, Any, Optional
+from typing import Dict, Hashable, List, Any, Optional, Tuple
 from flask import current_app
+from services.info_extractor import (
+    ENDERECO_APRESENTACAO,
+    NOME_APRESENTACAO,
+    TELEFONE_LIVRE,
+    ExtractedField,
+    InfoExtractor,
+    only_digits
+)
+from services.order_lexer import lex_order
+from services.nlu_cascade import get_nlu_stats, run_cascade
+from services.product_index import ProductIndex, get_product_index
 from .openai_service import OpenAIService
 
-def extrair_informacoes(texto: str) -> Dict[str, str]:
+# Compilado uma vez; nome e endereço vêm depois de "me chamo", "moro em", etc.
+_EXTRATOR = InfoExtractor(TELEFONE_LIVRE, NOME_APRESENTACAO, ENDERECO_APRESENTACAO)
+_FORMATOS = {'telefone': only_digits, 'nome': str.title, 'endereco': str.capitalize}
+
+# Confiança de um item reconhecido só pelo começo do trecho ("big mac bem passado")
+PREFIX_CONFIDENCE = 0.7
+
+def extrair_campos(texto: str) -> Dict[str, ExtractedField]:
     """
-    Extrai informações relevantes do texto transcrito.
+    Extrai telefone, nome e endereço em uma única passada, com a posição de cada um.
     
     Args:
         texto: Texto transcrito do áudio
         
     Returns:
-        Dict com informações extraídas (nome, telefone, endereço)
+        Dict com os campos encontrados (nome, telefone, endereco)
     """
-    # Tenta usar o OpenAI primeiro
-    if current_app.config.get('OPENAI_API_KEY'):
-        try:
-            openai_service = OpenAIService()
-            result = openai_service.extract_order_info(texto)
-            if result:
-                return {
-                    'nome': result.get('nome', ''),
-                    'telefone': result.get('telefone', ''),
-                    'endereco': result.get('endereco', '')
-                }
-        except Exception as e:
-            current_app.logger.warning(f"Falha ao usar OpenAI para extrair informações: {e}")
+    campos = _EXTRATOR.extract(texto)
+    return {campo: ExtractedField(_FORMATOS[campo](valor), span) for campo, (valor, span) in campos.items()}
+
+def _extrair_local(texto: str) -> Tuple[Dict[str, Optional[str]], float]:
+    """
+    Extrai as informações com as regras locais.
     
-    # Fallback para processamento tradicional
+    Args:
+        texto: Texto transcrito do áudio
+        
+    Returns:
+        Informações extraídas e a confiança: 1 se algum padrão reconheceu um
+        campo, 0 se nenhum. Cada turno traz só os campos da etapa atual
+        (o telefone, depois o nome...), então não se exige os três.
+    """
     info = {
         'nome': None,
         'telefone': None,
         'endereco': None
     }
+    for campo, (inicio, fim) in _EXTRATOR.spans(texto).items():
+        info[campo] = _FORMATOS[campo](texto[inicio:fim].strip())
     
-    # Padrão para telefone (aceita vários formatos)
-    padrao_telefone = r'\b(\d{2}[\s-]?)?\d{4,5}[\s-]?\d{4}\b'
-    telefone = re.search(padrao_telefone, texto)
-    if telefone:
-        info['telefone'] = re.sub(r'[\s-]', '', telefone.group())
+    return info, 1.0 if any(info.values()) else 0.0
+
+def _extrair_openai(texto: str) -> Optional[Dict[str, str]]:
+    """Extrai as informações com o OpenAI; None se falhar."""
+    try:
+        result = OpenAIService().extract_order_info(texto)
+        if result:
+            return {
+                'nome': result.get('nome', ''),
+                'telefone': result.get('telefone', ''),
+                'endereco': result.get('endereco', '')
+            }
+    except Exception as e:
+        current_app.logger.warning(f"Falha ao usar OpenAI para extrair informações: {e}")
+    return None
+
+def extrair_informacoes(texto: str) -> Dict[str, str]:
+    """
+    Extrai informações relevantes do texto transcrito.
     
-    # Extração de nome (assume que está após "me chamo", "meu nome é", etc.)
-    padrao_nome = r'\b(?:me\s+chamo|meu\s+nome\s+[ée]|sou\s+(?:o|a)?\s*)\s+([A-Za-zÀ-ÿ\s]+)(?=\s|$)'
-    nome = re.search(padrao_nome, texto.lower())
-    if nome:
-        info['nome'] = nome.group(1).strip().title()
+    As regras locais respondem quando reconhecem algum campo; só os
+    textos em que nenhum padrão casou vão para o OpenAI (se configurado).
     
-    # Extração de endereço (assume que está após "meu endereço é", "moro em", etc.)
-    padrao_endereco = r'\b(?:meu\s+endere[çc]o\s+[ée]|moro\s+em|fico\s+em)\s+([^,.!?]+)'
-    endereco = re.search(padrao_endereco, texto.lower())
-    if endereco:
-        info['endereco'] = endereco.group(1).strip().capitalize()
+    Args:
+        texto: Texto transcrito do áudio
+        
+    Returns:
+        Dict com informações extraídas (nome, telefone, endereço)
+    """
+    remoto = (lambda: _extrair_openai(texto)) if current_app.config.get('OPENAI_API_KEY') else None
+    return run_cascade(
+        'extrair_informacoes',
+        lambda: _extrair_local(texto),
+        remoto,
+        current_app.config.get('NLU_CONFIDENCE_THRESHOLD', 0.8),
+        get_nlu_stats()
+    )
+
+def _ingredientes(produto: Dict[str, Any], nomes: List[str], conhecidos: bool = False) -> List[str]:
+    """
+    Match the ingredients a customer asked to remove with the product's own.
     
-    return info
+    Args:
+        produto: Produto do catálogo
+        nomes: Ingredientes como foram ditos
+        conhecidos: Descarta os nomes que não são ingredientes do produto
+        
+    Returns:
+        Lista de ingredientes, com o nome do catálogo quando existir
+    """
+    ingredientes = {nome.lower(): nome for nome in produto.get('ingredientes', [])}
+    removidos = []
+    for nome in nomes:
+        ingrediente = ingredientes.get(nome.lower())
+        if ingrediente or not conhecidos:
+            removidos.append(ingrediente or nome)
+    return removidos
 
-def process_order(texto: str, produtos: List[Dict[str, Any]], sinonimos: Dict[str, List[str]]) -> Optional[List[Dict[str, Any]]]:
+def _processar_local(texto: str, indice: ProductIndex) -> Tuple[Optional[List[Dict[str, Any]]], float]:
     """
-    Processa o pedido a partir do texto transcrito.
+    Processa o pedido com as regras locais.
     
     Args:
         texto: Texto transcrito do áudio
-        produtos: Lista de produtos disponíveis
-        sinonimos: Dicionário de sinônimos para produtos
+        indice: Índice de nomes e sinônimos do catálogo
         
     Returns:
-        Lista de itens do pedido ou None se não encontrar itens
+        Itens do pedido (ou None) e a confiança: a do trecho menos certo.
+        Um nome exato vale 1, um nome seguido de palavras desconhecidas
+        vale PREFIX_CONFIDENCE e um trecho não reconhecido vale 0.
     """
-    # Tenta usar o OpenAI primeiro
-    if current_app.config.get('OPENAI_API_KEY'):
-        try:
-            # Converte produtos para o formato esperado pelo OpenAI
-            products_dict = {prod['nome']: prod['preco'] for prod in produtos}
-            synonyms_dict = {prod['nome']: sinonimos.get(prod['nome'].lower(), []) for prod in produtos}
-            
-            openai_service = OpenAIService()
-            result = openai_service.process_order(texto, products_dict, synonyms_dict)
-            if result:
-                # Converte o resultado para o formato esperado
-                return [{
-                    'produto_id': next(prod['id'] for prod in produtos if prod['nome'].lower() == item['produto'].lower()),
-                    'nome': item['produto'],
-                    'quantidade': item['quantidade'],
-                    'preco_unitario': item['preco']
-                } for item in result]
-        except Exception as e:
-            current_app.logger.warning(f"Falha ao usar OpenAI para processar pedido: {e}")
-    
-    # Fallback para processamento tradicional
     try:
         itens_pedido = []
-        texto = texto.lower()
-        
-        # Procura por números e quantidades
-        padrao_quantidade = r'(\d+)\s*(?:x|unidades?|un\.?)?\s*(?:de\s+)?([a-zà-ÿ\s]+)'
-        matches = re.finditer(padrao_quantidade, texto)
+        confianca = 1.0
         
-        for match in matches:
-            quantidade = int(match.group(1))
-            item_nome = match.group(2).strip()
-            
+        for item in lex_order(texto):
             # Procura o produto pelo nome ou sinônimo
-            produto_encontrado = None
-            for produto in produtos:
-                if item_nome == produto['nome'].lower():
-                    produto_encontrado = produto
-                    break
-                    
-                # Verifica sinônimos
-                if produto['nome'].lower() in sinonimos:
-                    if item_nome in sinonimos[produto['nome'].lower()]:
-                        produto_encontrado = produto
-                        break
+            produto_encontrado = indice.lookup(item.product)
+            if produto_encontrado is None:
+                produto_encontrado = indice.lookup_prefix(item.product)
+                if produto_encontrado:
+                    confianca = min(confianca, PREFIX_CONFIDENCE)
             
             if produto_encontrado:
                 itens_pedido.append({
                     'produto_id': produto_encontrado['id'],
                     'nome': produto_encontrado['nome'],
-                    'quantidade': quantidade,
-                    'preco_unitario': produto_encontrado['preco']
+                    'quantidade': item.quantity or 1,
+                    'preco_unitario': produto_encontrado['preco'],
+                    'ingredientes_removidos': _ingredientes(produto_encontrado, item.modifiers)
                 })
+            elif itens_pedido and item.quantity is None:
+                # "sem cebola e picles": o nome depois do "e" pode ser mais um ingrediente
+                anterior = itens_pedido[-1]
+                removidos = _ingredientes(indice.products[anterior['produto_id']], [item.product], conhecidos=True)
+                anterior['ingredientes_removidos'].extend(removidos)
+                if not removidos:
+                    confianca = 0.0
+            else:
+                confianca = 0.0
         
-        return itens_pedido if itens_pedido else None
+        if not itens_pedido:
+            return None, 0.0
+        return itens_pedido, confianca
         
     except Exception as e:
         current_app.logger.error(f"Erro ao processar pedido: {e}")
-        return None 
\ No newline at end of file
+        return None, 0.0
+
+def _processar_openai(
+    texto: str,
+    produtos: List[Dict[str, Any]],
+    sinonimos: Dict[str, List[str]],
+    catalog_version: Optional[Hashable],
+    indice: ProductIndex
+) -> Optional[List[Dict[str, Any]]]:
+    """Processa o pedido com o OpenAI; None se falhar."""
+    try:
+        # Converte produtos para o formato esperado pelo OpenAI
+        products_dict = {prod['nome']: prod['preco'] for prod in produtos}
+        synonyms_dict = {prod['nome']: sinonimos.get(prod['nome'].lower(), []) for prod in produtos}
+        
+        openai_service = OpenAIService()
+        versao = None if catalog_version is None else str(catalog_version)
+        result = openai_service.process_order(texto, products_dict, synonyms_dict, versao)
+        if result:
+            # Converte o resultado para o formato esperado
+            return [{
+                'produto_id': indice.lookup(item['produto'])['id'],
+                'nome': item['produto'],
+                'quantidade': item['quantidade'],
+                'preco_unitario': item['preco']
+            } for item in result]
+    except Exception as e:
+        current_app.logger.warning(f"Falha ao usar OpenAI para processar pedido: {e}")
+    return None
+
+def process_order(
+    texto: str,
+    produtos: List[Dict[str, Any]],
+    sinonimos: Dict[str, List[str]],
+    catalog_version: Optional[Hashable] = None
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Processa o pedido a partir do texto transcrito.
+    
+    As regras locais respondem quando reconhecem todos os itens com
+    confiança; só os pedidos ambíguos vão para o OpenAI (se configurado).
+    
+    Args:
+        texto: Texto transcrito do áudio
+        produtos: Lista de produtos disponíveis
+        sinonimos: Dicionário de sinônimos para produtos
+        catalog_version: Versão do catálogo; o índice de nomes só é refeito quando ela muda
+        
+    Returns:
+        Lista de itens do pedido ou None se não encontrar itens
+    """
+    indice = get_product_index(produtos, sinonimos, catalog_version)
+    remoto = None
+    if current_app.config.get('OPENAI_API_KEY'):
+        remoto = lambda: _processar_openai(texto, produtos, sinonimos, catalog_version, indice)
+    
+    return run_cascade(
+        'process_order',
+        lambda: _processar_local(texto, indice),
+        remoto,
+        current_app.config.get('NLU_CONFIDENCE_THRESHOLD', 0.8),
+        get_nlu_stats()
+    )
@@ -2,68 +2,91 @@
 Text-to-speech service using gTTS.
 """
 
-import os
-import tempfile
+import io
 from typing import Optional
 from gtts import gTTS
 from pydub import AudioSegment
 from pydub.playback import play
 from flask import current_app
 
+from services.audio_clip import AudioClip
+from services.prompts import Prompt, splice
+from services.tts_cache import TTSCache, cache_key, get_tts_cache
+
 class TextToSpeech:
     """Service for converting text to speech using gTTS."""
     
-    def __init__(self, language: Optional[str] = None):
+    ENGINE = 'gtts'
+    
+    def __init__(self, language: Optional[str] = None, cache: Optional[TTSCache] = None):
         """
         Initialize the TextToSpeech service.
         
         Args:
             language: Language code (defaults to app config)
+            cache: Prompt cache (defaults to the app's cache)
         """
         self.language = language or current_app.config['SPEECH_LANGUAGE']
+        self.cache = cache or get_tts_cache()
     
     def speak(self, text: str) -> None:
         """
         Generate and play audio from text.
         
+        Repeated prompts are played from the cache, without a new request
+        to the synthesis service.
+        
         Args:
             text: Text to convert to speech
         """
-        temp_mp3 = None
-        temp_wav = None
-
         try:
-            # Create unique temporary files
-            temp_mp3 = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-            temp_wav = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-            
-            # Generate audio with gTTS and save as MP3
-            tts = gTTS(text, lang=self.language)
-            tts.save(temp_mp3.name)
-
-            # Convert from MP3 to WAV
-            audio = AudioSegment.from_mp3(temp_mp3.name)
-            audio.export(temp_wav.name, format="wav")
-
-            # Play the WAV file
-            audio_to_play = AudioSegment.from_wav(temp_wav.name)
-            play(audio_to_play)
-
+            clip = self.synthesize(text)
+            play(AudioSegment(
+                data=bytes(clip.frames),
+                sample_width=clip.sample_width,
+                frame_rate=clip.sample_rate,
+                channels=clip.channels
+            ))
         except Exception as e:
             current_app.logger.error(f"Erro ao gerar ou reproduzir o áudio: {e}")
-
-        finally:
-            # Ensure temporary files are removed
-            if temp_mp3:
-                try:
-                    os.unlink(temp_mp3.name)
-                except Exception as e:
-                    current_app.logger.error(f"Erro ao remover o arquivo temporário MP3: {e}")
-            if temp_wav:
-                try:
-                    os.unlink(temp_wav.name)
-                except Exception as e:
-                    current_app.logger.error(f"Erro ao remover o arquivo temporário WAV: {e}")
+    
+    def synthesize(self, text: str) -> AudioClip:
+        """
+        Get the audio of a text from the cache, synthesizing it on a miss.
+        
+        Args:
+            text: Text to convert to speech
+            
+        Returns:
+            AudioClip: Decoded PCM audio
+        """
+        if isinstance(text, Prompt) and len(text.segments) > 1:
+            clip = splice(text, self._synthesize_text)
+            if clip is not None:
+                return clip
+        return self._synthesize_text(text)
+    
+    def _synthesize_text(self, text: str) -> AudioClip:
+        """Get the audio of a single text from the cache, synthesizing it on a miss."""
+        if self.cache is None:
+            return self._render(text)
+        key = cache_key(text, self.language, engine=self.ENGINE)
+        return self.cache.get_or_render(key, lambda: self._render(text))
+    
+    def _render(self, text: str) -> AudioClip:
+        """Synthesize a text with gTTS and decode it to PCM, all in memory."""
+        mp3 = io.BytesIO()
+        gTTS(text, lang=self.language).write_to_fp(mp3)
+        mp3.seek(0)
+        
+        # Single decode straight to PCM frames
+        audio = AudioSegment.from_file(mp3, format="mp3")
+        return AudioClip(
+            audio.raw_data,
+            sample_rate=audio.frame_rate,
+            sample_width=audio.sample_width,
+            channels=audio.channels
+        )
     
     def save_to_file(self, text: str, filename: str) -> None:
         """
@@ -0,0 +1,82 @@
+"""
+Tests for the in-memory audio clip and its resampling stage.
+"""
+
+import math
+import struct
+
+import pytest
+
+from services import audio_clip
+from services.audio_clip import AudioClip
+
+AMPLITUDE = 10000
+
+def sine_clip(sample_rate=44100, channels=1, seconds=1.0, frequency=440):
+    """Build a 16-bit sine wave clip."""
+    count = int(sample_rate * seconds)
+    samples = []
+    for i in range(count):
+        value = int(AMPLITUDE * math.sin(2 * math.pi * frequency * i / sample_rate))
+        samples.extend([value] * channels)
+    frames = struct.pack(f'<{len(samples)}h', *samples)
+    return AudioClip(frames, sample_rate=sample_rate, channels=channels)
+
+def amplitude(clip):
+    """Return (peak, rms) of a 16-bit clip."""
+    count = len(clip.frames) // 2
+    samples = struct.unpack(f'<{count}h', bytes(clip.frames))
+    peak = max(abs(s) for s in samples)
+    rms = math.sqrt(sum(s * s for s in samples) / count)
+    return peak, rms
+
+@pytest.fixture(params=['audioop', 'numpy'])
+def backend(request, monkeypatch):
+    """Run each test with both resampling implementations."""
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+        monkeypatch.setattr(audio_clip, 'audioop', None)
+    elif audio_clip.audioop is None:
+        pytest.skip('audioop not available')
+    return request.param
+
+@pytest.mark.parametrize('rate', [16000, 8000])
+def test_resample_keeps_duration(backend, rate):
+    """Downsampling changes the sample rate, not the duration."""
+    clip = sine_clip().resample(rate)
+
+    assert clip.sample_rate == rate
+    assert clip.channels == 1
+    assert clip.duration == pytest.approx(1.0, abs=0.01)
+
+def test_resample_keeps_amplitude(backend):
+    """A 440 Hz tone keeps its level after going to 16 kHz."""
+    clip = sine_clip().resample(16000)
+    peak, rms = amplitude(clip)
+
+    assert peak == pytest.approx(AMPLITUDE, rel=0.05)
+    assert rms == pytest.approx(AMPLITUDE / math.sqrt(2), rel=0.05)
+
+def test_resample_downmixes_stereo(backend):
+    """Stereo 44.1 kHz becomes mono 16 kHz with the same level."""
+    source = sine_clip(channels=2)
+    clip = source.resample(16000)
+    peak, _ = amplitude(clip)
+
+    assert clip.channels == 1
+    assert clip.duration == pytest.approx(1.0, abs=0.01)
+    assert peak == pytest.approx(AMPLITUDE, rel=0.05)
+    assert len(source.frames) / len(clip.frames) == pytest.approx(2 * 44100 / 16000, rel=0.01)
+
+def test_resample_cuts_bytes_per_turn():
+    """Mono 44.1 kHz to 16 kHz shrinks the payload about 2.75x."""
+    source = sine_clip()
+    clip = source.resample(16000)
+
+    assert len(source.frames) / len(clip.frames) == pytest.approx(2.75, rel=0.01)
+
+def test_resample_same_format_is_noop():
+    """No conversion happens when the clip is already in the target format."""
+    clip = sine_clip(sample_rate=16000)
+
+    assert clip.resample(16000) is clip
@@ -0,0 +1,91 @@
+"""
+Tests for the process-wide pool of audio resources.
+"""
+
+import struct
+
+from services.audio_resources import AudioResources
+from services.noise_profiles import NoiseProfileCache
+from services.transcription import FakeTranscriber, TranscriptionPool
+
+def chunk(level, frames=1024):
+    """16-bit mono chunk whose RMS energy is ``level``."""
+    return struct.pack(f'<{frames}h', *([level, -level] * (frames // 2)))
+
+class FakeMicrophone:
+    """PyAudio stand-in that plays a caller: noise, speech, then silence."""
+
+    def __init__(self, noise=40):
+        self.noise = noise
+
+    def open(self, **kwargs):
+        chunks = iter([chunk(self.noise)] * 20 + [chunk(3000)] * 20)
+        microphone = self
+
+        class Stream:
+            def read(self, frames):
+                return next(chunks, chunk(microphone.noise))
+
+            def stop_stream(self):
+                pass
+
+            def close(self):
+                pass
+
+        return Stream()
+
+def make_resources(tmp_path, max_idle=2):
+    pool = TranscriptionPool(lambda: FakeTranscriber(), max_workers=1)
+    return AudioResources(str(tmp_path), transcriber=pool, max_idle=max_idle), pool
+
+def test_released_manager_is_reused(tmp_path):
+    """A turn gets back the manager (and buffer) of the previous turn."""
+    resources, pool = make_resources(tmp_path)
+
+    with resources.checkout() as first:
+        assert first.transcriber is pool
+    with resources.checkout() as second:
+        pass
+
+    assert second is first
+    pool.shutdown()
+
+def test_idle_managers_are_bounded(tmp_path):
+    """Only max_idle managers are kept; the extra ones are closed."""
+    resources, pool = make_resources(tmp_path, max_idle=2)
+    managers = [resources.acquire() for _ in range(3)]
+    assert len({id(m) for m in managers}) == 3
+
+    closed = []
+    managers[2].close = lambda: closed.append(managers[2])
+    for manager in managers:
+        resources.release(manager)
+
+    assert closed == [managers[2]]
+    again = [resources.acquire() for _ in range(3)]
+    assert again[:2] == [managers[1], managers[0]]
+    assert again[2] not in managers
+    pool.shutdown()
+
+def test_pooled_managers_calibrate_through_the_noise_cache(tmp_path):
+    """The first turn stores the device's profile; later turns start from it."""
+    pool = TranscriptionPool(lambda: FakeTranscriber(), max_workers=1)
+    noise_profiles = NoiseProfileCache()
+    resources = AudioResources(str(tmp_path), transcriber=pool, noise_profiles=noise_profiles)
+    resources._pyaudio = FakeMicrophone()
+
+    with resources.checkout() as manager:
+        assert manager.noise_profiles is noise_profiles
+        manager.record_audio(duration=3, silence_duration=0.3)
+    profile = noise_profiles.get('default')
+    assert profile is not None and profile.refreshes == 0
+    calibrated = profile.energy_threshold
+
+    resources._pyaudio.noise = 80
+    with resources.checkout() as manager:
+        vad = manager._new_vad(0.3)
+        assert vad.calibration_duration == 0 and vad.noise_floor > 0
+        manager.record_audio(duration=3, silence_duration=0.3)
+    # O silêncio mais alto do segundo turno sobe o limiar
+    assert profile.refreshes == 1 and profile.energy_threshold > calibrated
+    pool.shutdown()
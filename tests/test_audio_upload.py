@@ -0,0 +1,122 @@
+"""
+Tests for the ingestion of client-uploaded audio.
+"""
+
+import io
+import shutil
+
+import pytest
+from flask import Flask, request
+
+from services import audio_upload
+from services.audio_clip import AudioClip
+from services.audio_upload import (
+    MultipartFileStream,
+    UnsupportedAudioError,
+    get_uploaded_audio,
+    open_uploaded_audio
+)
+
+ALLOWED = {'wav', 'ogg', 'mp3'}
+BOUNDARY = 'fronteira'
+
+def wav_bytes(seconds=1.0, sample_rate=16000):
+    """Build a WAV file with a ramp of 16-bit samples."""
+    count = int(seconds * sample_rate)
+    frames = b''.join((i % 2000).to_bytes(2, 'little', signed=True) for i in range(count))
+    return AudioClip(frames, sample_rate=sample_rate).to_wav_bytes(), frames
+
+def multipart_body(audio, filename='fala.wav', content_type='audio/wav'):
+    """Multipart body with a text field before the audio file."""
+    return b''.join([
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="canal"\r\n\r\nweb\r\n'.encode(),
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="audio"; filename="{filename}"\r\n'.encode(),
+        f'Content-Type: {content_type}\r\n\r\n'.encode(),
+        audio,
+        f'\r\n--{BOUNDARY}--\r\n'.encode()
+    ])
+
+class CountingStream(io.BytesIO):
+    """Request body that records how much of it was read."""
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.consumed = self.tell()
+        return data
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+
+    @app.route('/turno', methods=['POST'])
+    def turno():
+        upload = get_uploaded_audio(request, ALLOWED)
+        if upload is None:
+            return {'audio': None}
+        stream, extension = upload
+        clip = open_uploaded_audio(stream, extension).read_all()
+        return {'extension': extension, 'bytes': len(clip.frames), 'rate': clip.sample_rate}
+
+    @app.errorhandler(UnsupportedAudioError)
+    def invalido(e):
+        return {'error': str(e)}, 400
+
+    return app
+
+def test_raw_and_multipart_bodies_decode_the_same_wav(app):
+    """Both upload styles decode the WAV frames sent by the client."""
+    audio, frames = wav_bytes()
+    client = app.test_client()
+
+    raw = client.post('/turno', data=audio, content_type='audio/wav').get_json()
+    form = client.post(
+        '/turno', data=multipart_body(audio),
+        content_type=f'multipart/form-data; boundary={BOUNDARY}'
+    ).get_json()
+
+    assert raw == form == {'extension': 'wav', 'bytes': len(frames), 'rate': 16000}
+    assert client.post('/turno', data=b'{}', content_type='application/json').get_json() == {'audio': None}
+
+def test_multipart_file_is_read_while_the_body_arrives():
+    """The first decoded chunk is available before the body is read to the end."""
+    audio, frames = wav_bytes(seconds=4)
+    body = CountingStream(multipart_body(audio))
+
+    stream = MultipartFileStream(body, BOUNDARY.encode())
+    capture = open_uploaded_audio(stream, 'wav', keep_frames=False)
+    chunks = iter(capture)
+    first = next(chunks)
+
+    assert stream.filename == 'fala.wav' and stream.mimetype == 'audio/wav'
+    assert first == frames[:len(first)]
+    assert body.consumed < len(body.getvalue()) // 2
+    assert sum(len(c) for c in chunks) + len(first) == len(frames)
+    assert capture.clip is None
+
+def test_rejected_formats(app):
+    """Formats outside the allowed set and broken WAV files are refused."""
+    client = app.test_client()
+    audio, _ = wav_bytes()
+
+    assert client.post('/turno', data=b'fLaC', content_type='audio/flac').status_code == 400
+    response = client.post(
+        '/turno', data=multipart_body(audio, filename='fala.txt', content_type='text/plain'),
+        content_type=f'multipart/form-data; boundary={BOUNDARY}'
+    )
+    assert response.status_code == 400
+    assert client.post('/turno', data=b'nao e wav', content_type='audio/wav').status_code == 400
+
+def test_ffmpeg_failure_is_reported(monkeypatch):
+    """A decoder that exits with an error surfaces as an unsupported upload."""
+    false = shutil.which('false')
+    monkeypatch.setattr(audio_upload.shutil, 'which', lambda name: false)
+
+    with pytest.raises(UnsupportedAudioError):
+        open_uploaded_audio(io.BytesIO(b'OggS' + b'\x00' * 4096), 'ogg').read_all()
+
+def test_missing_ffmpeg(monkeypatch):
+    """Compressed uploads need ffmpeg on the server."""
+    monkeypatch.setattr(audio_upload.shutil, 'which', lambda name: None)
+
+    with pytest.raises(RuntimeError):
+        open_uploaded_audio(io.BytesIO(b'ID3'), 'mp3').read_all()
@@ -0,0 +1,47 @@
+"""
+Tests for the batch NLU replay.
+"""
+
+import io
+import json
+
+from services.batch_nlu import analyze_batch, read_ndjson, write_ndjson
+
+PRODUCTS = {"pizza": 25.00, "refrigerante": 5.00}
+SYNONYMS = {"refri": "refrigerante"}
+
+def test_results_follow_input_order_across_workers():
+    """Records keep their fields and come back in order, in chunks from the pool."""
+    lines = [json.dumps({"id": i, "texto": f"{i % 3 + 1} pizza e um refri"}) for i in range(20)]
+    lines.insert(5, json.dumps("Ana 11 98765-4321 Rua das Flores"))
+
+    results = list(analyze_batch(read_ndjson(lines), PRODUCTS, SYNONYMS, workers=2, chunk_size=3))
+
+    assert len(results) == 21
+    assert [r["id"] for r in results if "id" in r] == list(range(20))
+    assert results[0]["itens"] == [
+        {"produto": "pizza", "quantidade": 1, "preco": 25.00},
+        {"produto": "refrigerante", "quantidade": 1, "preco": 5.00}
+    ]
+    assert results[5]["informacoes"]["telefone"] == "11987654321" and results[5]["itens"] is None
+
+def test_ndjson_output_is_one_line_per_transcript():
+    """Results are written as they are produced, one JSON object per line."""
+    output = io.StringIO()
+    count = write_ndjson(analyze_batch(["duas pizza"], PRODUCTS, SYNONYMS, workers=1), output)
+
+    assert count == 1
+    assert json.loads(output.getvalue())["itens"][0]["quantidade"] == 2
+
+def test_bad_lines_become_error_results():
+    """A malformed line or record is reported in place and the replay goes on."""
+    lines = ['"uma pizza"', '{"texto": "duas pizza"', '{"id": 7}', '42', '"um refri"']
+
+    results = list(analyze_batch(read_ndjson(lines), PRODUCTS, SYNONYMS, workers=2, chunk_size=2))
+
+    assert len(results) == 5
+    assert results[0]["itens"][0]["produto"] == "pizza"
+    assert results[1]["linha"] == 2 and results[1]["erro"].startswith("JSON inválido")
+    assert results[2]["id"] == 7 and "erro" in results[2]
+    assert "erro" in results[3]
+    assert results[4]["itens"][0]["produto"] == "refrigerante"
@@ -0,0 +1,30 @@
+"""
+Tests for the customer information extractor.
+"""
+
+from services.info_extractor import ENDERECO_APRESENTACAO, NOME_APRESENTACAO, TELEFONE_LIVRE, InfoExtractor
+from services.order_processor import extrair_campos, extrair_informacoes
+
+def test_fields_around_the_phone_keep_their_offsets():
+    """Name before the phone and address after it, as slices of the transcript."""
+    texto = "  Ana Souza 11 98765-4321 Rua das Flores, 123 "
+    campos = extrair_campos(texto)
+
+    assert extrair_informacoes(texto) == {"nome": "Ana Souza", "telefone": "11987654321", "endereco": "Rua das Flores, 123"}
+    assert {campo: texto[slice(*c.span)] for campo, c in campos.items()} == {
+        "nome": "Ana Souza",
+        "telefone": "11 98765-4321",
+        "endereco": "Rua das Flores, 123"
+    }
+    assert extrair_informacoes("sem telefone") == {"nome": "", "telefone": "", "endereco": ""}
+
+def test_introductions_are_matched_regardless_of_case():
+    """The lowercased view finds the fields; values come from the original text."""
+    extrator = InfoExtractor(TELEFONE_LIVRE, NOME_APRESENTACAO, ENDERECO_APRESENTACAO)
+    texto = "Meu telefone é 98765-4321, Moro em Rua das Flores, 123, e me chamo Ana Souza"
+    campos = extrator.extract(texto)
+
+    assert campos["nome"].value == "Ana Souza"
+    assert campos["telefone"].value == "98765-4321"
+    assert campos["endereco"].value == "Rua das Flores"
+    assert texto[slice(*campos["endereco"].span)] == "Rua das Flores"
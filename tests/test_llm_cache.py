@@ -0,0 +1,65 @@
+"""
+Tests for the model response cache.
+"""
+
+from services.llm_cache import LLMCache, llm_cache_key
+
+class Clock:
+    """Settable clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_key_normalizes_text_and_covers_every_version():
+    """Case, accents and punctuation do not matter; catalog, model and prompt do."""
+    base = llm_cache_key('process_order', 'Quero uma Coca.', 'v1', 'gpt-3.5-turbo', 1)
+
+    assert base == llm_cache_key('process_order', 'quero  uma coca', 'v1', 'gpt-3.5-turbo', 1)
+    assert len({
+        base,
+        llm_cache_key('process_order', 'quero duas coca', 'v1', 'gpt-3.5-turbo', 1),
+        llm_cache_key('process_order', 'quero uma coca', 'v2', 'gpt-3.5-turbo', 1),
+        llm_cache_key('process_order', 'quero uma coca', 'v1', 'gpt-4', 1),
+        llm_cache_key('process_order', 'quero uma coca', 'v1', 'gpt-3.5-turbo', 2),
+        llm_cache_key('extract_order_info', 'quero uma coca', 'v1', 'gpt-3.5-turbo', 1)
+    }) == 6
+
+def test_repeated_utterance_skips_the_call_until_it_expires():
+    """A response is reused until its TTL; failures are not cached."""
+    clock = Clock()
+    cache = LLMCache(ttl=60, clock=clock)
+    calls = []
+
+    def call():
+        calls.append(1)
+        return [{'produto': 'coca', 'quantidade': 1}]
+
+    assert cache.get_or_call('k', lambda: None) is None
+    cache.get_or_call('k', call)
+    result = cache.get_or_call('k', call)
+    result.append('mutated')
+
+    assert cache.get('k') == [{'produto': 'coca', 'quantidade': 1}]
+    assert len(calls) == 1
+    clock.now += 61
+    cache.get_or_call('k', call)
+    assert len(calls) == 2
+    assert cache.metrics()['hits'] == 2
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    """A new cache (another process, or after a restart) reads the stored responses."""
+    clock = Clock()
+    path = str(tmp_path / 'llm_cache.sqlite3')
+    LLMCache(path=path, ttl=60, clock=clock).put('k', {'nome': 'Ana'})
+
+    cache = LLMCache(path=path, ttl=60, clock=clock)
+    assert cache.get('k') == {'nome': 'Ana'}
+    assert cache.get('k') == {'nome': 'Ana'}
+    assert (cache.disk_hits, cache.hits) == (1, 1)
+
+    clock.now += 61
+    assert LLMCache(path=path, clock=clock).get('k') is None
+    assert cache.purge() == 1
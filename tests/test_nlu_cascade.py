@@ -0,0 +1,71 @@
+"""
+Tests for the local-first NLU cascade.
+"""
+
+import importlib
+import os
+import sys
+import types
+
+from flask import Flask
+
+from services.nlu_cascade import FALLBACK, LLM, LOCAL, NLUStats, get_nlu_stats, init_app, run_cascade
+
+def load_src_order_processor():
+    """Import src/services/order_processor.py without the package __init__ (UTF-16)."""
+    if 'src_services' not in sys.modules:
+        package = types.ModuleType('src_services')
+        package.__path__ = [os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src', 'services')]
+        sys.modules['src_services'] = package
+    return importlib.import_module('src_services.order_processor')
+
+def test_confident_local_result_skips_the_model():
+    """Above the threshold the model is never called."""
+    stats = NLUStats()
+    calls = []
+
+    def remote():
+        calls.append(1)
+        return 'modelo'
+
+    assert run_cascade('process_order', lambda: ('local', 1.0), remote, 0.8, stats) == 'local'
+    assert calls == []
+    assert stats.snapshot()['process_order'][LOCAL] == 1
+
+def test_ambiguous_turn_escalates_and_falls_back():
+    """Below the threshold the model answers; without it the local result stands."""
+    stats = NLUStats()
+
+    assert run_cascade('process_order', lambda: ('local', 0.5), lambda: 'modelo', 0.8, stats) == 'modelo'
+    assert run_cascade('process_order', lambda: ('local', 0.5), lambda: None, 0.8, stats) == 'local'
+    assert run_cascade('process_order', lambda: (None, 0.0), None, 0.8, stats) is None
+    assert run_cascade('process_order', lambda: ('local', 0.9), None, 0.8, stats) == 'local'
+
+    snapshot = stats.snapshot()['process_order']
+    assert (snapshot[LOCAL], snapshot[LLM], snapshot[FALLBACK]) == (1, 1, 2)
+    assert snapshot['local_fraction'] == 0.25
+
+def test_name_and_phone_turn_stays_local(monkeypatch):
+    """A turn with the fields of its step is answered without the model."""
+    order_processor = load_src_order_processor()
+    calls = []
+
+    class FakeOpenAI:
+        def extract_order_info(self, texto):
+            calls.append(texto)
+            return {'nome': 'Modelo', 'telefone': '0', 'endereco': ''}
+
+    monkeypatch.setattr(order_processor, 'OpenAIService', FakeOpenAI)
+    app = Flask(__name__)
+    app.config.update(OPENAI_API_KEY='chave', NLU_CONFIDENCE_THRESHOLD=0.8)
+    init_app(app)
+
+    with app.app_context():
+        info = order_processor.extrair_informacoes('me chamo maria e o telefone 11 98765-4321')
+        order_processor.extrair_informacoes('bom dia')
+        snapshot = get_nlu_stats().snapshot()['extrair_informacoes']
+
+    assert info['telefone'] == '11987654321'
+    assert info['nome'].startswith('Maria')
+    assert calls == ['bom dia']
+    assert (snapshot[LOCAL], snapshot[LLM]) == (1, 1)
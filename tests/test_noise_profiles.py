@@ -0,0 +1,94 @@
+"""
+Tests for the per-device noise calibration cache.
+"""
+
+import struct
+
+import pytest
+
+from app import create_app
+from config.settings import Config
+from services.audio_resources import get_audio_resources
+from services.noise_profiles import NoiseProfileCache, get_noise_profiles
+
+class FakeClock:
+    """Clock advanced by hand."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def noise(level, samples=8000):
+    """16-bit square wave of constant energy."""
+    return struct.pack(f'<{samples}h', *([level, -level] * (samples // 2)))
+
+def test_profile_is_reused_until_it_expires():
+    """A device is calibrated once and recalibrated only after the TTL."""
+    clock = FakeClock()
+    cache = NoiseProfileCache(ttl=60, clock=clock)
+
+    assert cache.get('default') is None
+    cache.store('default', 400)
+    clock.now = 59
+    assert cache.get('default').energy_threshold == 400
+    clock.now = 121
+    assert cache.get('default') is None
+
+def test_trailing_silence_refreshes_and_extends_profile():
+    """The tail of each turn moves the threshold and keeps the profile alive."""
+    clock = FakeClock()
+    cache = NoiseProfileCache(ttl=60, damping=0.5, clock=clock)
+    cache.store('default', 400)
+
+    clock.now = 50
+    profile = cache.refresh_from_silence('default', noise(200), energy_ratio=1.5)
+    assert profile.energy_threshold == pytest.approx(350)
+    assert profile.refreshes == 1
+
+    clock.now = 100
+    assert cache.get('default') is profile
+    assert cache.refresh_from_silence('other', noise(200)) is None
+
+class CallerMicrophone:
+    """PyAudio stand-in for a caller: a short pause, speech, then silence."""
+
+    def open(self, **kwargs):
+        chunks = iter([noise(40, 1024)] * 20 + [noise(3000, 1024)] * 20)
+
+        class Stream:
+            def read(self, frames):
+                return next(chunks, noise(40, 1024))
+
+            def stop_stream(self):
+                pass
+
+            def close(self):
+                pass
+
+        return Stream()
+
+    def terminate(self):
+        pass
+
+def test_conversation_turns_share_the_app_noise_profile(tmp_path):
+    """Turns recorded through the app's audio pool calibrate the device once."""
+    class TestConfig(Config):
+        TEMP_DIR = str(tmp_path)
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path}/pedidos.db'
+        AUDIO_UPLOAD_FOLDER = str(tmp_path / 'audio')
+        TRANSCRIBER_BACKEND = 'fake'
+        TRANSCRIBER_WARM = False
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        resources = get_audio_resources()
+        resources._pyaudio = CallerMicrophone()
+
+        # Como gravar_e_transcrever: um AudioManager do pool por turno
+        for turno in range(2):
+            with resources.checkout() as audio_manager:
+                audio_manager.process_audio(duration=3, silence_duration=0.3)
+            profile = get_noise_profiles().get('default')
+            assert profile is not None and profile.refreshes == turno
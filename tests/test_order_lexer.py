@@ -0,0 +1,29 @@
+"""
+Tests for the order lexer.
+"""
+
+from services.order_lexer import lex_order
+from services.order_processor import process_order
+
+def test_number_words_and_removals():
+    """Quantities may be spoken; removals apply to the item before them."""
+    items = lex_order("Quero dois Big Mac e pode tirar a cebola, uma Coca-Cola 350ml e meia dúzia de pastel")
+
+    assert [(i.quantity, i.product, i.modifiers) for i in items] == [
+        (2, "Big Mac", ["cebola"]),
+        (1, "Coca-Cola 350ml", []),
+        (6, "pastel", [])
+    ]
+    texto = "Gostaria de um Big Mac, mas não quero picles."
+    assert texto[slice(*lex_order(texto)[0].span)] == "Big Mac"
+
+def test_items_split_on_conjunctions_and_quantities():
+    """Each item keeps its own quantity, whether said in digits or words."""
+    products = {"pizza": 25.00, "refrigerante": 5.00, "batata frita": 10.00}
+    synonyms = {"refri": "refrigerante", "batata": "batata frita"}
+
+    assert process_order("três pizza, 2 refri e batata", products, synonyms) == [
+        {"produto": "pizza", "quantidade": 3, "preco": 25.00},
+        {"produto": "refrigerante", "quantidade": 2, "preco": 5.00},
+        {"produto": "batata frita", "quantidade": 1, "preco": 10.00}
+    ]
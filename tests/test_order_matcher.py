@@ -0,0 +1,80 @@
+"""
+Tests for the compiled product matcher of the root order processor.
+"""
+
+import json
+
+from services.order_processor import ProductMatcher, get_matcher, process_order
+
+PRODUCTS = {"hamburguer": 15.00, "batata frita": 10.00, "refrigerante": 5.00}
+SYNONYMS = {"hambúrguer": "hamburguer", "batata": "batata frita", "refri": "refrigerante"}
+
+def test_quantities_and_synonyms_in_one_pass():
+    """Each product gets the number said before its name or synonym."""
+    itens = process_order("Quero 2 hambúrguer, 3 batata frita e um refri", PRODUCTS, SYNONYMS)
+
+    assert itens == [
+        {"produto": "hamburguer", "quantidade": 2, "preco": 15.00},
+        {"produto": "batata frita", "quantidade": 3, "preco": 10.00},
+        {"produto": "refrigerante", "quantidade": 1, "preco": 5.00}
+    ]
+    assert process_order("Só isso, obrigado", PRODUCTS, SYNONYMS) is None
+
+def test_matcher_is_compiled_once_per_catalog(tmp_path):
+    """The matcher is reused until the catalog or the synonyms file changes."""
+    synonyms_file = tmp_path / "global_synonyms.json"
+    synonyms_file.write_text(json.dumps({"Batata Frita": ["fritas"]}), encoding="utf-8")
+
+    matcher = get_matcher(PRODUCTS, SYNONYMS, str(synonyms_file))
+    assert get_matcher(PRODUCTS, SYNONYMS, str(synonyms_file)) is matcher
+    assert matcher.find("2 fritas") == ["batata frita"]
+
+    assert get_matcher({**PRODUCTS, "sorvete": 8.00}, SYNONYMS, str(synonyms_file)) is not matcher
+
+def test_catalog_changed_in_place_recompiles_the_matcher():
+    """Renaming a product in the same dict is not served by the stale matcher."""
+    products = dict(PRODUCTS)
+    synonyms = dict(SYNONYMS)
+    matcher = get_matcher(products, synonyms)
+
+    products["milk shake"] = products.pop("refrigerante")
+    synonyms["shake"] = synonyms.pop("refri")
+
+    assert get_matcher(products, synonyms) is not matcher
+    assert process_order("um shake e um milk shake", products, synonyms) == [
+        {"produto": "milk shake", "quantidade": 1, "preco": 5.00}
+    ]
+    assert get_matcher(products, synonyms, version=1) is get_matcher({}, {}, version=1)
+
+def test_plain_order_shortcut_agrees_with_the_lexer(monkeypatch):
+    """The single-pass reading gives what the lexer gives, or defers to it."""
+    random = __import__("random").Random(20)
+    vocabulary = [
+        "2", "10x", "0", "um", "duas", "três", "tres", "dúzia", "meia", "unidades", "de", "x",
+        "sem", "tira", "não quero", "nao", "quero", "e", ",", "mais", "hambúrguer", "hamburguer",
+        "batata", "batata frita", "refri", "refrigerante", "bem", "gelado", "por favor", "-",
+        "hambúrgueres", "refri,", "2,", "um.", "batatas", "x-refri", "_", "(2", "Três", "²"
+    ]
+    textos = [
+        "".join(random.choice(vocabulary) + random.choice([" ", " ", " ", "", ", ", "\n"]) for _ in range(random.randint(1, 9)))
+        for _ in range(4000)
+    ]
+
+    assert get_matcher(PRODUCTS, SYNONYMS).quantities("2 hambúrguer e três refri") == {
+        "hamburguer": 2, "refrigerante": 3
+    }
+    atalho = [process_order(texto, PRODUCTS, SYNONYMS) for texto in textos]
+    monkeypatch.setattr(ProductMatcher, "quantities", lambda self, texto: None)
+    lexer = [process_order(texto, PRODUCTS, SYNONYMS) for texto in textos]
+
+    assert atalho == lexer
+
+def test_terms_the_shortcut_cannot_read_are_left_to_the_lexer():
+    """Overlapping terms or a term starting with a unit give what the lexer gives."""
+    products = {"pizza doce": 30.00, "doce de leite": 12.00}
+
+    assert get_matcher(products, {}).quantities("pizza doce de leite") is None
+    assert process_order("pizza doce de leite", products, {}) == [
+        {"produto": "pizza doce", "quantidade": 1, "preco": 30.00}
+    ]
+    assert process_order("um x burguer", {"x burguer": 18.00}, {}) is None
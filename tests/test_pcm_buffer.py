@@ -0,0 +1,40 @@
+"""
+Tests for the preallocated PCM capture buffer.
+"""
+
+from services.pcm_buffer import PCMBuffer
+
+def test_write_truncates_when_full():
+    """A chunk larger than the room left is cut, and nothing fits afterwards."""
+    buffer = PCMBuffer(10)
+
+    assert buffer.write(b'abcdef') == 6
+    assert buffer.write(b'ghijkl') == 4
+    assert buffer.full and buffer.size == 10
+    assert buffer.write(b'mn') == 0
+    assert bytes(buffer.view()) == b'abcdefghij'
+
+def test_clear_rewinds_without_reallocating():
+    """A new recording overwrites the old one in the same memory."""
+    buffer = PCMBuffer(8)
+    buffer.write(b'12345678')
+    data = buffer._data
+
+    buffer.clear()
+    assert buffer.size == 0 and not buffer.full
+    assert bytes(buffer.view()) == b''
+
+    buffer.write(b'xy')
+    assert bytes(buffer.view()) == b'xy'
+    assert buffer._data is data and buffer.capacity == 8
+
+def test_view_is_zero_copy():
+    """The view shares memory with the buffer and sees later writes."""
+    buffer = PCMBuffer(4)
+    buffer.write(b'ab')
+    view = buffer.view()
+
+    assert view.obj is buffer._data
+    buffer.clear()
+    buffer.write(b'cd')
+    assert bytes(view) == b'cd'
@@ -0,0 +1,53 @@
+"""
+Tests for the product name/synonym index.
+"""
+
+from services.product_index import ProductIndex, get_product_index
+
+PRODUTOS = [
+    {"id": 1, "nome": "Big Mac", "preco": 25.9},
+    {"id": 2, "nome": "Coca-Cola 350ml", "preco": 7.5},
+    {"id": 3, "nome": "Batata Frita Média", "preco": 9.9}
+]
+SINONIMOS = {"big mac": ["lanche big mac", "big mac duplo"], "coca-cola 350ml": ["coca  350ml"]}
+
+def test_names_and_synonyms_resolve_to_the_product():
+    """Names and synonyms are matched regardless of case and spacing."""
+    indice = ProductIndex(PRODUTOS, SINONIMOS)
+
+    assert indice.lookup("Big Mac")["id"] == 1
+    assert indice.lookup("lanche  big mac")["id"] == 1
+    assert indice.lookup("Coca 350ml")["id"] == 2
+    assert indice.lookup("sorvete") is None
+
+def test_accents_are_folded():
+    """A transcription without accents finds the accented name, and back."""
+    indice = ProductIndex(PRODUTOS, {"big mac": ["lanche big mác"]})
+
+    assert indice.lookup("batata frita media")["id"] == 3
+    assert indice.lookup("BATATA FRITA MÉDIA")["id"] == 3
+    assert indice.lookup("lanche big mac")["id"] == 1
+    assert indice.lookup_prefix("batata frita media grande")["id"] == 3
+
+def test_index_is_built_once_per_catalog_version():
+    """The same catalog reuses the index; a new version rebuilds it."""
+    indice = get_product_index(PRODUTOS, SINONIMOS)
+    assert get_product_index(PRODUTOS, SINONIMOS) is indice
+
+    assert get_product_index(PRODUTOS, SINONIMOS, version=2) is not indice
+    assert get_product_index(list(PRODUTOS), SINONIMOS, version=2) is get_product_index(PRODUTOS, SINONIMOS, version=2)
+
+def test_catalog_changed_in_place_rebuilds_the_index():
+    """Replacing a product in the same list is not served by the stale index."""
+    produtos = [dict(p) for p in PRODUTOS]
+    sinonimos = {nome: list(s) for nome, s in SINONIMOS.items()}
+    indice = get_product_index(produtos, sinonimos)
+
+    produtos[0] = {"id": 9, "nome": "Sorvete", "preco": 8.0}
+    produtos[1]["preco"] = 8.5
+    sinonimos["coca-cola 350ml"].append("refri")
+
+    assert get_product_index(produtos, sinonimos) is not indice
+    assert get_product_index(produtos, sinonimos).lookup("sorvete")["id"] == 9
+    assert get_product_index(produtos, sinonimos).lookup("big mac") is None
+    assert get_product_index(produtos, sinonimos).lookup("refri")["preco"] == 8.5
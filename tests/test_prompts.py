@@ -0,0 +1,68 @@
+"""
+Tests for the prompt templates and PCM splicing.
+"""
+
+import json
+
+from services.audio_clip import AudioClip
+from services.prompts import (
+    AGRADECIMENTO_NOME,
+    confirmacao_pedido,
+    find_static_prompts,
+    splice,
+    warm_texts
+)
+from services.tts_cache import TTSCache
+
+def make_synthesizer(cache):
+    """Synthesizer that renders each text as a tone of its own length, through the cache."""
+    rendered = []
+
+    def synthesize(text):
+        def render():
+            rendered.append(text)
+            silence = b'\x00\x00' * 1600
+            return AudioClip(silence + b'\x10\x27' * (160 * len(text)) + silence, sample_rate=16000)
+        return cache.get_or_render(text, render)
+
+    return synthesize, rendered
+
+def test_prompt_text_matches_formatted_string():
+    """A filled template is the same string the handlers used to format."""
+    itens = [{'quantidade': 2, 'produto': 'pizza'}, {'quantidade': 1, 'produto': 'refrigerante'}]
+    prompt = confirmacao_pedido(itens, 64.5)
+
+    assert prompt == "Confirmando seu pedido: 2 pizza, 1 refrigerante. Total: R$ 64.50. Deseja confirmar ou fazer alterações?"
+    assert json.loads(json.dumps({'message': prompt})) == {'message': prompt}
+    assert AGRADECIMENTO_NOME.fill(nome='Ana') == "Obrigado, Ana. Agora, informe seu endereço completo."
+
+def test_personalized_prompt_synthesizes_only_new_slots():
+    """After warm-tts renders the fixed segments, a new name costs one synthesis."""
+    synthesize, rendered = make_synthesizer(TTSCache())
+
+    for text in warm_texts([], [AGRADECIMENTO_NOME]):
+        synthesize(text)
+    assert rendered == ["Obrigado,", ". Agora, informe seu endereço completo."]
+    rendered.clear()
+
+    clip = splice(AGRADECIMENTO_NOME.fill(nome='Ana'), synthesize)
+    splice(AGRADECIMENTO_NOME.fill(nome='Ana'), synthesize)
+    splice(AGRADECIMENTO_NOME.fill(nome='Bruno'), synthesize)
+
+    assert rendered == ['Ana', 'Bruno']
+    # Cada trecho perde o silêncio das pontas, exceto 30 ms de cada lado
+    speech = 160 * len('Obrigado,' + 'Ana' + '. Agora, informe seu endereço completo.')
+    padding = 3 * 2 * int(16000 * 0.03)
+    assert len(clip.frames) == 2 * (speech + padding)
+
+def test_static_prompts_are_found_in_controllers():
+    """Literal responses are collected for warming; formatted ones are not."""
+    from controllers import pedidos
+
+    prompts = find_static_prompts(pedidos)
+    texts = warm_texts(prompts)
+
+    assert "Endereço confirmado! Agora, qual é o seu pedido?" in prompts
+    assert len(prompts) == len(set(prompts))
+    assert not any('{' in p for p in prompts)
+    assert "Obrigado," in texts and ". Agora, informe seu endereço completo." in texts
@@ -0,0 +1,66 @@
+"""
+Tests for the background synthesis queue.
+"""
+
+import threading
+
+from services.audio_clip import AudioClip
+from services.speech_jobs import SpeechJobs
+
+class FakeTTS:
+    """TextToSpeech stand-in that blocks until its test releases it."""
+
+    def __init__(self, release=None):
+        self.release = release or threading.Event()
+        self.threads = set()
+
+    def synthesize(self, text):
+        self.threads.add(threading.get_ident())
+        self.release.wait(1)
+        return AudioClip(text.encode('utf-8'), sample_rate=16000)
+
+def test_submit_returns_before_synthesis_finishes():
+    """The handler gets a job id immediately; the clip arrives later."""
+    tts = FakeTTS()
+    jobs = SpeechJobs(lambda: tts, max_workers=1)
+    job_id = jobs.submit('Endereço confirmado!')
+    future = jobs.get(job_id)
+
+    assert not future.done()
+    tts.release.set()
+    assert bytes(future.result(timeout=1).frames) == 'Endereço confirmado!'.encode('utf-8')
+    assert tts.threads and threading.get_ident() not in tts.threads
+    jobs.shutdown()
+
+def test_old_jobs_are_forgotten():
+    """Only the most recent max_jobs jobs can be downloaded."""
+    released = threading.Event()
+    released.set()
+    tts = FakeTTS(released)
+    jobs = SpeechJobs(lambda: tts, max_workers=1, max_jobs=2)
+    ids = [jobs.submit(str(i)) for i in range(3)]
+
+    assert jobs.get(ids[0]) is None
+    assert jobs.get(ids[2]).result(timeout=1) is not None
+    assert jobs.get('desconhecido') is None
+    jobs.shutdown()
+
+def test_first_clause_is_ready_before_the_rest():
+    """A long response is split into clauses that can be played in order."""
+    gate = threading.Event()
+
+    class ClauseTTS:
+        def synthesize(self, text):
+            if not text.startswith('Confirmando'):
+                gate.wait(1)
+            return AudioClip(text.encode('utf-8'), sample_rate=16000)
+
+    jobs = SpeechJobs(ClauseTTS, max_workers=2)
+    job = jobs.get(jobs.submit('Confirmando seu pedido: 2 pizza, 1 refrigerante, 3 batata frita. Total: R$ 64.50.'))
+    clips = job.iter_clips(timeout=1)
+
+    assert bytes(next(clips).frames) == 'Confirmando seu pedido: 2 pizza, 1 refrigerante,'.encode('utf-8')
+    assert not job.done()
+    gate.set()
+    assert [bytes(c.frames).decode('utf-8') for c in clips] == ['3 batata frita.', 'Total: R$ 64.50.']
+    jobs.shutdown()
@@ -0,0 +1,93 @@
+"""
+Tests for the per-thread pyttsx3 engine registry.
+"""
+
+import threading
+import time
+
+from app import create_app
+from config.settings import Config
+from services.text_to_speech import EngineRegistry, TextToSpeech
+
+def test_engine_is_reused_per_thread():
+    """Each thread initializes its engine once and keeps it."""
+    registry = EngineRegistry('dummy')
+    engine = registry.get(150, 0.9)
+
+    assert registry.get(150, 0.9) is engine
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(registry.get(150, 0.9)))
+    thread.start()
+    thread.join()
+
+    assert other[0] is not engine
+    assert registry.created == 2
+
+def test_wedged_engine_is_recreated():
+    """A RuntimeError from the engine discards it and the call is retried once."""
+    registry = EngineRegistry('dummy')
+    tts = TextToSpeech(rate=180, engines=registry)
+    wedged = tts.engine
+
+    def run_and_wait():
+        raise RuntimeError('run loop already started')
+    wedged.runAndWait = run_and_wait
+
+    tts.speak('Endereço confirmado!')
+
+    assert tts.engine is not wedged
+    assert registry.created == 2
+
+def test_renderings_of_a_driver_never_overlap(monkeypatch, tmp_path):
+    """Threads with their own engines still render one at a time."""
+    tts = TextToSpeech(engines=EngineRegistry('dummy'))
+    active = []
+    overlaps = []
+
+    def save(engine, text, filename):
+        active.append(engine)
+        overlaps.append(len(active))
+        time.sleep(0.01)
+        active.remove(engine)
+    monkeypatch.setattr(TextToSpeech, '_save', staticmethod(save))
+
+    threads = [
+        threading.Thread(target=tts.save_to_file, args=('Olá', str(tmp_path / f'{i}.wav')))
+        for i in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert overlaps == [1, 1, 1, 1]
+
+def test_busy_driver_times_out_without_blocking_playback(monkeypatch, tmp_path):
+    """A rendering gives up on a stuck driver; speaking aloud does not wait for it."""
+    registry = EngineRegistry('dummy')
+    tts = TextToSpeech(engines=registry, lock_timeout=0.05)
+    spoken = []
+    monkeypatch.setattr(TextToSpeech, '_say', staticmethod(lambda engine, text: spoken.append(text)))
+
+    with registry.lock:
+        assert tts.save_to_file('Olá', str(tmp_path / 'ola.wav')) is False
+        tts.speak('Endereço confirmado!')
+
+    assert spoken == ['Endereço confirmado!']
+    assert registry.lock is EngineRegistry('dummy').lock
+
+def test_warm_tts_without_disk_cache_reports_an_error(tmp_path):
+    """The root warm-tts command explains the missing folder, like the src one."""
+    class TestConfig(Config):
+        TEMP_DIR = str(tmp_path)
+        AUDIO_UPLOAD_FOLDER = str(tmp_path / 'audio')
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path}/pedidos.db'
+        TRANSCRIBER_BACKEND = 'fake'
+        TRANSCRIBER_WARM = False
+        TTS_CACHE_FOLDER = ''
+
+    result = create_app(TestConfig).test_cli_runner().invoke(args=['warm-tts'])
+
+    assert result.exception is None
+    assert 'Error warming the TTS cache: ' in result.output
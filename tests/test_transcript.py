@@ -0,0 +1,27 @@
+"""
+Tests for the shared normalized transcript.
+"""
+
+import json
+
+from services.order_lexer import lex_order
+from services.transcript import Transcript, as_transcript
+
+def test_normalized_forms_keep_offsets():
+    """Every form has the text's length, so offsets slice the original."""
+    texto = Transcript("Não quero CEBOLA, só três Big Mac")
+
+    assert texto.lowered == "não quero cebola, só três big mac"
+    assert texto.folded == "nao quero cebola, so tres big mac"
+    assert len(texto.lowered) == len(texto.folded) == len(texto)
+    assert [texto[start:end] for _, start, end in texto.tokens[:3]] == ["Não", "quero", "CEBOLA"]
+    assert json.loads(json.dumps({"text": texto})) == {"text": str(texto)}
+
+def test_forms_are_computed_once_per_turn():
+    """The stages share the same Transcript and its memoized forms."""
+    texto = as_transcript("Quero dois Big Mac e uma Coca-Cola 350ml")
+    tokens = texto.tokens
+
+    assert as_transcript(texto) is texto
+    lex_order(texto)
+    assert texto.tokens is tokens
@@ -0,0 +1,162 @@
+"""
+Tests for the transcription backends and worker pool.
+"""
+
+import threading
+import time
+
+import pytest
+
+from services.audio_clip import AudioClip
+from services.audio_manager import AudioManager
+from services.transcription import (
+    FakeTranscriber,
+    GoogleTranscriber,
+    TranscriptionPool,
+    create_transcriber_factory
+)
+
+def silent_clip(seconds=0.5, sample_rate=16000):
+    """Build a silent 16-bit mono clip."""
+    return AudioClip(b'\x00\x00' * int(seconds * sample_rate), sample_rate=sample_rate)
+
+def test_fake_transcriber_is_deterministic():
+    """Scripted responses come back in order, then the default."""
+    pool = TranscriptionPool(lambda: FakeTranscriber(['meu nome é Ana', 'confirmar'], default='?'), max_workers=1)
+
+    assert [pool.transcribe(silent_clip()) for _ in range(3)] == ['meu nome é Ana', 'confirmar', '?']
+    pool.shutdown()
+
+def test_pool_warms_each_worker_once():
+    """Every worker loads its backend at startup and reuses it afterwards."""
+    backends = []
+    lock = threading.Lock()
+
+    def factory():
+        backend = FakeTranscriber(default='ok')
+        with lock:
+            backends.append(backend)
+        return backend
+
+    pool = TranscriptionPool(factory, max_workers=3)
+    pool.warm()
+    futures = [pool.submit(silent_clip()) for _ in range(12)]
+
+    assert [f.result() for f in futures] == ['ok'] * 12
+    loaded = [b for b in backends if b.loaded]
+    assert len(loaded) == 3
+    assert all(b.loaded == 1 for b in loaded)
+    assert sum(len(b.calls) for b in loaded) == 12
+    pool.shutdown()
+
+def test_pool_bounds_concurrency():
+    """No more than max_workers transcriptions run at the same time."""
+    running = []
+    peak = []
+    lock = threading.Lock()
+    release = threading.Event()
+
+    class SlowTranscriber(FakeTranscriber):
+        def transcribe(self, clip):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            release.wait(1)
+            with lock:
+                running.pop()
+            return 'ok'
+
+    pool = TranscriptionPool(SlowTranscriber, max_workers=2)
+    futures = [pool.submit(silent_clip()) for _ in range(6)]
+    release.set()
+
+    assert [f.result() for f in futures] == ['ok'] * 6
+    assert max(peak) <= 2
+    pool.shutdown()
+
+def test_factory_uses_configured_backend_and_rate():
+    """The config selects the backend and its sample rate."""
+    factory = create_transcriber_factory({'TRANSCRIBER_BACKEND': 'google', 'AUDIO_TRANSCRIBE_RATE': 8000})
+    backend = factory()
+
+    assert isinstance(backend, GoogleTranscriber)
+    assert backend.sample_rate == 8000
+
+    with pytest.raises(ValueError):
+        create_transcriber_factory({'TRANSCRIBER_BACKEND': 'nope'})
+
+def test_stream_reports_partials_before_final():
+    """A streaming backend reports growing partials while chunks arrive."""
+    pool = TranscriptionPool(lambda: FakeTranscriber(['quero duas pizzas']), max_workers=1)
+    session = pool.open_stream(44100)
+    partials = []
+
+    for _ in range(12):
+        partials += session.feed(b'\x00\x00' * 1024)
+        time.sleep(0.01)
+
+    assert session.finish() == 'quero duas pizzas'
+    partials += session.partials()
+    assert partials == ['quero', 'quero duas', 'quero duas pizzas']
+    pool.shutdown()
+
+def test_streams_share_workers_between_chunks():
+    """Two live captures on a single worker both get partials before either finishes."""
+    pool = TranscriptionPool(lambda: FakeTranscriber(['quero duas pizzas', 'uma coca']), max_workers=1)
+    sessions = [pool.open_stream(16000), pool.open_stream(16000)]
+    partials = [[], []]
+
+    for _ in range(8):
+        for session, found in zip(sessions, partials):
+            found += session.feed(b'\x00\x00' * 160)
+        time.sleep(0.01)
+    for session, found in zip(sessions, partials):
+        found += session.partials()
+
+    assert partials == [['quero', 'quero duas'], ['uma', 'uma coca']]
+    assert [session.finish() for session in sessions] == ['quero duas pizzas', 'uma coca']
+    pool.shutdown()
+
+def test_google_reports_interim_partials():
+    """With a partial interval, Google re-recognizes the audio so far and reports it."""
+    sent = []
+
+    class Recognizer:
+        def recognize_google(self, audio, language):
+            sent.append(len(audio.frame_data))
+            return ' '.join(['pizza'] * (len(audio.frame_data) // 3200))
+
+    class Google(GoogleTranscriber):
+        def load(self):
+            self.recognizer = Recognizer()
+
+    pool = TranscriptionPool(lambda: Google(partial_interval=0.2), max_workers=1)
+    session = pool.open_stream(16000)
+    partials = []
+
+    for _ in range(5):
+        partials += session.feed(b'\x00\x00' * 3200)
+        time.sleep(0.01)
+
+    assert session.finish() == ' '.join(['pizza'] * 10)
+    partials += session.partials()
+    assert partials[-1] == ' '.join(['pizza'] * 10) and len(partials) >= 2
+    # O último parcial já cobre todo o áudio: não há chamada extra no fim
+    assert sent[-1] == 5 * 6400 and len(sent) == 5
+    assert not create_transcriber_factory({'TRANSCRIBER_PARTIAL_INTERVAL': 0})().streaming
+    pool.shutdown()
+
+def test_private_pool_is_shut_down_with_its_manager(tmp_path):
+    """A manager built without the shared pool stops its own workers on close."""
+    shared = TranscriptionPool(lambda: FakeTranscriber(), max_workers=1)
+    with_shared = AudioManager(str(tmp_path), transcriber=shared)
+    private = AudioManager(str(tmp_path))
+    pool = private.transcriber
+
+    with_shared.close()
+    private.close()
+
+    assert shared.submit(silent_clip()).result() == ''
+    with pytest.raises(RuntimeError):
+        pool.submit(silent_clip())
+    shared.shutdown()
@@ -0,0 +1,68 @@
+"""
+Tests for the synthesized-prompt cache.
+"""
+
+import os
+
+from services.audio_clip import AudioClip
+from services.tts_cache import TTSCache, cache_key
+
+def prompt(size, value=b'\x01\x00'):
+    """Clip of ``size`` bytes of PCM."""
+    return AudioClip(value * (size // 2), sample_rate=16000)
+
+def test_key_covers_every_synthesis_parameter():
+    """Changing any parameter addresses a different audio."""
+    base = cache_key('Endereço confirmado!', 'pt-BR', 150, 0.9, 'pyttsx3')
+
+    assert base == cache_key('Endereço confirmado!', 'pt-BR', 150, 0.9, 'pyttsx3')
+    assert len({
+        base,
+        cache_key('Endereço confirmado.', 'pt-BR', 150, 0.9, 'pyttsx3'),
+        cache_key('Endereço confirmado!', 'en', 150, 0.9, 'pyttsx3'),
+        cache_key('Endereço confirmado!', 'pt-BR', 180, 0.9, 'pyttsx3'),
+        cache_key('Endereço confirmado!', 'pt-BR', 150, 1.0, 'pyttsx3'),
+        cache_key('Endereço confirmado!', 'pt-BR', 150, 0.9, 'gtts')
+    }) == 6
+
+def test_memory_tier_evicts_least_recently_used():
+    """The memory tier stays within its byte budget, dropping the oldest prompt."""
+    cache = TTSCache(max_bytes=250)
+    cache.put('a', prompt(100))
+    cache.put('b', prompt(100))
+    cache.get('a')
+    cache.put('c', prompt(100))
+
+    assert cache.size == 200
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+
+def test_disk_tier_survives_restart_and_skips_synthesis(tmp_path):
+    """A prompt rendered once is read back from disk by a new cache."""
+    renders = []
+
+    def render():
+        renders.append(1)
+        return prompt(64, b'\x07\x00')
+
+    TTSCache(folder=str(tmp_path)).get_or_render('k', render)
+    cache = TTSCache(folder=str(tmp_path))
+    clip = cache.get_or_render('k', render)
+
+    assert len(renders) == 1
+    assert bytes(clip.frames) == b'\x07\x00' * 32
+    assert clip.sample_rate == 16000
+    assert cache.disk_hits == 1
+    assert cache.get('k') is not None and cache.hits == 1
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    """The disk tier stays within its budget, removing the file used longest ago."""
+    cache = TTSCache(folder=str(tmp_path), disk_max_bytes=800)
+    for age, key in enumerate('abc'):
+        cache.put(key, prompt(200))
+        os.utime(cache._path(key), (1000 + age, 1000 + age))
+    # Um acerto em disco renova o arquivo 'a'
+    assert TTSCache(folder=str(tmp_path)).get('a') is not None
+    cache.put('d', prompt(200))
+
+    assert sorted(os.listdir(tmp_path)) == ['a.wav', 'c.wav', 'd.wav']
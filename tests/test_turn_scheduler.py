@@ -0,0 +1,71 @@
+"""
+Tests for the event-driven turn scheduler.
+"""
+
+import threading
+
+from services.turn_scheduler import TurnScheduler
+
+class FakeClock:
+    """Clock advanced by hand."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class FakeTTS:
+    """TTS whose playback takes a fixed time on the fake clock."""
+
+    def __init__(self, clock, seconds):
+        self.clock = clock
+        self.seconds = seconds
+
+    def speak(self, text):
+        self.clock.now += self.seconds
+
+def test_timings_split_turn_by_stage():
+    """Each stage accumulates its own time; the rest is reported as idle."""
+    clock = FakeClock()
+    scheduler = TurnScheduler(clock)
+
+    scheduler.start_capture()
+    clock.now += 0.1
+    scheduler.signal_capture_ready()
+    clock.now += 2.0
+    scheduler.begin('transcribing')
+    clock.now += 0.5
+    scheduler.signal_recognition_done()
+    clock.now += 0.2
+    scheduler.speak(FakeTTS(clock, 1.5), 'ok')
+
+    assert scheduler.recognition_done.is_set()
+    assert scheduler.timings() == {
+        'opening': 100,
+        'recording': 2000,
+        'transcribing': 500,
+        'speaking': 1500,
+        'idle': 200,
+        'total': 4300
+    }
+
+def test_capture_waits_for_playback_instead_of_sleeping():
+    """wait_for_playback returns as soon as the response finishes playing."""
+    scheduler = TurnScheduler()
+    started = threading.Event()
+    finish = threading.Event()
+
+    class BlockingTTS:
+        def speak(self, text):
+            started.set()
+            finish.wait(1)
+
+    speaker = threading.Thread(target=scheduler.speak, args=(BlockingTTS(), 'ok'))
+    speaker.start()
+    started.wait(1)
+
+    assert not scheduler.wait_for_playback(timeout=0.01)
+    finish.set()
+    assert scheduler.wait_for_playback(timeout=1)
+    speaker.join()
@@ -0,0 +1,78 @@
+"""
+Tests for the energy VAD that ends recordings on trailing silence.
+"""
+
+import struct
+
+from services.audio_manager import AudioManager
+from services.transcription import FakeTranscriber, TranscriptionPool
+from services.vad import EnergyVAD
+
+RATE = 16000
+CHUNK = 1600  # 0.1 s
+
+def chunk(level):
+    """Build a 16-bit mono chunk whose RMS energy is ``level``."""
+    return struct.pack(f'<{CHUNK}h', *([level, -level] * (CHUNK // 2)))
+
+SILENCE = chunk(20)
+SPEECH = chunk(3000)
+
+def feed_until_stop(vad, chunks):
+    """Feed chunks and return how many were consumed before the VAD stopped."""
+    for count, data in enumerate(chunks, start=1):
+        if vad.feed(data):
+            return count
+    return None
+
+def test_trailing_silence_ends_capture():
+    """Noise, speech, then silence_duration of silence stops the capture."""
+    vad = EnergyVAD(RATE, silence_duration=0.5)
+    chunks = [SILENCE] * 5 + [SPEECH] * 10 + [SILENCE] * 20
+
+    assert feed_until_stop(vad, chunks) == 20
+    assert vad.noise_floor < vad.min_threshold
+
+def test_immediate_speech_is_not_calibrated_as_noise():
+    """A caller answering during the calibration window is still heard."""
+    vad = EnergyVAD(RATE, silence_duration=0.5)
+    chunks = [SPEECH] * 3 + [SILENCE] * 20
+
+    assert vad.is_speech(SPEECH)
+    assert feed_until_stop(vad, chunks[1:]) == 7
+    assert vad.noise_floor < vad.min_threshold
+
+class FakeStream:
+    """Input stream that returns the same chunk forever."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def read(self, frames):
+        return self.data
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        pass
+
+class FakeAudio:
+    """PyAudio stand-in for a microphone that never goes quiet."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def open(self, **kwargs):
+        return FakeStream(self.data)
+
+def test_recording_is_capped_at_max_duration(tmp_path):
+    """Without trailing silence the capture stops at the duration."""
+    pool = TranscriptionPool(lambda: FakeTranscriber(), max_workers=1)
+    manager = AudioManager(str(tmp_path), transcriber=pool, audio=FakeAudio(chunk(3000)[:2048]))
+
+    clip = manager.record_audio(duration=2, silence_duration=0.5)
+
+    assert abs(clip.duration - 2) < 0.05
+    assert clip.trimmed < 0.05
+    pool.shutdown()